@@ -1,193 +1,495 @@
 # Extract Indonesia subnational data (country profile>Indonesia>Provinces Data)
-# Run locally upon updates
+# Run locally upon updates:
+#   python scraper/SEARO_Indonesia_subnational.py
+# or as a job in a shared browser session together with the national scraper:
+#   python scraper/browser_session.py national indonesia
+# Backfill every month without a browser (Shiny websocket), merged with the earlier files into one dataset:
+#   python scraper/SEARO_Indonesia_subnational.py --backfill
 
-import undetected_chromedriver as uc
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.action_chains import ActionChains
 
 import pandas as pd
-import time
 import os
-from datetime import datetime
-import subprocess
 import re
+from datetime import datetime
 import sys
+import logging
 from dateutil.relativedelta import relativedelta
 
-def get_chrome_version():
-    try:
-        if sys.platform == "win32":
-            # Command to retrieve Chrome version from Windows registry
-            output = subprocess.check_output(
-                r'reg query "HKEY_CURRENT_USER\Software\Google\Chrome\BLBeacon" /v version',
-                shell=True,
-                text=True
-            )
-            version = re.search(r'\s+version\s+REG_SZ\s+(\d+)\.', output)
-        else:  # Assuming Linux or other Unix-like systems
-            # Try different commands to retrieve Chrome version on Linux
-            for command in ['google-chrome --version', 'google-chrome-stable --version', 'chromium-browser --version']:
-                try:
-                    output = subprocess.check_output(command, shell=True, text=True)
-                    version = re.search(r'\b(\d+)\.', output)
-                    if version:
-                        break
-                except subprocess.CalledProcessError:
-                    continue
-            else:
-                raise RuntimeError("Could not determine Chrome version")
-
-        if version:
-            return int(version.group(1))
-        else:
-            raise ValueError("Could not parse Chrome version")
-    except Exception as e:
-        raise RuntimeError("Failed to get Chrome version") from e
-
-# Get the major version of Chrome installed
-chrome_version = get_chrome_version()
-
-# set chrome download directory
-chrome_options = uc.ChromeOptions()
-prefs = {"download.default_directory": os.getcwd()}
-chrome_options.add_experimental_option("prefs", prefs)
-
-
-driver = uc.Chrome(headless=False, use_subprocess=False, options = chrome_options, version_main=chrome_version)
-driver.get('https://worldhealthorg.shinyapps.io/searo-dengue-dashboard/#')
-
-print(driver.title)
-time.sleep(5)
-
-# click the side panel ('country profile')
-side_panel = WebDriverWait(driver, 20).until(
-    EC.element_to_be_clickable((By.ID, "tab-sidebar_country_profile"))
-)
-driver.execute_script("arguments[0].scrollIntoView();", side_panel)
-driver.execute_script("arguments[0].click();", side_panel)
-
-
-# country drop down menu
-country_filter = WebDriverWait(driver, 10).until(
-        EC.element_to_be_clickable((By.XPATH, "//button[@data-id='c_country_selection']"))
-)
-
-driver.execute_script("arguments[0].scrollIntoView();", country_filter)
-driver.execute_script("arguments[0].click();", country_filter)
-
-# select Indonesia
-indonesia_filter = WebDriverWait(driver, 10).until(
-        EC.element_to_be_clickable((By.XPATH, "//a[@id='bs-select-2-3' and contains(@class, 'dropdown-item')]"))
-)
-
-driver.execute_script("arguments[0].scrollIntoView();", indonesia_filter)
-driver.execute_script("arguments[0].click();", indonesia_filter)
-
-time.sleep(15)
-
-data = []
-
-def scrape_table():
-    rows = driver.find_elements(By.XPATH, "//div[@id='c_map_in_overview_table']//div[@role='row']")
-    table_data = []
-    # Check if rows exist
-    if not rows:
+from browser_session import BrowserSession, selected_country
+from shiny_client import ShinyClient, DASHBOARD_URL
+from readiness import ShinyReadiness, StaleOutputError, TABLE_RENDER_TIMEOUT, stale_outputs, wait_until
+from scrape_logging import get_logger, log_record
+
+logger = get_logger("indonesia")
+
+TABLE_ID = "c_map_in_overview_table"
+SLIDER_ID = "c_map_month_picker_in_overview"
+
+# Province-month dataset written by the backfill
+CONSOLIDATED_FILE = "Indonesia_subnational.csv"
+
+# arguments[0]: slider container (or input) ID
+MONTH_LABEL_JS = """
+var container = document.getElementById(arguments[0]);
+var label = container ? container.querySelector('.irs-single') : null;
+return label ? label.innerText : null;
+"""
+
+# arguments[0]: table output ID; returns the visible columns of every row.
+# The reactable data is used when available (all rows, whatever the page or virtualization),
+# otherwise the rendered cells; header rows (no cells) are skipped.
+READ_TABLE_JS = """
+var id = arguments[0];
+if (window.Reactable) {
+    try {
+        var instance = Reactable.getInstance(id);
+        var state = Reactable.getState(id);
+        if (instance && state && state.data) {
+            var columns = instance.visibleColumns.map(function(column) { return column.id; });
+            return {source: 'reactable', rows: state.data.map(function(row) {
+                return columns.map(function(column) { return row[column]; });
+            })};
+        }
+    } catch (error) {
+        // not a reactable widget, fall back to the DOM
+    }
+}
+var container = document.getElementById(id);
+if (!container) return null;
+var rows = [];
+container.querySelectorAll("[role='row']").forEach(function(row) {
+    var cells = row.querySelectorAll("[role='cell']");
+    if (cells.length) {
+        rows.push(Array.prototype.map.call(cells, function(cell) { return cell.innerText.trim(); }));
+    }
+});
+return {source: 'dom', rows: rows};
+"""
+
+_ISO_DATE_RE = re.compile(r'^\d{4}-\d{2}')
+
+# arguments: slider ID, year, month (1-12), label ("Jul-2024")
+# Date sliders hold UTC timestamps (ms), slider with a list of values hold the index of the label
+SEEK_MONTH_JS = """
+var container = document.getElementById(arguments[0]);
+var year = arguments[1], month = arguments[2], label = arguments[3];
+var input = (container && container.tagName === 'INPUT') ? container : (container ? container.querySelector('input') : null);
+if (!input || !window.jQuery) return {error: 'slider input not found'};
+var slider = jQuery(input).data('ionRangeSlider');
+if (!slider) return {error: 'ionRangeSlider instance not found'};
+
+var options = slider.options, value;
+if (options.values && options.values.length) {
+    value = options.values.indexOf(label);
+    if (value < 0) return {error: 'month not in the slider values'};
+} else {
+    // keep the day of the month the slider uses (the day of its minimum)
+    value = Date.UTC(year, month - 1, new Date(options.min).getUTCDate());
+    if (value < options.min || value > options.max) return {error: 'month outside the slider range'};
+}
+
+if (options.from === value) return {changed: false};
+slider.update({from: value});
+// ionRangeSlider does not notify Shiny on update(), the input binding listens for 'change'
+jQuery(input).trigger('change');
+return {changed: true};
+"""
+
+
+def select_indonesia(driver, readiness):
+    """Select Indonesia in the country profile and wait for the provinces table to render"""
+    if selected_country(driver) == "Indonesia":
+        logger.info("Indonesia is already selected")
+        readiness.wait_for_idle()
+        return
+
+    # country drop down menu
+    country_filter = WebDriverWait(driver, 10).until(
+            EC.element_to_be_clickable((By.XPATH, "//button[@data-id='c_country_selection']"))
+    )
+
+    driver.execute_script("arguments[0].scrollIntoView();", country_filter)
+    driver.execute_script("arguments[0].click();", country_filter)
+
+    # select Indonesia and wait for the provinces table to render
+    table_state = readiness.mark([TABLE_ID])
+    indonesia_filter = WebDriverWait(driver, 10).until(
+            EC.element_to_be_clickable((By.XPATH, "//a[@id='bs-select-2-3' and contains(@class, 'dropdown-item')]"))
+    )
+
+    driver.execute_script("arguments[0].scrollIntoView();", indonesia_filter)
+    driver.execute_script("arguments[0].click();", indonesia_filter)
+
+    if stale_outputs(readiness.wait_for_render([TABLE_ID], table_state, timeout=TABLE_RENDER_TIMEOUT)):
+        raise StaleOutputError("provinces table not updated for Indonesia")
+
+
+def scrape_table(driver):
+    """
+    Read the whole provinces table in one script call.
+
+    Returns:
+        list: Rows of [Region, Date, Cases] (raw values), or None if the table has no rows.
+    """
+    result = driver.execute_script(READ_TABLE_JS, TABLE_ID)
+    if not result or not result.get('rows'):
         return None  # Return None if no rows are found
 
-    # Loop through the rows and extract the text for each cell
-    for row in rows:
-        cells = row.find_elements(By.XPATH, ".//div[@role='cell']")
-        row_data = [cell.text for cell in cells]
-        table_data.append(row_data)
-
-    return table_data  # Return the data after scraping
-
-# Call the scrape_table function
-data = scrape_table() # save table for the first month
-
-# Check if data is None or empty
-if not data:
-    print("No data found. Exiting.")
-    driver.quit()
-else:
-    print(data)
-
-# Locate the slider handle
-slider_handle = WebDriverWait(driver, 10).until(
-    EC.element_to_be_clickable((By.CSS_SELECTOR, "#c_map_month_picker_in_overview .irs-handle.single"))
-)
-# Locate the month display with a wait until it's visible
-month_display = WebDriverWait(driver, 2).until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, "#c_map_month_picker_in_overview .irs-single")))
-max_month_text = driver.execute_script("return arguments[0].innerText;", month_display[0])
-print(f"Current month: {max_month_text}")
-
-def move_slider_left_until_target_month(target_month):
-    global data
-    actions = ActionChains(driver)
-
-    while True:
-        # Check the current month display
-        current_month = driver.execute_script("return arguments[0].innerText;", month_display[0])
-        # print(f"Current month: {current_month}")
-
-        # If the current month matches the target, stop
-        if current_month == target_month:
-            print(f"Target month '{target_month}' reached!")
-            time.sleep(3)
-            table_data = scrape_table()
-            data.extend(table_data)
-            break
+    logger.debug("Read %d table rows from %s", len(result['rows']), result['source'])
+    if result['source'] == 'reactable':
+        # underlying data can hold dates as ISO strings, the rendered table shows "Dec-2024"
+        return [[row[0], _month_label(row[1])] + row[2:] for row in result['rows']]
+    return result['rows']
+
+
+def _month_label(value):
+    """Format an ISO date ("2024-12-01") as the table's month label ("Dec-2024"); other values unchanged"""
+    if isinstance(value, str) and _ISO_DATE_RE.match(value):
+        return datetime.strptime(value[:7], "%Y-%m").strftime("%b-%Y")
+    return value
+
+
+def parse_cases(cases):
+    """Vectorized parse of the Cases column ("1,243", 1243, "") to nullable integers"""
+    text = cases.astype(str).str.replace(",", "", regex=False).str.strip()
+    return pd.to_numeric(text, errors='coerce').round().astype('Int64')
+
+
+def seek_month(driver, readiness, target_month, capture=None):
+    """
+    Set the month slider straight to target_month (e.g. "Jul-2024") and return that month's table.
+
+    The value is set through the ionRangeSlider instance and a change event is sent to Shiny,
+    then only the provinces table refresh is waited for. With a ShinyFrameCapture the table is
+    read from the captured output value as soon as the server sends it, without waiting for the render.
+
+    If the slider label does not reach target_month (e.g. the slider snapped to another step) or the table
+    is not refreshed, the table is not recorded: an empty list is returned and a warning logged.
+    """
+    target_date = datetime.strptime(target_month, "%b-%Y")
+    if capture is not None:
+        return _seek_month_captured(driver, capture, target_month, target_date)
+
+    table_state = readiness.mark([TABLE_ID])
+
+    result = driver.execute_script(SEEK_MONTH_JS, SLIDER_ID, target_date.year, target_date.month, target_month)
+    if result.get('error'):
+        raise RuntimeError(f"Could not move the month slider to {target_month}: {result['error']}")
+
+    # the label follows the slider immediately, the table once the server has sent the new month
+    on_target = _wait_for_month_label(driver, target_month)
+    if result.get('changed'):
+        # waited for even when off target, so a late refresh does not count for the next month
+        status = readiness.wait_for_render([TABLE_ID], table_state, timeout=TABLE_RENDER_TIMEOUT)
+        on_target = on_target and _table_refreshed(status, target_month)
+    if not on_target:
+        return []
+
+    table_data = scrape_table(driver) or []
+    log_record("extraction", country="Indonesia", chart="province_table", month=target_month, rows=len(table_data))
+    return table_data
+
+
+def _wait_for_month_label(driver, target_month):
+    """Wait until the slider shows target_month; False (logged) if it shows another month"""
+    if wait_until(driver, lambda d: d.execute_script(MONTH_LABEL_JS, SLIDER_ID) == target_month, 5):
+        return True
+
+    shown = driver.execute_script(MONTH_LABEL_JS, SLIDER_ID)
+    logger.warning("Month slider shows %s instead of %s, skipping this month", shown, target_month)
+    log_record("extraction_failed", country="Indonesia", chart="province_table", month=target_month,
+               error=f"slider shows {shown}")
+    return False
+
+
+def _table_refreshed(status, target_month):
+    """False (logged) if the table still shows the previous month"""
+    if not stale_outputs(status):
+        return True
+
+    logger.warning("Provinces table not refreshed for %s, skipping this month", target_month)
+    log_record("extraction_failed", country="Indonesia", chart="province_table", month=target_month,
+               error="table not refreshed")
+    return False
 
-        else:
-            # Move the slider handle left by a small amount
-            actions.click_and_hold(slider_handle).move_by_offset(-3, 0).release().perform()
-            time.sleep(5)  # Pause to let the slider update
 
-    return data
+def _seek_month_captured(driver, capture, target_month, target_date):
+    since = capture.mark()
+    result = driver.execute_script(SEEK_MONTH_JS, SLIDER_ID, target_date.year, target_date.month, target_month)
+    if result.get('error'):
+        raise RuntimeError(f"Could not move the month slider to {target_month}: {result['error']}")
+    on_target = _wait_for_month_label(driver, target_month)
+    if result.get('changed'):
+        status = capture.wait_for_values([TABLE_ID], since, timeout=TABLE_RENDER_TIMEOUT)
+        on_target = on_target and _table_refreshed(status, target_month)
+    if not on_target:
+        return []
+
+    rows = reactable_rows(capture.values.get(TABLE_ID))
+    if rows:
+        table_data = [[row[0], _month_label(row[1])] + list(row[2:]) for row in rows]
+    else:
+        # nothing captured for the table (e.g. the page was loaded before capturing), read it from the page
+        table_data = scrape_table(driver) or []
+    log_record("extraction", country="Indonesia", chart="province_table", month=target_month, rows=len(table_data), engine="capture")
+    return table_data
+
+
+def extract_provinces(driver, max_months=None, capture=None):
+    """
+    Extract the provinces table of Indonesia for every month on the slider, latest first.
+
+    Args:
+        driver: Dashboard driver with the 'country profile' tab open.
+        max_months (int): Only extract this many months, going back from the latest (all when None).
+        capture (ShinyFrameCapture): Read each month's table from the captured websocket frames.
+
+    Returns:
+        DataFrame: Region, Date, Cases (None if the table is empty).
+    """
+    readiness = ShinyReadiness(driver)
+    select_indonesia(driver, readiness)
+
+    # Check that the table has data for the current month
+    if not scrape_table(driver):
+        logger.error("No data found. Exiting.")
+        return None
+
+    monthly_sequence = month_sequence(driver, max_months)
+
+    # Seek the slider to each month in the sequence
+    data = []
+    for target_month in monthly_sequence:
+        logger.info("Moving slider to: %s", target_month)
+        data.extend(seek_month(driver, readiness, target_month, capture))
+        logger.info("Target month '%s' completed", target_month)
+
+    return provinces_frame(data)
+
+
+def month_sequence(driver, max_months=None):
+    """Month labels on the slider ("Dec-2024", ...), latest first; only the latest max_months when given"""
+    # Locate the month display with a wait until it's visible
+    month_display = WebDriverWait(driver, 2).until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, "#c_map_month_picker_in_overview .irs-single")))
+    logger.info("Current month: %s", driver.execute_script("return arguments[0].innerText;", month_display[0]))
+
+    # Extract the start and end month text (the slider may not be at the latest month in a shared session)
+    min_month = driver.find_element(By.CSS_SELECTOR, "#c_map_month_picker_in_overview .irs-min")
+    max_month = driver.find_element(By.CSS_SELECTOR, "#c_map_month_picker_in_overview .irs-max")
+
+    # Retrieve the inner text of the start and end months using JavaScript
+    min_month_text = driver.execute_script("return arguments[0].innerText;", min_month)
+    max_month_text = driver.execute_script("return arguments[0].innerText;", max_month)
+
+    # Parse the start and end dates
+    start_date = datetime.strptime(min_month_text, "%b-%Y")
+    end_date = datetime.strptime(max_month_text, "%b-%Y")
+
+    # Generate the monthly sequence
+    current_date = end_date
+    monthly_sequence = []
+
+    while current_date >= start_date:
+        # Add the current date to the sequence in the desired format
+        monthly_sequence.append(current_date.strftime("%b-%Y"))
+        # Move to the next month
+        current_date -= relativedelta(months=1)  # Move one month backward
+
+    if max_months is not None:
+        monthly_sequence = monthly_sequence[0:max_months]
+    return monthly_sequence
+
+
+def provinces_frame(data):
+    """DataFrame (Region, Date, Cases) of the rows read from the table (extra columns are ignored)"""
+    df = pd.DataFrame([row[:3] for row in data], columns=['Region', 'Date', 'Cases'])
+    df['Cases'] = parse_cases(df['Cases'])
+
+    logger.info("Collected %d province rows", len(df))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Provinces data:\n%s", df.to_string(index=False))
+
+    return df
+
+
+def output_file_name(df):
+    """Indonesia_subnational_<first month><year>_<last month><year>.csv, e.g. Indonesia_subnational_Feb2024_Dec2024.csv"""
+    # the table shows "Dec-2024" (older files have "Jul-24")
+    dates = _parse_month_column(df['Date']).dropna()
+    if dates.empty:
+        return f"Indonesia_subnational_{datetime.now().strftime('%Y%m%d_%H%M')}.csv"
+    return f"Indonesia_subnational_{dates.min().strftime('%b%Y')}_{dates.max().strftime('%b%Y')}.csv"
+
+
+def _parse_month_column(dates):
+    """Parse "Dec-2024" / "Jul-24" month labels to timestamps (NaT if neither)"""
+    parsed = pd.to_datetime(dates, format="%b-%Y", errors='coerce')
+    return parsed.fillna(pd.to_datetime(dates, format="%b-%y", errors='coerce'))
+
+
+def reactable_rows(widget_value):
+    """
+    Rows (visible columns, in column order) of a reactable htmlwidget output value.
 
+    The table data is sent column-wise ({column: [values]}) or as a list of records.
+    """
+    attribs = (((widget_value or {}).get('x') or {}).get('tag') or {}).get('attribs') or {}
+    data = attribs.get('data') or {}
+    columns = [column['id'] for column in attribs.get('columns') or [] if column.get('show', True)]
+
+    if isinstance(data, dict):
+        columns = columns or list(data)
+        return [list(row) for row in zip(*(data[column] for column in columns))]
+    columns = columns or list(data[0]) if data else columns
+    return [[record.get(column) for column in columns] for record in data]
 
 
-# Extract the start and end month text
-min_month = driver.find_element(By.CSS_SELECTOR, "#c_map_month_picker_in_overview .irs-min")
+def slider_months(client):
+    """All months on the month slider as dates, latest first (read from the slider's data-min / data-max)"""
+    attributes = client.input_attributes(SLIDER_ID)
+    if 'data-min' not in attributes or 'data-max' not in attributes:
+        raise RuntimeError(f"Month slider {SLIDER_ID} not found in the app HTML")
 
-# Retrieve the inner text of the start and end months using JavaScript
-min_month_text = driver.execute_script("return arguments[0].innerText;", min_month)
+    # date sliders store UTC milliseconds
+    start = pd.to_datetime(float(attributes['data-min']), unit='ms')
+    end = pd.to_datetime(float(attributes['data-max']), unit='ms')
+    months = []
+    current = end
+    while current >= start:
+        months.append(current)
+        current -= relativedelta(months=1)
+    return months
 
-# Parse the start and end dates
-start_date = datetime.strptime(min_month_text, "%b-%Y")
-end_date = datetime.strptime(max_month_text, "%b-%Y")
 
-# Generate the monthly sequence
-current_date = end_date
-monthly_sequence = []
+def backfill(app_url=DASHBOARD_URL):
+    """
+    Extract the provinces table of every month on the slider without a browser.
 
-while current_date >= start_date:
-    # Add the current date to the sequence in the desired format
-    monthly_sequence.append(current_date.strftime("%b-%Y"))
-    # Move to the next month
-    current_date -= relativedelta(months=1)  # Move one month backward
-
-monthly_sequence = monthly_sequence[0:11]
-
-
-
-# Move the slider for each month in the sequence
-for target_month in monthly_sequence:
-    print(f"Moving slider to: {target_month}")
-    move_slider_left_until_target_month(target_month)
-    print(f"Target month '{target_month}' completed")
-
-
-# Create a DataFrame from the extracted data
-df = pd.DataFrame(data, columns=['Region', 'Date', 'Cases'])
-
-# Print the DataFrame
-print(df)
-
-df.to_csv("C:/Users/AhyoungLim/Dropbox/WORK/OpenDengue/SEARO-crawler/output/Indonesia_subnational_Feb2024_Dec2024.csv", index=False)
+    Each month is one Shiny input update on the websocket; the table comes back as the reactable
+    widget's JSON, so nothing is rendered.
+
+    Returns:
+        DataFrame: Region, Date, Cases for all months (None if nothing was received).
+    """
+    client = ShinyClient(app_url, output_ids=[TABLE_ID])
+    client.connect()
+    try:
+        client.select("c_country_selection", "Indonesia")
+
+        data = []
+        for month in slider_months(client):
+            month_label = month.strftime("%b-%Y")
+            updated = client.set_inputs({f"{SLIDER_ID}:shiny.date": month.strftime("%Y-%m-%d")})
+            if TABLE_ID in client.errors:
+                logger.warning("%s: table error %s", month_label, client.errors[TABLE_ID])
+                continue
+            if TABLE_ID not in updated:
+                logger.warning("%s: table not updated", month_label)
+                continue
+
+            rows = [[row[0], _month_label(row[1])] + list(row[2:]) for row in reactable_rows(client.values.get(TABLE_ID))]
+            log_record("extraction", country="Indonesia", chart="province_table", month=month_label, rows=len(rows), engine="shiny")
+            data.extend(rows)
+    finally:
+        client.close()
+
+    if not data:
+        return None
+
+    df = pd.DataFrame([row[:3] for row in data], columns=['Region', 'Date', 'Cases'])
+    df['Cases'] = parse_cases(df['Cases'])
+    return df
+
+
+def consolidate(frames):
+    """
+    Merge province-month frames into one dataset: empty rows dropped, months written as "Dec-2024",
+    one row per (Region, Date), later frames taking precedence.
+    """
+    df = pd.concat([frame[['Region', 'Date', 'Cases']] for frame in frames], ignore_index=True)
+    df = df.dropna(subset=['Region'])
+    months = _parse_month_column(df['Date'])
+    df = df[months.notna()].assign(Date=months[months.notna()].dt.strftime("%b-%Y"), _month=months[months.notna()])
+    df['Cases'] = parse_cases(df['Cases'])
+
+    df = df.drop_duplicates(subset=['Region', 'Date'], keep='last')
+    return df.sort_values(['_month', 'Region'], kind='stable').drop(columns='_month').reset_index(drop=True)
+
+
+def run_backfill(output_directory, app_url=DASHBOARD_URL, include_existing=True):
+    """
+    Backfill every month and write the consolidated dataset (CONSOLIDATED_FILE in output_directory).
+
+    Args:
+        output_directory (str): Folder with the earlier Indonesia_subnational_*.csv files.
+        app_url (str): Shiny app URL.
+        include_existing (bool): Merge the earlier files too (the backfill wins where both have a month).
+
+    Returns:
+        str: Path of the consolidated file, or None if there was no data.
+    """
+    frames = []
+    if include_existing:
+        for file_name in sorted(os.listdir(output_directory)):
+            if file_name.startswith("Indonesia_subnational_") and file_name.endswith(".csv") and file_name != CONSOLIDATED_FILE:
+                frames.append(pd.read_csv(os.path.join(output_directory, file_name), dtype=str))
+        # order the earlier files by their last month, so newer files take precedence
+        frames.sort(key=lambda frame: _parse_month_column(frame['Date']).max())
+
+    backfilled = backfill(app_url)
+    if backfilled is not None:
+        frames.append(backfilled)
+    if not frames:
+        return None
+
+    df = consolidate(frames)
+    output_file = os.path.join(output_directory, CONSOLIDATED_FILE)
+    df.to_csv(output_file, index=False)
+    logger.info("Consolidated %d province-month rows (%s to %s) to: %s", len(df), df['Date'].iloc[0], df['Date'].iloc[-1], output_file)
+    return output_file
+
+
+def save_provinces(df, output_directory):
+    """Write the provinces data to output_directory (see output_file_name); returns the file path"""
+    output_file = os.path.join(output_directory, output_file_name(df))
+    df.to_csv(output_file, index=False)
+    logger.info("Saved to: %s", output_file)
+    return output_file
+
+
+def run(session=None, output_directory=None, max_months=None):
+    """
+    Extract the Indonesia provinces data and save it to the output folder.
+
+    Args:
+        session (BrowserSession): Shared browser session; a new (visible) browser is launched when None.
+        output_directory (str): Folder for the CSV file (the session's download directory by default).
+        max_months (int): Number of months to extract (all months on the slider when None).
+
+    Returns:
+        str: Path of the saved file, or None if no data was found.
+    """
+    own_session = None
+    if session is None:
+        session = own_session = BrowserSession(output_directory or os.getcwd(), headless=False)
 
-driver.quit()
+    try:
+        df = extract_provinces(session.start().driver, max_months, session.capture)
+        if df is None:
+            return None
+
+        return save_provinces(df, output_directory or session.download_directory)
+    finally:
+        if own_session is not None:
+            own_session.close()
+
+
+if __name__ == "__main__":
+    output_directory = os.path.join(os.getcwd(), "output")
+    if "--backfill" in sys.argv[1:]:
+        # every month at once over the Shiny websocket, merged with the earlier files
+        sys.exit(0 if run_backfill(output_directory) else 1)
+    sys.exit(0 if run(output_directory=output_directory) else 1)
@@ -1,143 +1,141 @@
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
+import os
+import time
 import re
 from datetime import datetime
-import time
-from io import StringIO
-import os
 import sys
 
-# Function to fetch the date paragraph
-def fetch_date_paragraph(url, max_attempts=3, wait_time=20):
-    attempt = 0
-    while attempt < max_attempts:
-        try:
-            # Fetch the webpage
-            response = requests.get(url)
-            response.raise_for_status()  # Raise an exception for bad status codes
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            # Select the paragraph containing the date
-            date_paragraph = soup.find('p', string=lambda t: t and "Data as of" in t)
-            if date_paragraph:
-                return date_paragraph.get_text(strip=True)
-            else:
-                print(f"Attempt {attempt + 1}: 'Data as of' paragraph not found. Retrying...")
-        except Exception as e:
-            print(f"Attempt {attempt + 1}: Encountered an error: {e}. Retrying...")
-
-        attempt += 1
-        if attempt < max_attempts:
-            time.sleep(wait_time)  # Wait before retrying
-
-    # If all attempts fail, raise an exception or return None
-    print("Maximum attempts reached. Failed to fetch the 'Data as of' paragraph.")
-    return None
+from scrape_logging import get_logger, log_record
+from report_probe import fetch_date_paragraph
+from run_state import SCRAPE_FAILED, SCRAPE_SUCCESS, RunState
 
-# URL of the webpage
-url = "https://worldhealthorg.shinyapps.io/searo-dengue-dashboard/#"
+logger = get_logger("main")
 
-# Fetch the date paragraph
-date_paragraph = fetch_date_paragraph(url)
-if not date_paragraph:
-    print("Failed to fetch the paragraph after maximum retries.")
-    sys.exit(1)
+# Start-up budget for the no-update path (interpreter start + stdlib + requests); pandas/selenium must not
+# creep back in here
+STARTUP_BUDGET_SECONDS = 0.5
 
-print(f"Successfully fetched paragraph: {date_paragraph}")
 
-# Define a regular expression pattern to match the date after "Data reported as of"
-pattern = r"\d{1,2}\s+[A-Za-z]+\s+\d{4}"
-match = re.search(pattern, date_paragraph)
-
-if not match:
-    print("No date pattern found in the paragraph.")
-    sys.exit(1)
-
-# Extract the matched date
-date_string = match.group()
-# Parse the input date string into a datetime object
-date_string = datetime.strptime(date_string, "%d %b %Y")
-# Format the datetime object into the desired format
-formatted_date = date_string.strftime("%Y-%m-%d")
-
-print(f"Extracted Date: {formatted_date}")
-
-# Create a new DataFrame with today's date and the extracted report date
-now = datetime.now() # current date and time
-
-table = [{'Sys_date': now.strftime('%Y-%m-%d %H:%M'), 'Report_date': formatted_date}]
-df_current = pd.DataFrame(table)
-print(df_current)
-
-# Append the new data to the existing CSV file
-# Use GitHub token from environment variable
-token = os.getenv('GITHUB_TOKEN')
-if not token:
-    print("GitHub token not found in environment variables")
-    sys.exit(1)
-
-headers = {'Authorization': f'token {token}'}
-
-response = requests.get("https://raw.githubusercontent.com/DengueGlobalObservatory/SEARO-crawler/refs/heads/main/report_date.csv", headers=headers)
-
-if response.status_code == 200:
-    # Read the CSV content into a DataFrame
-    csv_content = StringIO(response.text)
-    df_main_old = pd.read_csv(csv_content)
-    print("Existing data loaded:")
-    print(df_main_old.head())
+def process_uptime():
+    """
+    Seconds since this process started, interpreter start-up and imports included.
+
+    Read from /proc on Linux (10ms resolution); elsewhere the CPU time used so far, which leaves out I/O waits.
+    """
+    try:
+        with open("/proc/self/stat") as handle:
+            # the fields after the command name; the start time (in clock ticks since boot) is field 22
+            start_ticks = int(handle.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as handle:
+            uptime = float(handle.read().split()[0])
+        return max(uptime - start_ticks / os.sysconf("SC_CLK_TCK"), 0.0)
+    except (OSError, ValueError, IndexError):
+        return time.process_time()
+
+
+startup_seconds = process_uptime()
+if startup_seconds > STARTUP_BUDGET_SECONDS:
+    logger.warning("Start-up took %.2fs (budget %.2fs)", startup_seconds, STARTUP_BUDGET_SECONDS)
 else:
-    print(f"Failed to fetch data. Status code: {response.status_code}")
-    # Create empty DataFrame if file doesn't exist
-    df_main_old = pd.DataFrame(columns=['Sys_date', 'Report_date'])
+    logger.debug("Start-up took %.2fs", startup_seconds)
 
-df_main_new = pd.concat([df_main_old, df_current], ignore_index=True)
+# URL of the webpage
+url = "https://worldhealthorg.shinyapps.io/searo-dengue-dashboard/#"
 
-# Save to CSV file
-df_main_new.to_csv("report_date.csv", index=False)
+# Define a regular expression pattern to match the date after "Data reported as of"
+pattern = re.compile(r"\d{1,2}\s+[A-Za-z]+\s+\d{4}")
+
+
+def fetch_report_date(url=url):
+    """
+    Fetch the dashboard's report date.
+
+    Returns:
+        str: The report date as YYYY-MM-DD, or None if it could not be fetched or parsed.
+    """
+    # Fetch the date paragraph (conditional request, cached validators in report_probe_cache.json)
+    date_paragraph = fetch_date_paragraph(url)
+    if not date_paragraph:
+        logger.error("Failed to fetch the paragraph after maximum retries.")
+        return None
+
+    logger.info("Successfully fetched paragraph: %s", date_paragraph)
+
+    match = pattern.search(date_paragraph)
+    if not match:
+        logger.error("No date pattern found in the paragraph.")
+        return None
+
+    # Extract the matched date
+    date_string = match.group()
+    # Parse the input date string into a datetime object
+    date_string = datetime.strptime(date_string, "%d %b %Y")
+    # Format the datetime object into the desired format
+    formatted_date = date_string.strftime("%Y-%m-%d")
+
+    logger.info("Extracted Date: %s", formatted_date)
+    log_record("report_date", report_date=formatted_date)
+    return formatted_date
+
+
+def check_for_update(state, formatted_date):
+    """
+    Compare with the report date of the last successful scrape, then record this check
+    (a failed scrape is retried on the next run even if the report date did not change again).
+
+    Returns:
+        bool: True if the data should be scraped.
+    """
+    latest = state.latest_report_dates(1)
+    if not latest:
+        logger.info("No previous report date recorded. Running scraper...")
+        should_scrape = True
+    elif state.has_changed_since_last_success(formatted_date):
+        logger.info("Data has been updated. Start data scraping...")
+        should_scrape = True
+    else:
+        logger.info("No data updates")
+        should_scrape = False
 
-# Convert date columns to datetime
-df_main_new['Sys_date'] = pd.to_datetime(df_main_new['Sys_date'], format='%Y-%m-%d %H:%M')
-df_main_new['Report_date'] = pd.to_datetime(df_main_new['Report_date'], format='%Y-%m-%d')
+    state.record_check(formatted_date)
+    return should_scrape
 
-# Sort by system date
-df_main_new = df_main_new.sort_values(by='Sys_date', ascending=False)
 
-# Check if we have at least 2 entries
-if len(df_main_new) < 2:
-    print("Not enough data to compare dates. Running scraper...")
-    should_scrape = True
-else:
-    last_report_date = df_main_new['Report_date'].iloc[0]
-    second_last_date = df_main_new['Report_date'].iloc[1]
+def main():
+    formatted_date = fetch_report_date(url)
+    if formatted_date is None:
+        return 1
 
-    if last_report_date == second_last_date:
-        print("No data updates")
-        should_scrape = False
-    else:
-        print("Data has been updated. Start data scraping...")
-        should_scrape = True
+    state = RunState()
+    # If the date has been updated then run Selenium and download data
+    if not check_for_update(state, formatted_date):
+        return 0
 
-# If the date has been updated then run Selenium and download data
-if should_scrape:
     try:
-        # Check if the scraper file exists
-        scraper_path = "scraper/SEARO_national_selenium_run.py"
+        # Imported only now: pandas, selenium etc. are not needed when there is no update
         # this will extract data from the bart chart (Total cases in General Overview section) and line chart (cases by month in "Trend overview")
-        if not os.path.exists(scraper_path):
-            print(f"Scraper file not found at: {scraper_path}")
-            print(f"Current working directory: {os.getcwd()}")
-            print(f"Files in current directory: {os.listdir('.')}")
-            if os.path.exists('scraper'):
-                print(f"Files in scraper directory: {os.listdir('scraper')}")
-            sys.exit(1)
-
-        import runpy
-        print(f"Running scraper from: {scraper_path}")
-        runpy.run_path(scraper_path)
-        print("Scraper completed successfully")
+        import_start = time.perf_counter()
+        import SEARO_national_selenium_run as national_scraper
+        logger.debug("National scraper imported in %.2fs", time.perf_counter() - import_start)
+
+        logger.info("Running national scraper")
+        status = national_scraper.run(run_key=formatted_date)
+        if status == SCRAPE_FAILED:
+            raise RuntimeError("national scraper did not extract any data")
+        if status == SCRAPE_SUCCESS:
+            logger.info("Scraper completed successfully")
+        else:
+            # not recorded as a success, so the next run scrapes this report date again and resumes the checkpoint
+            logger.error("Scraper did not extract every country, the next run resumes it")
+        state.record_scrape(formatted_date, status)
+        log_record("scrape", status=status, report_date=formatted_date)
+        return 0 if status == SCRAPE_SUCCESS else 1
 
     except Exception as e:
-        print(f"Error running scraper: {e}")
-        sys.exit(1)
+        logger.error("Error running scraper: %s", e)
+        log_record("scrape", status=SCRAPE_FAILED, report_date=formatted_date, error=str(e))
+        state.record_scrape(formatted_date, SCRAPE_FAILED)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,87 +2,296 @@
 # some countries report "total cases" in bar chart only (e.g., Bhutan, Maldives) but line chart often has more historical data
 # so extract data from both chart types
 
+import numpy as np
 import pandas as pd
-import time
 from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, JavascriptException, NoSuchElementException
-import undetected_chromedriver as uc
+from selenium.common.exceptions import JavascriptException, NoSuchElementException, WebDriverException
 import os
 from datetime import datetime
-import subprocess
 import re
 import sys
-
-def get_chrome_version():
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from shiny_client import ShinyClient, DASHBOARD_URL
+from shiny_capture import ShinyFrameCapture
+from browser_session import BrowserSession, browser_rss, create_driver, open_country_profile, open_dashboard_tab, selected_country
+from checkpoint import CHARTS, DEFAULT_CHECKPOINT_FILE, RunCheckpoint
+from readiness import ShinyReadiness, StaleOutputError, RENDER_TIMEOUT, stale_outputs
+from scrape_logging import get_logger, log_record
+from delta_store import DeltaStore, DEFAULT_STORE_FILE
+from parquet_writer import write_parquet
+from fingerprints import DEFAULT_FINGERPRINT_FILE, load_fingerprints, save_fingerprints, compare_fingerprints
+from run_state import SCRAPE_FAILED, SCRAPE_INCOMPLETE, SCRAPE_SUCCESS
+
+logger = get_logger("national")
+
+# Attempts per country before its missing charts are left for a rerun
+RETRY_ATTEMPTS = 3
+
+COUNTRIES = [
+    "India", "Maldives", "Myanmar", "Nepal", "Indonesia",
+    "Thailand", "Sri Lanka", "Timor-Leste", "Bangladesh", "Bhutan"
+]
+
+# Country extracted by the preflight probe (debug_first_country); Bangladesh is the one shown on load
+PREFLIGHT_COUNTRY = "Bangladesh"
+
+# Numeric parsing shared by the chart converter and the tooltip parser
+_NUMBER_PATTERN = re.compile(r'[\d.]+')
+
+
+def _parse_float(value):
+    """float() with the converter's cleaning: strings are stripped and commas removed; None or unparseable -> 0.0"""
+    if value is None:
+        return 0.0
+    if isinstance(value, str):
+        value = value.strip().replace(',', '')
     try:
-        if sys.platform == "win32":
-            # Command to retrieve Chrome version from Windows registry
-            output = subprocess.check_output(
-                r'reg query "HKEY_CURRENT_USER\Software\Google\Chrome\BLBeacon" /v version',
-                shell=True,
-                text=True
-            )
-            version = re.search(r'\s+version\s+REG_SZ\s+(\d+)\.', output)
-        else:  # Assuming Linux or other Unix-like systems
-            # Try different commands to retrieve Chrome version on Linux
-            for command in ['google-chrome --version', 'google-chrome-stable --version', 'chromium-browser --version']:
-                try:
-                    output = subprocess.check_output(command, shell=True, text=True)
-                    version = re.search(r'\b(\d+)\.', output)
-                    if version:
-                        break
-                except subprocess.CalledProcessError:
-                    continue
-            else:
-                raise RuntimeError("Could not determine Chrome version")
+        return float(value)
+    except (ValueError, TypeError):
+        return 0.0
 
-        if version:
-            return int(version.group(1))
-        else:
-            raise ValueError("Could not parse Chrome version")
-    except Exception as e:
-        raise RuntimeError("Failed to get Chrome version") from e
-
-# Get the major version of Chrome installed
-chrome_version = get_chrome_version()
 
-# Set the download directory to the GitHub repository folder
-github_workspace = os.getenv('GITHUB_WORKSPACE')
-download_directory = os.path.join(github_workspace, 'output')
+def _object_array(values):
+    """1-D object array (lists and dicts are kept as elements)"""
+    array = np.empty(len(values), dtype=object)
+    array[:] = list(values)
+    return array
 
-prefs = {"download.default_directory": download_directory,}
 
-# set chrome download directory
-chrome_options = uc.ChromeOptions()
-chrome_options.add_experimental_option("prefs", prefs)
+def _type_mask(values, types):
+    """Boolean array: which values are instances of types"""
+    return np.fromiter((isinstance(value, types) for value in values), dtype=bool, count=len(values))
 
-driver = uc.Chrome(headless=True, use_subprocess=False, options = chrome_options, version_main=chrome_version)
-driver.get('https://worldhealthorg.shinyapps.io/searo-dengue-dashboard/#')
 
-print(driver.title)
-time.sleep(5)
+def _normalize_points(points):
+    """
+    Reduce the ECharts point shapes to one raw value per point, column-wise:
+    scalar -> itself, [x, y] -> y ([v] -> v, [] -> 0),
+    {'value': [x, y]} -> y, {'value': v} or {'y': v} -> v.
+    """
+    values = _object_array(points)
+    is_dict = _type_mask(values, dict)
+    is_array = _type_mask(values, (list, tuple))
+
+    if is_array.any():
+        arrays = values[is_array]
+        lengths = np.fromiter(map(len, arrays), dtype=int, count=len(arrays))
+        unpacked = np.zeros(len(arrays), dtype=object)
+        unpacked[lengths >= 2] = _object_array([array[1] for array in arrays[lengths >= 2]])
+        unpacked[lengths == 1] = _object_array([array[0] for array in arrays[lengths == 1]])
+        values[is_array] = unpacked
+
+    if is_dict.any():
+        # e.g. the bar chart's {'value': ['Jan-2024', ' 1055']}
+        inner = _object_array([point.get('value', point.get('y', 0)) for point in values[is_dict]])
+        is_pair = _type_mask(inner, (list, tuple))
+        is_pair[is_pair] = np.fromiter(map(len, inner[is_pair]), dtype=int, count=int(is_pair.sum())) >= 2
+        inner[is_pair] = _object_array([pair[1] for pair in inner[is_pair]])
+        values[is_dict] = inner
+
+    return pd.Series(values, dtype=object)
+
+
+def _points_to_float(values):
+    """
+    Parse the normalized point values to float in bulk, with the same result as _parse_float
+    per value (so 'NaN' stays NaN and is dropped later, unparseable values become 0.0).
+    """
+    is_none = np.fromiter((value is None for value in values), dtype=bool, count=len(values))
+    is_str = _type_mask(values, str)
+
+    cleaned = values
+    if is_str.any():
+        cleaned = values.where(~is_str, values[is_str].str.strip().str.replace(',', '', regex=False))
+    numbers = pd.to_numeric(cleaned, errors='coerce').astype(float)
+    numbers[is_none] = 0.0
+
+    # anything pandas could not parse goes through float() itself (NaN literals, odd formats)
+    retry = numbers.isna().to_numpy() & ~is_none
+    if retry.any():
+        numbers[retry] = [_parse_float(value) for value in cleaned[retry]]
+
+    return numbers
+
+# Reads availability, structure diagnostics and option data for any number of charts in one call.
+# arguments[0]: {chartId: chartType}; returns {chartId: result} ({success, xAxis, series, chartType} or {error})
+HARVEST_CHARTS_JS = """
+var charts = arguments[0];
+var results = {};
+
+Object.keys(charts).forEach(function(chartId) {
+    var entry = {chartId: chartId, chartType: charts[chartId], available: false};
+    results[chartId] = entry;
+
+    try {
+        var chartElement = document.getElementById(chartId);
+        if (!chartElement) {
+            entry.error = "Chart element not found";
+            return;
+        }
+
+        var rect = chartElement.getBoundingClientRect();
+        entry.displayed = chartElement.offsetParent !== null && rect.width > 0 && rect.height > 0;
+        if (!entry.displayed) {
+            // the chart might be in a section that is out of view
+            chartElement.scrollIntoView();
+            rect = chartElement.getBoundingClientRect();
+            entry.displayed = chartElement.offsetParent !== null && rect.width > 0 && rect.height > 0;
+        }
+        entry.size = {width: Math.round(rect.width), height: Math.round(rect.height)};
+
+        var echartsInstance = (typeof echarts !== 'undefined') ? echarts.getInstanceByDom(chartElement) : null;
+        if (!echartsInstance) {
+            entry.error = "ECharts instance not found";
+            return;
+        }
+
+        var option = echartsInstance.getOption();
+        if (!option) {
+            entry.error = "ECharts option not available";
+            return;
+        }
+
+        entry.available = true;
+        entry.success = true;
+        entry.xAxisCount = option.xAxis ? option.xAxis.length : 0;
+        entry.xAxisType = (option.xAxis && option.xAxis[0]) ? option.xAxis[0].type : null;
+        entry.xAxis = (option.xAxis && option.xAxis[0] && option.xAxis[0].data) ? option.xAxis[0].data : [];
+        entry.series = (option.series || []).map(function(series, index) {
+            return {
+                name: series.name || 'Series_' + index,
+                data: series.data || [],
+                type: series.type || 'unknown',
+                dataLength: series.data ? series.data.length : 0
+            };
+        });
+    } catch (error) {
+        entry.error = "JavaScript execution error: " + error.message;
+    }
+});
+
+return results;
+"""
+
+# Shows the tooltip of every data index of a chart through ECharts itself and collects the tooltip texts.
+# With an 'axis' trigger one tooltip covers all series at an index, otherwise every series is swept.
+# Points without a tooltip for their data index are shown at their pixel position (convertToPixel) instead.
+# arguments[0]: chart ID; returns {trigger, tooltips: [text, ...]} or {error}
+TOOLTIP_SWEEP_JS = """
+var chartElement = document.getElementById(arguments[0]);
+var chart = (chartElement && typeof echarts !== 'undefined') ? echarts.getInstanceByDom(chartElement) : null;
+if (!chart) {
+    return {error: chartElement ? "ECharts instance not found" : "Chart element not found"};
+}
+
+try {
+    var option = chart.getOption();
+    var tooltipOption = (option.tooltip && option.tooltip[0]) || {};
+    var trigger = tooltipOption.trigger || 'item';
+    var series = option.series || [];
+    var axisLength = (option.xAxis && option.xAxis[0] && option.xAxis[0].data) ? option.xAxis[0].data.length : 0;
+
+    // show tooltips immediately, without transitions
+    chart.setOption({tooltip: {showDelay: 0, hideDelay: 0, transitionDuration: 0}});
+
+    function tooltipText() {
+        // the HTML tooltip is a div next to the canvas/svg container
+        var children = chartElement.children;
+        for (var i = children.length - 1; i >= 0; i--) {
+            var child = children[i];
+            if (child.tagName === 'DIV' && !child.querySelector('canvas, svg') && child.style.display !== 'none') {
+                var text = (child.innerText || '').trim();
+                if (text) {
+                    return text;
+                }
+            }
+        }
+        return '';
+    }
+
+    function show(payload) {
+        chart.dispatchAction({type: 'hideTip'});
+        chart.dispatchAction(payload);
+        return tooltipText();
+    }
+
+    function sweep(seriesIndex) {
+        var data = series[seriesIndex].data || [];
+        var length = Math.max(data.length, trigger === 'axis' ? axisLength : 0);
+        for (var dataIndex = 0; dataIndex < length; dataIndex++) {
+            var text = show({type: 'showTip', seriesIndex: seriesIndex, dataIndex: dataIndex});
+            if (!text) {
+                var point = data[dataIndex];
+                var value = (point !== null && typeof point === 'object' && !Array.isArray(point)) ? point.value : point;
+                var pixel = chart.convertToPixel({seriesIndex: seriesIndex}, [dataIndex, Array.isArray(value) ? value[value.length - 1] : value]);
+                if (pixel) {
+                    text = show({type: 'showTip', x: pixel[0], y: pixel[1]});
+                }
+            }
+            tooltips.push(text);
+        }
+    }
+
+    var tooltips = [];
+    if (trigger === 'axis') {
+        if (series.length) {
+            sweep(0);
+        }
+    } else {
+        for (var seriesIndex = 0; seriesIndex < series.length; seriesIndex++) {
+            sweep(seriesIndex);
+        }
+    }
+    chart.dispatchAction({type: 'hideTip'});
+
+    return {trigger: trigger, tooltips: tooltips};
+} catch (error) {
+    return {error: "JavaScript execution error: " + error.message};
+}
+"""
+
+
+class ExtractionCancelled(RuntimeError):
+    """Raised by an extractor whose caller has given up on it (CountryDataExtractor.cancelled)"""
 
-# click the side panel ('country profile')
-side_panel = WebDriverWait(driver, 20).until(
-    EC.element_to_be_clickable((By.ID, "tab-sidebar_country_profile"))
-)
-driver.execute_script("arguments[0].scrollIntoView();", side_panel)
-driver.execute_script("arguments[0].click();", side_panel)
 
 class CountryDataExtractor:
     """
     Enhanced country data extractor with separate line chart and bar chart extraction
+
+    Three engines are supported: "selenium" reads the charts from a browser session (driver),
+    "shiny" reads the chart outputs straight from the Shiny websocket (shiny_client), without a browser,
+    and "capture" drives the browser but reads the outputs from its captured websocket frames (capture).
     """
 
-    def __init__(self, driver, line_chart_id="c_trend_cases_country_month_out", bar_chart_id="c_total_case_evolution"):
+    def __init__(self, driver, line_chart_id="c_trend_cases_country_month_out", bar_chart_id="c_total_case_evolution", shiny_client=None,
+                 capture=None):
         self.driver = driver
         self.line_chart_id = line_chart_id
         self.bar_chart_id = bar_chart_id
+        self.shiny_client = shiny_client
+        self.capture = capture
+        self.engine = "shiny" if shiny_client is not None else "capture" if capture is not None else "selenium"
+        # Where chart outputs are read from without touching the page (None: from the rendered charts)
+        self.output_source = shiny_client if shiny_client is not None else capture
+        self.readiness = ShinyReadiness(driver) if driver is not None else None
+        # Frames already extracted for a country (e.g. by the preflight probe), reused by extract_data_for_countries
+        self._cache = {}
+        # Completed (country, chart) units of the current run, and how to replace a crashed browser
+        self.checkpoint = None
+        self.driver_factory = None
+        self.max_attempts = RETRY_ATTEMPTS
+        self._replacement_drivers = []
+        # Set when the caller gave up on this extractor (e.g. a missed deadline): no further attempts,
+        # browser launches or checkpoint writes
+        self.cancelled = threading.Event()
 
     def select_country(self, country_name):
         """
@@ -91,7 +300,33 @@ class CountryDataExtractor:
         Args:
             country_name (str): The name of the country to select from the dropdown menu.
         """
-        print(f"Selecting country: {country_name}")
+        logger.info("Selecting country: %s", country_name)
+
+        if self.engine == "shiny":
+            updated = self.shiny_client.select("c_country_selection", country_name)
+            logger.debug("Shiny outputs updated: %s", ", ".join(sorted(updated)) or "none")
+            return
+
+        self._finish_country_selection(self._start_country_selection(country_name))
+
+    def _start_country_selection(self, country_name):
+        """
+        Pick the country in the dropdown without waiting for the charts.
+
+        Returns:
+            The chart state before the change, for _finish_country_selection (None if already selected).
+        """
+        # Nothing will re-render if the country is already selected
+        if selected_country(self.driver) == country_name:
+            logger.info("%s is already selected", country_name)
+            return None
+
+        # Record the chart state so we can tell when the new country's charts have rendered
+        # (or, when capturing, when their new values have arrived)
+        if self.engine == "capture":
+            before = self.capture.mark()
+        else:
+            before = self.readiness.mark([self.line_chart_id, self.bar_chart_id])
 
         # Open the country dropdown menu
         country_filter = WebDriverWait(self.driver, 10).until(
@@ -109,447 +344,226 @@ class CountryDataExtractor:
         )
         self.driver.execute_script("arguments[0].scrollIntoView();", country_filter)
         self.driver.execute_script("arguments[0].click();", country_filter)
+        return before
 
-        # Wait for the page to load and chart to update after selecting the country
-        time.sleep(5)  # Increased wait time
-
-        # Check if both charts are available
-        self._check_chart_availability()
-
-        # Wait for both charts to be ready
-        self._wait_for_chart_update(self.line_chart_id)
-        self._wait_for_chart_update(self.bar_chart_id)
-
-    def _check_chart_availability(self):
-        """Check if both charts are available and visible"""
-        print("Checking chart availability...")
+    def _finish_country_selection(self, before):
+        """
+        Wait for both charts to receive the new country's data and re-render.
 
-        # Check line chart
-        try:
-            line_element = self.driver.find_element(By.ID, self.line_chart_id)
-            print(f"✅ Line chart found: visible={line_element.is_displayed()}, size={line_element.size}")
-        except NoSuchElementException:
-            print(f"❌ Line chart element '{self.line_chart_id}' not found!")
+        Raises:
+            StaleOutputError: A chart still shows the previous country (the extraction is then retried).
+        """
+        if before is None:
+            self.readiness.wait_for_idle()
+            return
 
-        # Check bar chart
-        try:
-            bar_element = self.driver.find_element(By.ID, self.bar_chart_id)
-            print(f"✅ Bar chart found: visible={bar_element.is_displayed()}, size={bar_element.size}")
-
-            # Check if bar chart might be in a different tab or section
-            if not bar_element.is_displayed():
-                print("Bar chart not visible, checking if it's in a different section...")
-                # Try to scroll to it
-                self.driver.execute_script("arguments[0].scrollIntoView();", bar_element)
-                time.sleep(2)
-                print(f"After scroll - Bar chart visible: {bar_element.is_displayed()}")
-
-        except NoSuchElementException:
-            print(f"❌ Bar chart element '{self.bar_chart_id}' not found!")
-
-            # Try to find any charts with similar IDs
-            all_charts = self.driver.find_elements(By.CSS_SELECTOR, "[id*='chart'], [id*='total'], [id*='case']")
-            print(f"Found {len(all_charts)} potential chart elements:")
-            for chart in all_charts[:10]:  # Show first 10
-                print(f"  - ID: {chart.get_attribute('id')}, Class: {chart.get_attribute('class')}")
+        if self.engine == "capture":
+            status = self.capture.wait_for_values([self.line_chart_id, self.bar_chart_id], before, timeout=RENDER_TIMEOUT)
+        else:
+            status = self.readiness.wait_for_render([self.line_chart_id, self.bar_chart_id], before, timeout=RENDER_TIMEOUT)
+        stale = stale_outputs(status)
+        if stale:
+            raise StaleOutputError(f"{', '.join(stale)} not updated for the new country")
 
     def check_page_structure(self):
         """Debug method to check the overall page structure"""
-        print("\n--- Checking page structure for charts ---")
+        logger.debug("Checking page structure for charts")
 
         # Look for all ECharts elements
         echarts_elements = self.driver.find_elements(By.CSS_SELECTOR, ".echarts4r, [class*='echarts'], [id*='chart']")
-        print(f"Found {len(echarts_elements)} potential ECharts elements:")
+        logger.debug("Found %d potential ECharts elements:", len(echarts_elements))
 
         for i, element in enumerate(echarts_elements):
             element_id = element.get_attribute('id')
             element_class = element.get_attribute('class')
             is_visible = element.is_displayed()
             size = element.size
-            print(f"  {i+1}. ID: {element_id}, Class: {element_class}, Visible: {is_visible}, Size: {size}")
+            logger.debug("  %d. ID: %s, Class: %s, Visible: %s, Size: %s", i + 1, element_id, element_class, is_visible, size)
 
         # Check if we need to navigate to a different tab or section
         tabs = self.driver.find_elements(By.CSS_SELECTOR, "[role='tab'], .nav-link, .tab-pane")
         if tabs:
-            print(f"\nFound {len(tabs)} potential tab elements:")
+            logger.debug("Found %d potential tab elements:", len(tabs))
             for i, tab in enumerate(tabs[:5]):
                 tab_text = tab.text.strip()
                 tab_id = tab.get_attribute('id')
                 is_active = 'active' in tab.get_attribute('class') if tab.get_attribute('class') else False
-                print(f"  {i+1}. Text: '{tab_text}', ID: {tab_id}, Active: {is_active}")
+                logger.debug("  %d. Text: '%s', ID: %s, Active: %s", i + 1, tab_text, tab_id, is_active)
 
-    def _wait_for_chart_update(self, chart_id):
-        """Wait for the ECharts to update after country selection"""
-        try:
-            WebDriverWait(self.driver, 15).until(
-                EC.presence_of_element_located((By.ID, chart_id))
-            )
-            # Additional wait for ECharts to re-render
-            time.sleep(2)
-
-            # Verify ECharts instance is available
-            echarts_ready = self.driver.execute_script("""
-                var element = document.getElementById(arguments[0]);
-                if (!element) return false;
-                var instance = echarts.getInstanceByDom(element);
-                return instance !== null && instance !== undefined;
-            """, chart_id)
-
-            if not echarts_ready:
-                print(f"Warning: ECharts instance not ready for {chart_id}, will attempt extraction anyway")
-
-        except TimeoutException:
-            print(f"Warning: Chart element '{chart_id}' not found, continuing anyway")
-
-    def extract_echarts_data_direct(self, chart_id, chart_type="line"):
-        """
-        Extract data directly from ECharts instance - Enhanced for bar charts
-        """
-        print(f"Attempting direct ECharts data extraction for {chart_type} chart...")
-
-        js_code = f"""
-        try {{
-            // Get the chart element
-            var chartElement = document.getElementById('{chart_id}');
-            if (!chartElement) {{
-                return {{error: "Chart element not found"}};
-            }}
-
-            // Get ECharts instance
-            var echartsInstance = echarts.getInstanceByDom(chartElement);
-            if (!echartsInstance) {{
-                return {{error: "ECharts instance not found"}};
-            }}
-
-            // Get the complete option object
-            var option = echartsInstance.getOption();
-            if (!option) {{
-                return {{error: "ECharts option not available"}};
-            }}
-
-            // Extract structured data
-            var result = {{
-                success: true,
-                xAxis: [],
-                series: [],
-                chartType: '{chart_type}'
-            }};
-
-            // Extract X-axis data (months/dates)
-            if (option.xAxis && option.xAxis[0] && option.xAxis[0].data) {{
-                result.xAxis = option.xAxis[0].data;
-            }}
-
-            // Extract series data with detailed logging
-            if (option.series) {{
-                option.series.forEach(function(series, index) {{
-                    var seriesData = {{
-                        name: series.name || 'Series_' + index,
-                        data: series.data || [],
-                        type: series.type || 'unknown',
-                        dataLength: series.data ? series.data.length : 0
-                    }};
-
-                    // Log the actual data structure for debugging
-                    console.log('Series ' + index + ':', seriesData.name, 'Type:', seriesData.type, 'Length:', seriesData.dataLength);
-                    if (seriesData.data.length > 0) {{
-                        console.log('First 3 data points:', seriesData.data.slice(0, 3));
-                    }}
-
-                    result.series.push(seriesData);
-                }});
-            }}
-
-            return result;
-
-        }} catch (error) {{
-            return {{error: "JavaScript execution error: " + error.message}};
-        }}
+    def harvest_charts(self, charts):
         """
+        Read availability, structure diagnostics and full option data for several charts
+        in a single execute_script round-trip.
 
-        try:
-            result = self.driver.execute_script(js_code)
+        Args:
+            charts (dict): Chart ID -> chart type ("line" or "bar").
 
-            if result.get('error'):
-                print(f"Direct extraction error for {chart_type}: {result['error']}")
-                return None
+        Returns:
+            dict: Chart ID -> result that can be passed to _convert_direct_result
+                  (also holds 'available', 'displayed' and 'size').
+        """
+        if self.output_source is not None:
+            return {chart_id: self.output_source.get_echarts_data(chart_id, chart_type) for chart_id, chart_type in charts.items()}
 
-            if result.get('success'):
-                print(f"Raw ECharts data for {chart_type}:")
-                print(f"  X-axis length: {len(result.get('xAxis', []))}")
-                print(f"  Series count: {len(result.get('series', []))}")
-                for i, series in enumerate(result.get('series', [])):
-                    print(f"    Series {i}: {series.get('name')} ({series.get('type')}) - {len(series.get('data', []))} points")
+        try:
+            harvest = self.driver.execute_script(HARVEST_CHARTS_JS, charts)
+        except Exception as e:
+            logger.warning("Batched chart harvest failed: %s", e)
+            return {chart_id: {'error': f"JavaScript execution failed: {e}"} for chart_id in charts}
 
-                return self._convert_echarts_to_dataframe(result, chart_type)
+        for chart_id, entry in harvest.items():
+            if entry.get('available'):
+                logger.debug("%s chart found: visible=%s, size=%s, x-axis type=%s, series=%d", entry['chartType'],
+                             entry.get('displayed'), entry.get('size'), entry.get('xAxisType'), len(entry.get('series', [])))
             else:
-                print(f"Unexpected result structure from direct extraction for {chart_type}")
-                return None
+                logger.warning("%s chart '%s' not available: %s", entry.get('chartType', chart_id), chart_id, entry.get('error'))
 
-        except Exception as e:
-            print(f"JavaScript execution failed for {chart_type}: {e}")
+        return harvest
+
+    def _convert_direct_result(self, result, chart_type="line"):
+        """Check the raw ECharts result (from the browser or the Shiny websocket) and convert it to a DataFrame"""
+        if result.get('error'):
+            logger.warning("Direct extraction error for %s: %s", chart_type, result['error'])
+            return None
+
+        if result.get('success'):
+            logger.debug("Raw ECharts data for %s: x-axis length %d, %d series", chart_type, len(result.get('xAxis', [])), len(result.get('series', [])))
+            for i, series in enumerate(result.get('series', [])):
+                logger.debug("    Series %d: %s (%s) - %d points", i, series.get('name'), series.get('type'), len(series.get('data', [])))
+
+            return self._convert_echarts_to_dataframe(result, chart_type)
+        else:
+            logger.warning("Unexpected result structure from direct extraction for %s", chart_type)
             return None
 
     def _convert_echarts_to_dataframe(self, echarts_data, chart_type="line"):
-        """Enhanced conversion with better debugging for bar charts"""
+        """
+        Columnar conversion of the raw ECharts data (x-axis + series) to a DataFrame.
+
+        Every series is paired with the x-axis, the point shapes are normalized to one value
+        per point and parsed to float in bulk, and the frame is built once.
+        """
         try:
             x_axis_data = echarts_data.get('xAxis', [])
             series_list = echarts_data.get('series', [])
 
-            print(f"Converting {chart_type} data:")
-            print(f"  X-axis data: {x_axis_data[:3]}..." if len(x_axis_data) > 3 else f"  X-axis data: {x_axis_data}")
-            print(f"  Series count: {len(series_list)}")
+            logger.debug("Converting %s data: %d x-axis values, %d series", chart_type, len(x_axis_data), len(series_list))
 
             if not x_axis_data or not series_list:
-                print(f"No data found in x-axis or series for {chart_type} chart")
+                logger.warning("No data found in x-axis or series for %s chart", chart_type)
                 return None
 
-            all_data = []
+            periods = []
+            series_names = []
+            points = []
 
             for series_idx, series in enumerate(series_list):
                 series_name = series.get('name', f'Series_{series_idx}')
                 series_data = series.get('data', [])
-                series_type = series.get('type', 'unknown')
-
-                print(f"Processing {chart_type} series {series_idx}: {series_name} (type: {series_type}) with {len(series_data)} data points")
-
-                # Debug: Show first few data points
-                if len(series_data) > 0:
-                    print(f"  Sample data: {series_data[:3]}")
-
-                for i, value in enumerate(series_data):
-                    if i >= len(x_axis_data):
-                        print(f"  Warning: Data point {i} exceeds x-axis length")
-                        break
-
-                    # Handle different data formats with better debugging
-                    actual_value = None
-
-                    if isinstance(value, (list, tuple)):
-                        if len(value) >= 2:
-                            actual_value = value[1]
-                            print(f"  Point {i}: Array format, using value[1] = {actual_value}")
-                        else:
-                            actual_value = value[0] if len(value) > 0 else 0
-                            print(f"  Point {i}: Short array, using value[0] = {actual_value}")
-                    elif isinstance(value, dict):
-                        # Handle the specific bar chart format: {'value': ['Jan-2024', ' 1055']}
-                        dict_value = value.get('value', value.get('y', 0))
-                        if isinstance(dict_value, (list, tuple)) and len(dict_value) >= 2:
-                            # Extract the numeric value (second element)
-                            actual_value = dict_value[1]
-                            print(f"  Point {i}: Dict with array value, extracted = {actual_value}")
-                        else:
-                            actual_value = dict_value
-                            print(f"  Point {i}: Dict format, extracted = {actual_value}")
-                    else:
-                        actual_value = value if value is not None else 0
-                        print(f"  Point {i}: Direct value = {actual_value}")
-
-                    # Convert to numeric (handle strings with spaces)
-                    try:
-                        if actual_value is not None:
-                            # Clean string values (remove spaces, commas)
-                            if isinstance(actual_value, str):
-                                cleaned_value = actual_value.strip().replace(',', '')
-                                actual_value = float(cleaned_value)
-                            else:
-                                actual_value = float(actual_value)
-                        else:
-                            actual_value = 0.0
-                    except (ValueError, TypeError):
-                        print(f"  Warning: Could not convert '{actual_value}' to float, using 0")
-                        actual_value = 0.0
-
-                    # Create data row
-                    if chart_type == "bar":
-                        all_data.append({
-                            'Period': x_axis_data[i],
-                            'Series': series_name,
-                            'Value': actual_value,
-                            'Chart_Type': 'bar'
-                        })
-                    else:  # line chart
-                        all_data.append({
-                            'Month': x_axis_data[i],
-                            'Year': series_name,
-                            'Value': actual_value,
-                            'Chart_Type': 'line'
-                        })
-
-            if not all_data:
-                print(f"No valid data points created for {chart_type}")
+
+                if len(series_data) > len(x_axis_data):
+                    logger.warning("%s series %s has %d points for %d x-axis values, extra points ignored",
+                                   chart_type, series_name, len(series_data), len(x_axis_data))
+                    series_data = series_data[:len(x_axis_data)]
+
+                periods.extend(x_axis_data[:len(series_data)])
+                series_names.extend([series_name] * len(series_data))
+                points.extend(series_data)
+
+            if not points:
+                logger.warning("No valid data points created for %s", chart_type)
                 return None
 
-            df = pd.DataFrame(all_data)
-            print(f"Created DataFrame with {len(df)} rows")
+            values = _points_to_float(_normalize_points(points))
 
-            # Clean and validate data
-            df['Value'] = pd.to_numeric(df['Value'], errors='coerce')
+            if chart_type == "bar":
+                df = pd.DataFrame({'Period': periods, 'Series': series_names, 'Value': values.to_numpy(), 'Chart_Type': 'bar'})
+            else:  # line chart
+                df = pd.DataFrame({'Month': periods, 'Year': series_names, 'Value': values.to_numpy(), 'Chart_Type': 'line'})
+            logger.debug("Created DataFrame with %d rows", len(df))
+
+            # Drop points whose value is NaN
             initial_count = len(df)
             df = df.dropna(subset=['Value'])
             final_count = len(df)
 
             if initial_count != final_count:
-                print(f"Dropped {initial_count - final_count} rows with invalid values")
+                logger.info("Dropped %d rows with invalid values", initial_count - final_count)
 
-            print(f"Direct extraction successful for {chart_type}: {len(df)} data points")
-            if len(df) > 0:
-                print(f"Sample converted data:")
-                print(df.head().to_string(index=False))
+            logger.debug("Direct extraction successful for %s: %d data points", chart_type, len(df))
+            if len(df) > 0 and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Sample converted data:\n%s", df.head().to_string(index=False))
 
             return df
 
         except Exception as e:
-            print(f"Error converting ECharts data to DataFrame for {chart_type}: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error converting ECharts data to DataFrame for %s: %s", chart_type, e)
             return None
 
 
     def extract_tooltip_data_fallback(self, chart_id, chart_type="line"):
         """
-        Enhanced tooltip extraction specifically for bar charts
-        """
-        print(f"Using tooltip extraction as fallback method for {chart_type} chart...")
+        Read the chart's own tooltips when its option data could not be converted.
 
-        action = ActionChains(self.driver)
+        ECharts is asked to show the tooltip of every data index (dispatchAction 'showTip') and all
+        tooltip texts are collected in one script call, so no point is missed between mouse positions.
+        """
+        if self.engine == "shiny":
+            logger.warning("Tooltip fallback needs a browser, not available with the shiny engine (%s chart)", chart_type)
+            return None
 
-        if chart_type == "bar":
-            final_df = pd.DataFrame(columns=['Period', 'Series', 'Value'])
-            # Bar charts - try more positions across the width
-            x_offsets = list(range(10, 400, 20))  # Every 20px from 10 to 400
-            y_offsets = [-10, 0, 10, 20]  # Try different heights
-        else:  # line chart
-            final_df = pd.DataFrame(columns=['Year', 'Month', 'Value'])
-            x_offsets = [600, 500, 400, 300, 200, 100, 0, -100, -200, -300, -400, -500]
-            y_offsets = [0]
+        logger.info("Using tooltip extraction as fallback method for %s chart...", chart_type)
 
         try:
-            graph = WebDriverWait(self.driver, 10).until(
-                EC.visibility_of_element_located((By.ID, chart_id))
-            )
-
-            chart_size = graph.size
-            print(f"Chart size for {chart_type}: {chart_size}")
+            sweep = self.driver.execute_script(TOOLTIP_SWEEP_JS, chart_id)
+        except Exception as e:
+            logger.warning("Tooltip extraction failed for %s: %s", chart_type, e)
+            return None
 
-            successful_extractions = 0
-            tooltip_texts_found = []
+        if sweep.get('error'):
+            logger.warning("Tooltip extraction failed for %s: %s", chart_type, sweep['error'])
+            return None
 
-            for x_offset in x_offsets:
-                for y_offset in y_offsets:
-                    try:
-                        # Move to position
-                        action.move_to_element_with_offset(graph, x_offset, y_offset).perform()
-                        time.sleep(0.8)  # Shorter wait
-
-                        # Enhanced tooltip detection
-                        tooltip_selectors = [
-                            "div[style*='position: absolute'][style*='display: block']:not([style*='display: none'])",
-                            "div[style*='z-index'][style*='position: absolute']:not([style*='display: none'])",
-                            ".echarts-tooltip",
-                            "div[style*='pointer-events: none'][style*='position: absolute']",
-                            "div[style*='background'][style*='position: absolute']"
-                        ]
-
-                        tooltip = None
-                        cases_text = ""
-
-                        for selector in tooltip_selectors:
-                            try:
-                                elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                                for element in elements:
-                                    if element.is_displayed() and element.text.strip():
-                                        tooltip = element
-                                        cases_text = element.text.strip()
-                                        break
-                                if cases_text:
-                                    break
-                            except:
-                                continue
-
-                        if not cases_text:
-                            continue
-
-                        # Avoid duplicate tooltips
-                        if cases_text in tooltip_texts_found:
-                            continue
-                        tooltip_texts_found.append(cases_text)
-
-                        print(f"Found tooltip at ({x_offset}, {y_offset}): {repr(cases_text)}")
-
-                        # Parse tooltip text
-                        lines = [line.strip() for line in cases_text.split('\n') if line.strip()]
-                        if len(lines) < 2:
-                            continue
-
-                        temp_df = pd.DataFrame()
-
-                        if chart_type == "bar":
-                            # Enhanced parsing for bar charts
-                            if len(lines) >= 2:
-                                # Try different formats
-                                period = lines[0]
-
-                                # Look for numeric value in any line
-                                value = None
-                                series_name = "Total cases"
-
-                                for line in lines[1:]:
-                                    extracted_value = self._extract_numeric_value(line)
-                                    if extracted_value is not None and extracted_value > 0:
-                                        value = extracted_value
-                                        # If there are multiple lines, use the previous line as series name
-                                        if len(lines) > 2:
-                                            line_idx = lines.index(line)
-                                            if line_idx > 0:
-                                                series_name = lines[line_idx - 1]
-                                        break
-
-                                if value is not None:
-                                    temp_df = pd.DataFrame({
-                                        'Period': [period],
-                                        'Series': [series_name],
-                                        'Value': [value]
-                                    })
-                                    print(f"  Parsed: Period={period}, Series={series_name}, Value={value}")
-                        else:
-                            # Line chart parsing (original)
-                            month = lines[0]
-                            years = lines[1::2]
-                            values = lines[2::2]
-
-                            valid_years = [year for year in years if year.isdigit()]
-                            valid_values = [self._extract_numeric_value(val) for val in values[:len(valid_years)]]
-
-                            temp_df = pd.DataFrame({
-                                'Year': [int(year) for year in valid_years],
-                                'Month': [month] * len(valid_years),
-                                'Value': valid_values
-                            })
-
-                        # Add valid data
-                        if not temp_df.empty:
-                            temp_df = temp_df.dropna()
-                            if not temp_df.empty:
-                                final_df = pd.concat([final_df, temp_df], ignore_index=True)
-                                successful_extractions += 1
+        rows = []
+        texts = list(dict.fromkeys(text for text in sweep.get('tooltips', []) if text))
+        for text in texts:
+            logger.debug("Tooltip: %r", text)
+            rows.extend(self._parse_tooltip_text(text, chart_type))
 
-                    except Exception as e:
-                        continue
+        columns = ['Period', 'Series', 'Value'] if chart_type == "bar" else ['Year', 'Month', 'Value']
+        final_df = pd.DataFrame(rows, columns=columns).dropna().drop_duplicates().reset_index(drop=True)
 
-            # Remove duplicates
-            if not final_df.empty:
-                final_df = final_df.drop_duplicates().reset_index(drop=True)
+        logger.info("Tooltip extraction completed for %s: %d data points from %d unique tooltips (%d shown, trigger: %s)",
+                    chart_type, len(final_df), len(texts), len(sweep.get('tooltips', [])), sweep.get('trigger'))
+        return final_df
 
-            print(f"Tooltip extraction completed for {chart_type}: {len(final_df)} data points from {successful_extractions} successful positions")
-            print(f"Unique tooltip texts found: {len(tooltip_texts_found)}")
+    def _parse_tooltip_text(self, text, chart_type):
+        """
+        Parse one tooltip text into rows.
 
-            return final_df
+        Bar chart tooltips are "period / [series] / value" ((Period, Series, Value) rows),
+        line chart tooltips "month / year / value / year / value ..." ((Year, Month, Value) rows).
+        """
+        lines = [line.strip() for line in text.split('\n') if line.strip()]
+        if len(lines) < 2:
+            return []
 
-        except Exception as e:
-            print(f"Tooltip extraction failed for {chart_type}: {e}")
-            return None
+        if chart_type == "bar":
+            period = lines[0]
+            series_name = "Total cases"
+            for line_idx, line in enumerate(lines[1:], start=1):
+                value = self._extract_numeric_value(line)
+                if value is not None and value > 0:
+                    # with more than two lines, the line before the value names the series
+                    if len(lines) > 2 and line_idx > 1:
+                        series_name = lines[line_idx - 1]
+                    return [(period, series_name, value)]
+            return []
+
+        month = lines[0]
+        years = [year for year in lines[1::2] if year.isdigit()]
+        values = lines[2::2]
+        return [(int(year), month, self._extract_numeric_value(value)) for year, value in zip(years, values)]
 
     def _extract_numeric_value(self, value_str):
         """Extract numeric value from string, handling commas and various formats"""
@@ -560,8 +574,7 @@ class CountryDataExtractor:
         cleaned = value_str.replace(',', '').replace(' ', '').strip()
 
         # Try to extract number
-        import re
-        number_match = re.search(r'[\d.]+', cleaned)
+        number_match = _NUMBER_PATTERN.search(cleaned)
         if number_match:
             try:
                 return float(number_match.group())
@@ -569,124 +582,81 @@ class CountryDataExtractor:
                 return None
         return None
 
-    def extract_line_chart_data(self, country_name):
-        """Extract data from the line chart for a single country"""
-        print(f"\\n--- Extracting LINE CHART data for: {country_name} ---")
+    def extract_line_chart_data(self, country_name, harvested=None):
+        """
+        Extract data from the line chart for a single country
+
+        Args:
+            country_name (str): Country name added to the data.
+            harvested (dict): This chart's entry from harvest_charts; harvested for this chart alone when not given.
+        """
+        logger.debug("Extracting LINE CHART data for: %s", country_name)
 
         # Try direct ECharts method first
-        line_data = self.extract_echarts_data_direct(self.line_chart_id, "line")
+        method = "direct"
+        if harvested is None:
+            harvested = self.harvest_charts({self.line_chart_id: "line"})[self.line_chart_id]
+        line_data = self._convert_direct_result(harvested, "line")
 
         # If direct method fails, use tooltip fallback
         if line_data is None or line_data.empty:
-            print("Direct method failed for line chart, using tooltip fallback...")
+            logger.info("Direct method failed for line chart, using tooltip fallback...")
+            method = "tooltip"
             line_data = self.extract_tooltip_data_fallback(self.line_chart_id, "line")
 
         # Add country column if data was extracted
         if line_data is not None and not line_data.empty:
             line_data['Country'] = country_name
-            print(f"Successfully extracted {len(line_data)} line chart data points for {country_name}")
+            logger.info("Extracted %d line chart data points for %s", len(line_data), country_name)
+            log_record("extraction", country=country_name, chart="line", rows=len(line_data), method=method, engine=self.engine)
             return line_data
         else:
-            print(f"Failed to extract line chart data for {country_name}")
+            logger.warning("Failed to extract line chart data for %s", country_name)
+            log_record("extraction", country=country_name, chart="line", rows=0, method=None, engine=self.engine)
             return pd.DataFrame()
 
-    def debug_chart_structure(self, chart_id, chart_type):
-        """Debug method to understand chart structure and available data"""
-        print(f"\n--- DEBUG: Analyzing {chart_type} chart structure ---")
-
-        js_debug_code = f"""
-        try {{
-            var chartElement = document.getElementById('{chart_id}');
-            if (!chartElement) {{
-                return {{error: "Chart element not found", chartId: '{chart_id}'}};
-            }}
-
-            var echartsInstance = echarts.getInstanceByDom(chartElement);
-            if (!echartsInstance) {{
-                return {{error: "ECharts instance not found", hasElement: true}};
-            }}
-
-            var option = echartsInstance.getOption();
-            if (!option) {{
-                return {{error: "ECharts option not available", hasInstance: true}};
-            }}
-
-            // Extract debug information
-            var debugInfo = {{
-                success: true,
-                hasXAxis: !!option.xAxis,
-                hasSeries: !!option.series,
-                xAxisCount: option.xAxis ? option.xAxis.length : 0,
-                seriesCount: option.series ? option.series.length : 0,
-                chartType: chart_id.includes('total') ? 'bar' : 'line'
-            }};
-
-            // Get x-axis info
-            if (option.xAxis && option.xAxis[0]) {{
-                debugInfo.xAxisType = option.xAxis[0].type;
-                debugInfo.xAxisDataLength = option.xAxis[0].data ? option.xAxis[0].data.length : 0;
-                debugInfo.xAxisSample = option.xAxis[0].data ? option.xAxis[0].data.slice(0, 3) : [];
-            }}
-
-            // Get series info
-            if (option.series) {{
-                debugInfo.seriesInfo = option.series.map(function(series, index) {{
-                    return {{
-                        index: index,
-                        name: series.name || 'unnamed',
-                        type: series.type || 'unknown',
-                        dataLength: series.data ? series.data.length : 0,
-                        sampleData: series.data ? series.data.slice(0, 3) : []
-                    }};
-                }});
-            }}
-
-            return debugInfo;
-
-        }} catch (error) {{
-            return {{error: "JavaScript execution error: " + error.message}};
-        }}
+    def extract_bar_chart_data(self, country_name, harvested=None):
         """
+        Extract data from the bar chart for a single country with enhanced debugging
 
-        try:
-            debug_result = self.driver.execute_script(js_debug_code)
-            print(f"Debug result for {chart_type}: {debug_result}")
-            return debug_result
-        except Exception as e:
-            print(f"Debug failed for {chart_type}: {e}")
-            return None
-
-    def extract_bar_chart_data(self, country_name):
-        """Extract data from the bar chart for a single country with enhanced debugging"""
-        print(f"\\n--- Extracting BAR CHART data for: {country_name} ---")
-
-        # First, debug the chart structure
-        debug_info = self.debug_chart_structure(self.bar_chart_id, "bar")
+        Args:
+            country_name (str): Country name added to the data.
+            harvested (dict): This chart's entry from harvest_charts (includes the structure
+                diagnostics); harvested for this chart alone when not given.
+        """
+        logger.debug("Extracting BAR CHART data for: %s", country_name)
 
         # Try direct ECharts method first
-        bar_data = self.extract_echarts_data_direct(self.bar_chart_id, "bar")
+        method = "direct"
+        if harvested is None:
+            harvested = self.harvest_charts({self.bar_chart_id: "bar"})[self.bar_chart_id]
+        bar_data = self._convert_direct_result(harvested, "bar")
 
         # If direct method fails, use tooltip fallback
         if bar_data is None or bar_data.empty:
-            print("Direct method failed for bar chart, using tooltip fallback...")
+            logger.info("Direct method failed for bar chart, using tooltip fallback...")
+            method = "tooltip"
             bar_data = self.extract_tooltip_data_fallback(self.bar_chart_id, "bar")
 
         # Add country column if data was extracted
         if bar_data is not None and not bar_data.empty:
             bar_data['Country'] = country_name
-            print(f"Successfully extracted {len(bar_data)} bar chart data points for {country_name}")
+            logger.info("Extracted %d bar chart data points for %s", len(bar_data), country_name)
+            log_record("extraction", country=country_name, chart="bar", rows=len(bar_data), method=method, engine=self.engine)
             return bar_data
         else:
-            print(f"Failed to extract bar chart data for {country_name}")
+            logger.warning("Failed to extract bar chart data for %s", country_name)
+            log_record("extraction", country=country_name, chart="bar", rows=0, method=None, engine=self.engine)
+
+            if self.engine == "shiny":
+                return pd.DataFrame()
 
             # Additional debugging - check if chart element exists
             try:
                 element = self.driver.find_element(By.ID, self.bar_chart_id)
-                print(f"Bar chart element found: {element.is_displayed()}")
-                print(f"Element size: {element.size}")
-                print(f"Element location: {element.location}")
+                logger.warning("Bar chart element found: displayed=%s, size=%s, location=%s", element.is_displayed(), element.size, element.location)
             except NoSuchElementException:
-                print(f"Bar chart element with ID '{self.bar_chart_id}' not found!")
+                logger.warning("Bar chart element with ID '%s' not found!", self.bar_chart_id)
 
             return pd.DataFrame()
 
@@ -695,20 +665,122 @@ class CountryDataExtractor:
         Extract data for a single country from both line and bar charts
         Returns a tuple: (line_data, bar_data)
         """
-        print(f"\\n{'='*60}")
-        print(f"EXTRACTING ALL DATA FOR: {country_name}")
-        print('='*60)
+        logger.info("Extracting all data for: %s", country_name)
 
         # Select the country
         self.select_country(country_name)
+        return self._read_country_charts(country_name)
 
-        # Extract from both charts
-        line_data = self.extract_line_chart_data(country_name)
-        bar_data = self.extract_bar_chart_data(country_name)
+    def _read_country_charts(self, country_name, charts=CHARTS):
+        """
+        Read the charts of the selected country in one round-trip, then convert.
+
+        Returns:
+            tuple: (line_data, bar_data), an empty frame for a chart not in charts.
+        """
+        chart_ids = {"line": self.line_chart_id, "bar": self.bar_chart_id}
+        harvest = self.harvest_charts({chart_ids[chart]: chart for chart in charts})
+        line_data = self.extract_line_chart_data(country_name, harvest.get(self.line_chart_id)) if "line" in charts else pd.DataFrame()
+        bar_data = self.extract_bar_chart_data(country_name, harvest.get(self.bar_chart_id)) if "bar" in charts else pd.DataFrame()
 
         return line_data, bar_data
 
-    def extract_data_for_countries(self, countries_list, output_directory, today):
+    def _record_units(self, country_name, line_data, bar_data):
+        """Add the charts that have data to the run checkpoint (nothing once cancelled)"""
+        if self.cancelled.is_set():
+            return
+        for chart, data in zip(CHARTS, (line_data, bar_data)):
+            if data is not None and not data.empty and not self.checkpoint.done(country_name, chart):
+                self.checkpoint.record(country_name, chart, data)
+
+    def _extract_with_retries(self, country_name):
+        """
+        Extract the charts of a country that are not in the checkpoint yet, retrying the ones that failed
+        (an exception or no data) up to max_attempts times, each time from a fresh page and selection.
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            charts = self.checkpoint.missing(country_name)
+            if not charts or self.cancelled.is_set():
+                return
+
+            if attempt > 1:
+                logger.info("%s: retrying %s chart (attempt %d/%d)", country_name, " and ".join(charts), attempt, self.max_attempts)
+            units = self._extract_attempt(country_name, charts, attempt, reset=attempt > 1)
+            self._record_units(country_name, units.get("line"), units.get("bar"))
+
+    def _extract_attempt(self, country_name, charts, attempt=1, reset=False):
+        """
+        One extraction attempt: (after a reset_session when reset) select the country and read the given charts.
+
+        Returns:
+            dict: Chart -> data for the charts that have data (empty on failure or once cancelled).
+        """
+        if self.cancelled.is_set():
+            return {}
+        try:
+            if reset:
+                self._reset_session()
+            self.select_country(country_name)
+            frames = dict(zip(CHARTS, self._read_country_charts(country_name, charts)))
+        except Exception as e:
+            if self.cancelled.is_set():
+                # the caller closed the session under this attempt
+                return {}
+            logger.error("%s: Exception occurred - %s", country_name, e)
+            log_record("extraction_failed", country=country_name, error=str(e), engine=self.engine, attempt=attempt)
+            return {}
+        if self.cancelled.is_set():
+            return {}
+        return {chart: data for chart, data in frames.items() if chart in charts and not data.empty}
+
+    def _reset_session(self):
+        """Start from a fresh dashboard page before a retry, or from a new browser if this one has crashed"""
+        if self.engine == "shiny":
+            self.shiny_client.close()
+            self.shiny_client.connect()
+            return
+
+        try:
+            self.driver.execute_script("return 1;")
+        except WebDriverException as e:
+            if self.driver_factory is None or self.cancelled.is_set():
+                raise
+            logger.warning("Browser not responding (%s), starting a new one", str(e).splitlines()[0] if str(e) else type(e).__name__)
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            driver = self.driver_factory()
+            if self.cancelled.is_set():
+                # cancelled while the browser was starting: nobody would quit it
+                driver.quit()
+                raise ExtractionCancelled("extraction cancelled")
+            self.driver = driver
+            self._replacement_drivers.append(driver)
+            self.readiness = ShinyReadiness(self.driver)
+            if self.engine == "capture":
+                self.capture = self.output_source = ShinyFrameCapture(self.driver)
+            return
+
+        self.driver.refresh()
+        self.readiness.wait_for_shiny_ready()
+        open_country_profile(self.driver)
+
+    def _quit_replacement_drivers(self):
+        """Quit the browsers started by _reset_session (the original driver belongs to the caller)"""
+        for driver in self._replacement_drivers:
+            try:
+                driver.quit()
+            except Exception as e:
+                logger.debug("Could not quit a replacement browser: %s", e)
+        self._replacement_drivers = []
+
+    def cache_country_data(self, country_name, line_data, bar_data):
+        """Keep already extracted frames for a country so extract_data_for_countries does not scrape it again"""
+        self._cache[country_name] = (line_data, bar_data)
+
+    def extract_data_for_countries(self, countries_list, output_directory, today, workers=1, driver_factory=None, storage="csv", force_write=False,
+                                   tabs=1, checkpoint=None):
         """
         Extract data for multiple countries from both charts, and save to separate CSV files.
 
@@ -716,11 +788,165 @@ class CountryDataExtractor:
             countries_list (list): List of country names to select from the dropdown.
             output_directory (str): The directory where the CSV files will be saved.
             today (str): Today's date string for filename.
+            workers (int): Number of browser sessions to spread the countries over (1 = serial).
+            driver_factory (callable): Creates an extra driver (dashboard loaded) for each additional worker.
+            storage (str): Comma-separated outputs: "csv" (snapshot files), "delta" (only the changes, in the
+                delta store), "parquet" (partitioned dataset); "both" means "csv,delta".
+            force_write (bool): Save even if every country's data matches the stored fingerprints.
+            tabs (int): Shiny sessions (browser tabs) to use in this extractor's browser (selenium engine only).
+            checkpoint (RunCheckpoint): Completed units of this run; only the missing ones are extracted, and the
+                checkpoint is cleared once every unit is done and saved (in memory only when not given).
 
         Returns:
             tuple: (line_chart_df, bar_chart_df) - The merged DataFrames for both chart types.
         """
-        print(f"Starting data extraction for {len(countries_list)} countries from both charts...")
+        logger.info("Starting data extraction for %d countries from both charts...", len(countries_list))
+
+        self.checkpoint = checkpoint if checkpoint is not None else RunCheckpoint(None, today)
+        self.driver_factory = driver_factory
+
+        # Countries extracted earlier in this session (the preflight probe) are not scraped twice
+        cached = {country: self._cache.pop(country) for country in countries_list if country in self._cache}
+        if cached:
+            logger.info("Reusing already extracted data for: %s", ", ".join(cached))
+        for country, (line_data, bar_data) in cached.items():
+            self._record_units(country, line_data, bar_data)
+
+        # Units completed before a crash (same run) are not scraped again either
+        remaining = [country for country in countries_list if self.checkpoint.missing(country)]
+        resumed = [country for country in countries_list if country not in cached and country not in remaining]
+        if resumed:
+            logger.info("Already extracted in this run: %s", ", ".join(resumed))
+
+        try:
+            if not remaining:
+                pass
+            elif workers > 1 and driver_factory is not None and self.engine != "shiny":
+                self._extract_countries_parallel(remaining, workers, driver_factory)
+            elif tabs > 1 and self.engine == "selenium":
+                self._extract_countries_tabbed(remaining, tabs)
+                # units that failed in a tab are retried one country at a time
+                self._extract_countries([country for country in remaining if self.checkpoint.missing(country)])
+            else:
+                self._extract_countries(remaining)
+        finally:
+            self._quit_replacement_drivers()
+
+        results = {country: self.checkpoint.country_data(country) for country in countries_list}
+        saved = self._save_results(countries_list, results, output_directory, today, storage, force_write)
+
+        incomplete = [f"{country} ({', '.join(self.checkpoint.missing(country))})" for country in countries_list if self.checkpoint.missing(country)]
+        if incomplete:
+            logger.warning("Not extracted after %d attempts: %s (kept in the checkpoint for a rerun)", self.max_attempts, ", ".join(incomplete))
+        else:
+            self.checkpoint.clear()
+        return saved
+
+    def _extract_countries(self, countries_list):
+        """Extract the missing charts of each country in turn into the checkpoint (with retries)"""
+        # Loop over all countries in the list
+        for i, country in enumerate(countries_list, 1):
+            logger.info("Processing country %d/%d: %s", i, len(countries_list), country)
+            self._extract_with_retries(country)
+
+    def _extract_countries_tabbed(self, countries_list, tabs):
+        """
+        Extract countries over several tabs of this extractor's browser, each tab its own Shiny session.
+
+        Countries are taken a batch of `tabs` at a time: the selection is made in every tab first, then
+        each tab is read in turn, so the server works on the other tabs while one is being read.
+        The extraction itself is the same as in _extract_countries; completed units go to the checkpoint.
+        """
+        tabs = min(tabs, len(countries_list))
+        main_handle = self.driver.current_window_handle
+        handles = [main_handle]
+        peak_rss = browser_rss(self.driver)
+
+        try:
+            for _ in range(tabs - 1):
+                handles.append(open_dashboard_tab(self.driver))
+            logger.info("Extracting with %d tabs in one browser", len(handles))
+
+            for start in range(0, len(countries_list), len(handles)):
+                batch = list(zip(handles, countries_list[start:start + len(handles)]))
+
+                pending = {}
+                for handle, country in batch:
+                    self.driver.switch_to.window(handle)
+                    try:
+                        pending[country] = self._start_country_selection(country)
+                    except Exception as e:
+                        logger.error("%s: Exception occurred - %s", country, e)
+                        log_record("extraction_failed", country=country, error=str(e), engine=self.engine)
+
+                for handle, country in batch:
+                    if country not in pending:
+                        continue
+                    self.driver.switch_to.window(handle)
+                    try:
+                        self._finish_country_selection(pending[country])
+                        self._record_units(country, *self._read_country_charts(country, self.checkpoint.missing(country)))
+                    except Exception as e:
+                        logger.error("%s: Exception occurred - %s", country, e)
+                        log_record("extraction_failed", country=country, error=str(e), engine=self.engine)
+
+                rss = browser_rss(self.driver)
+                if rss is not None:
+                    peak_rss = max(peak_rss or 0, rss)
+        finally:
+            for handle in handles[1:]:
+                try:
+                    self.driver.switch_to.window(handle)
+                    self.driver.close()
+                except Exception as e:
+                    logger.debug("Could not close tab: %s", e)
+            self.driver.switch_to.window(main_handle)
+
+        if peak_rss is not None:
+            logger.info("Peak browser memory with %d tabs: %.0f MiB", len(handles), peak_rss / 2 ** 20)
+        else:
+            logger.info("Peak browser memory not measured (needs psutil)")
+        log_record("memory", tabs=len(handles), peak_rss=peak_rss)
+
+    def _extract_countries_parallel(self, countries_list, workers, driver_factory):
+        """
+        Extract countries over a pool of independent browser sessions (each with its own Shiny session).
+
+        Countries are sharded round-robin across the workers; this extractor's driver serves the
+        first shard and driver_factory creates the others. All workers add their units to this
+        extractor's checkpoint, which the caller reads back in countries_list order.
+        """
+        workers = min(workers, len(countries_list))
+        shards = [countries_list[i::workers] for i in range(workers)]
+        logger.info("Extracting with %d parallel browser sessions: %s", workers, shards)
+
+        # undetected_chromedriver patches the same chromedriver binary on launch, so start sessions one at a time
+        launch_lock = threading.Lock()
+
+        def run_shard(worker_index):
+            if worker_index == 0:
+                return self._extract_countries(shards[0])
+
+            with launch_lock:
+                worker_driver = driver_factory()
+            capture = ShinyFrameCapture(worker_driver) if self.engine == "capture" else None
+            extractor = CountryDataExtractor(worker_driver, self.line_chart_id, self.bar_chart_id, capture=capture)
+            extractor.checkpoint = self.checkpoint
+            extractor.driver_factory = driver_factory
+            extractor.max_attempts = self.max_attempts
+            try:
+                extractor._extract_countries(shards[worker_index])
+            finally:
+                # the worker's browser may have been replaced after a crash
+                extractor.driver.quit()
+                extractor._quit_replacement_drivers()
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(run_shard, range(workers)))
+
+    def _save_results(self, countries_list, results, output_directory, today, storage="csv", force_write=False):
+        """Merge the per-country results in countries_list order, print the summary and save to the storage outputs"""
+        targets = {"csv", "delta"} if storage == "both" else {target.strip() for target in storage.split(",")}
 
         # Initialize empty lists to hold data from all countries
         all_line_data = []
@@ -730,76 +956,90 @@ class CountryDataExtractor:
         failed_line_extractions = []
         failed_bar_extractions = []
 
-        # Loop over all countries in the list
-        for i, country in enumerate(countries_list, 1):
-            print(f"\\n{'='*70}")
-            print(f"Processing country {i}/{len(countries_list)}: {country}")
-            print('='*70)
+        for country in countries_list:
+            country_result = results.get(country)
+            if country_result is None:
+                failed_line_extractions.append(country)
+                failed_bar_extractions.append(country)
+                continue
 
-            try:
-                # Extract data for the current country from both charts
-                line_data, bar_data = self.extract_country_data(country)
-
-                # Process line chart data
-                if not line_data.empty:
-                    all_line_data.append(line_data)
-                    successful_line_extractions += 1
-                    print(f"✅ {country} LINE: {len(line_data)} records extracted")
-                else:
-                    failed_line_extractions.append(country)
-                    print(f"❌ {country} LINE: No data extracted")
-
-                # Process bar chart data
-                if not bar_data.empty:
-                    all_bar_data.append(bar_data)
-                    successful_bar_extractions += 1
-                    print(f"✅ {country} BAR: {len(bar_data)} records extracted")
-                else:
-                    failed_bar_extractions.append(country)
-                    print(f"❌ {country} BAR: No data extracted")
+            line_data, bar_data = country_result
 
-            except Exception as e:
-                print(f"❌ {country}: Exception occurred - {e}")
+            # Process line chart data
+            if not line_data.empty:
+                all_line_data.append(line_data)
+                successful_line_extractions += 1
+            else:
                 failed_line_extractions.append(country)
+
+            # Process bar chart data
+            if not bar_data.empty:
+                all_bar_data.append(bar_data)
+                successful_bar_extractions += 1
+            else:
                 failed_bar_extractions.append(country)
-                continue
 
         # Summary
-        print(f"\\n{'='*70}")
-        print("EXTRACTION SUMMARY")
-        print('='*70)
-        print(f"LINE CHART - Successful: {successful_line_extractions}/{len(countries_list)}")
+        logger.info("LINE CHART - Successful: %d/%d", successful_line_extractions, len(countries_list))
         if failed_line_extractions:
-            print(f"LINE CHART - Failed: {', '.join(failed_line_extractions)}")
+            logger.warning("LINE CHART - Failed: %s", ", ".join(failed_line_extractions))
 
-        print(f"BAR CHART - Successful: {successful_bar_extractions}/{len(countries_list)}")
+        logger.info("BAR CHART - Successful: %d/%d", successful_bar_extractions, len(countries_list))
         if failed_bar_extractions:
-            print(f"BAR CHART - Failed: {', '.join(failed_bar_extractions)}")
+            logger.warning("BAR CHART - Failed: %s", ", ".join(failed_bar_extractions))
+
+        # Compare each country's data with the fingerprints of the last saved snapshot
+        fingerprint_file = os.path.join(output_directory, DEFAULT_FINGERPRINT_FILE)
+        status, fingerprints = compare_fingerprints(load_fingerprints(fingerprint_file), results)
+        for country in countries_list:
+            logger.info("%s: %s", country, status[country])
+        log_record("fingerprints", run=today, **status)
+        changed = [country for country in countries_list if status[country] == "changed"]
+        write = bool(changed) or force_write
+        if not write:
+            logger.info("No country's data changed since the last snapshot, nothing saved")
 
         # Process and save line chart data
         final_line_df = pd.DataFrame()
         if all_line_data:
             final_line_df = pd.concat(all_line_data, ignore_index=True)
-            line_output_file = f"{output_directory}/SEARO_National_data_{today}.csv"
-            final_line_df.to_csv(line_output_file, index=False)
-            print(f"\\n📊 LINE CHART dataset: {len(final_line_df)} total records")
-            print(f"💾 Line chart data saved to: {line_output_file}")
+            logger.info("LINE CHART dataset: %d total records", len(final_line_df))
+            if write and "csv" in targets:
+                line_output_file = f"{output_directory}/SEARO_National_data_{today}.csv"
+                final_line_df.to_csv(line_output_file, index=False)
+                logger.info("LINE CHART saved to: %s", line_output_file)
             self._print_data_summary(final_line_df, "Line Chart")
 
         # Process and save bar chart data
         final_bar_df = pd.DataFrame()
         if all_bar_data:
             final_bar_df = pd.concat(all_bar_data, ignore_index=True)
-            bar_output_file = f"{output_directory}/SEARO_National_data_barchart_{today}.csv"
-            final_bar_df.to_csv(bar_output_file, index=False)
-            print(f"\\n📊 BAR CHART dataset: {len(final_bar_df)} total records")
-            print(f"💾 Bar chart data saved to: {bar_output_file}")
+            logger.info("BAR CHART dataset: %d total records", len(final_bar_df))
+            if write and "csv" in targets:
+                bar_output_file = f"{output_directory}/SEARO_National_data_barchart_{today}.csv"
+                final_bar_df.to_csv(bar_output_file, index=False)
+                logger.info("BAR CHART saved to: %s", bar_output_file)
             self._print_data_summary(final_bar_df, "Bar Chart")
 
+        # Record only what changed since the previous run
+        if write and "delta" in targets and (all_line_data or all_bar_data):
+            store = DeltaStore(os.path.join(output_directory, DEFAULT_STORE_FILE))
+            try:
+                counts = store.record_run(today, final_line_df, final_bar_df)
+            finally:
+                store.close()
+            log_record("delta_store", run=today, **counts)
+
+        if write and "parquet" in targets and (all_line_data or all_bar_data):
+            write_parquet(final_line_df, final_bar_df, output_directory, today)
+
+        if write and (all_line_data or all_bar_data):
+            save_fingerprints(fingerprint_file, fingerprints)
+
         if all_line_data or all_bar_data:
             return final_line_df, final_bar_df
         else:
-            print("\\n❌ No data was successfully extracted from any country for either chart")
+            logger.error("No data was successfully extracted from any country for either chart")
             return pd.DataFrame(), pd.DataFrame()
 
     def _print_data_summary(self, df, chart_type):
@@ -807,106 +1047,196 @@ class CountryDataExtractor:
         if df.empty:
             return
 
-        print(f"\\n{'='*50}")
-        print(f"{chart_type.upper()} DATA SUMMARY")
-        print('='*50)
-        print(f"Countries: {df['Country'].nunique()}")
+        logger.info("%s summary - countries: %d", chart_type, df['Country'].nunique())
 
         if 'Month' in df.columns and 'Year' in df.columns:
             # Line chart format
-            print(f"Months: {df['Month'].nunique()}")
-            print(f"Years: {df['Year'].nunique()}")
-            print(f"Year range: {df['Year'].min()} - {df['Year'].max()}")
+            logger.info("Months: %d, years: %d (%s - %s)", df['Month'].nunique(), df['Year'].nunique(), df['Year'].min(), df['Year'].max())
         elif 'Period' in df.columns:
             # Bar chart format
-            print(f"Periods: {df['Period'].nunique()}")
+            logger.info("Periods: %d", df['Period'].nunique())
 
-        print(f"Value range: {df['Value'].min():.2f} - {df['Value'].max():.2f}")
-        print(f"\\nCountries included: {', '.join(sorted(df['Country'].unique()))}")
+        logger.info("Value range: %.2f - %.2f", df['Value'].min(), df['Value'].max())
+        logger.info("Countries included: %s", ", ".join(sorted(df['Country'].unique())))
 
-        print("\\nSample data:")
-        print(df.head().to_string(index=False))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Sample data:\n%s", df.head().to_string(index=False))
 
 # Main execution function
-def main(driver, download_directory):
+def main(driver, download_directory, shiny_client=None, workers=1, extractor=None, storage="csv", force_write=False,
+         driver_factory=None, tabs=1, checkpoint=None):
     """
     Main execution function to extract data for all countries from both charts
 
     Args:
-        driver: Selenium WebDriver instance
+        driver: Selenium WebDriver instance (None with the shiny engine)
         download_directory: Directory to save the output files
+        shiny_client: Connected ShinyClient to use the browserless engine instead of the driver
+        workers: Number of parallel browser sessions (the given driver plus workers - 1 new ones)
+        extractor: Extractor to reuse (keeps the countries already extracted by debug_first_country)
+        storage: Storage outputs, e.g. "csv" or "csv,parquet" (see extract_data_for_countries)
+        force_write: Save a snapshot even if no country's data changed
+        driver_factory: Launches the extra browsers for workers > 1 (a new dashboard driver by default)
+        tabs: Number of tabs (Shiny sessions) per browser
+        checkpoint: RunCheckpoint to resume from and record into (in memory only by default)
     """
 
     # Initialize the extractor
-    extractor = CountryDataExtractor(driver)
+    if extractor is None:
+        extractor = CountryDataExtractor(driver, shiny_client=shiny_client)
 
     # Countries list
-    countries_list = [
-        "India", "Maldives", "Myanmar", "Nepal", "Indonesia",
-        "Thailand", "Sri Lanka", "Timor-Leste", "Bangladesh", "Bhutan"
-    ]
+    countries_list = COUNTRIES
 
     # Generate timestamp for filename
     today = datetime.now().strftime('%Y%m%d_%H%M')
 
     # Run the extraction for all countries and both chart types
-    final_line_df, final_bar_df = extractor.extract_data_for_countries(countries_list, download_directory, today)
+    final_line_df, final_bar_df = extractor.extract_data_for_countries(
+        countries_list, download_directory, today,
+        workers=workers, driver_factory=driver_factory or (lambda: create_driver(download_directory)),
+        storage=storage, force_write=force_write, tabs=tabs, checkpoint=checkpoint
+    )
 
     return final_line_df, final_bar_df
 
 # Usage example with debugging (assuming you have driver and download_directory defined):
-def debug_first_country(driver, download_directory):
-    """Test function to debug extraction for the first country only"""
-    print("=== DEBUGGING MODE: Testing first country only ===")
+def debug_first_country(driver, download_directory, shiny_client=None, extractor=None):
+    """
+    Preflight probe: extract the first country only to check that both charts can be read.
 
-    extractor = CountryDataExtractor(driver)
+    The extracted frames are cached in the extractor, so main() reuses them instead of
+    scraping the same country again.
+    """
+    logger.info("Preflight: testing first country only")
 
-    # Check page structure first
-    extractor.check_page_structure()
+    if extractor is None:
+        extractor = CountryDataExtractor(driver, shiny_client=shiny_client)
 
-    # Test with first country
-    test_country = "Bangladesh"  # Start with Bangladesh as it's shown in your HTML
-    print(f"\n=== Testing extraction for {test_country} ===")
+    # Dump the page structure only when debugging, it walks every chart-like element
+    if extractor.engine == "selenium" and logger.isEnabledFor(logging.DEBUG):
+        extractor.check_page_structure()
 
-    # Select country and check availability
-    extractor.select_country(test_country)
-
-    # Extract line chart data
-    print("\n--- Testing Line Chart Extraction ---")
-    line_data = extractor.extract_line_chart_data(test_country)
-    print(f"Line chart result: {len(line_data) if not line_data.empty else 0} records")
+    # Test with first country
+    test_country = PREFLIGHT_COUNTRY
+    logger.info("Testing extraction for %s", test_country)
 
-    # Extract bar chart data
-    print("\n--- Testing Bar Chart Extraction ---")
-    bar_data = extractor.extract_bar_chart_data(test_country)
-    print(f"Bar chart result: {len(bar_data) if not bar_data.empty else 0} records")
+    # Select country, check availability and extract both charts
+    line_data, bar_data = extractor.extract_country_data(test_country)
+    logger.info("Line chart result: %d records", len(line_data))
+    logger.info("Bar chart result: %d records", len(bar_data))
+    extractor.cache_country_data(test_country, line_data, bar_data)
 
     # Save test results
     if not line_data.empty:
         line_data.to_csv(f"{download_directory}/DEBUG_line_data.csv", index=False)
-        print(f"Debug line data saved to: {download_directory}/DEBUG_line_data.csv")
+        logger.info("Debug line data saved to: %s/DEBUG_line_data.csv", download_directory)
 
     if not bar_data.empty:
         bar_data.to_csv(f"{download_directory}/DEBUG_bar_data.csv", index=False)
-        print(f"Debug bar data saved to: {download_directory}/DEBUG_bar_data.csv")
+        logger.info("Debug bar data saved to: %s/DEBUG_bar_data.csv", download_directory)
 
     return line_data, bar_data
 
-# Run debug mode first
-debug_line, debug_bar = debug_first_country(driver, download_directory)
-
-# Only run full extraction if debug is successful
-if not debug_bar.empty:
-    print("\n=== Debug successful, running full extraction ===")
-    final_line_data, final_bar_data = main(driver, download_directory)
-else:
-    print("\n=== Debug failed for bar chart, check the debug output above ===")
-    print("The bar chart might be:")
-    print("1. In a different tab/section that needs to be clicked")
-    print("2. Have a different ID than 'c_total_case_evolution'")
-    print("3. Not be an ECharts instance")
-    print("4. Be loaded dynamically after additional user interaction")
+def run(download_directory=None, engine=None, workers=None, storage=None, force_write=None, session=None, tabs=None,
+        run_key=None):
+    """
+    Entry point: start the engine, check the first country, then extract all countries.
+
+    Arguments left as None are read from the environment: GITHUB_WORKSPACE (output folder),
+    SEARO_ENGINE, SEARO_WORKERS, SEARO_TABS, SEARO_STORAGE and SEARO_FORCE_WRITE.
+
+    With a shared BrowserSession (selenium engine), its browser is used and left open for the next job.
+
+    Extracted units are checkpointed in the output folder under run_key (the report date, today by default):
+    a rerun after a crash only extracts what is missing.
+
+    Returns:
+        str: SCRAPE_SUCCESS if every country was extracted, SCRAPE_INCOMPLETE if data was saved but some
+            countries are left in the checkpoint, SCRAPE_FAILED if nothing could be extracted.
+    """
+    # Extraction engine: "selenium" (default, drives Chrome), "shiny" (browserless, talks to the Shiny websocket)
+    # or "capture" (drives Chrome, reads the chart data from the websocket frames it receives)
+    if engine is None:
+        engine = os.getenv('SEARO_ENGINE', 'selenium').lower()
+
+    # Number of parallel browser sessions for the country loop (selenium engine only)
+    if workers is None:
+        workers = int(os.getenv('SEARO_WORKERS', '1'))
+
+    # Number of tabs (each its own Shiny session) in one browser for the country loop (selenium engine,
+    # used when workers is 1): cheaper than extra browsers
+    if tabs is None:
+        tabs = int(os.getenv('SEARO_TABS', '1'))
+
+    # Output storage, comma-separated: "csv" (default, full daily snapshot files), "delta" (append-only change store),
+    # "parquet" (partitioned columnar dataset); "both" is short for "csv,delta"
+    if storage is None:
+        storage = os.getenv('SEARO_STORAGE', 'csv').lower()
+
+    # Write a snapshot even when no country's data changed since the last one
+    if force_write is None:
+        force_write = os.getenv('SEARO_FORCE_WRITE', '').lower() in ('1', 'true', 'yes')
+
+    # Set the download directory to the GitHub repository folder
+    if download_directory is None:
+        download_directory = session.download_directory if session else os.path.join(os.getenv('GITHUB_WORKSPACE'), 'output')
+
+    checkpoint = RunCheckpoint(os.path.join(download_directory, DEFAULT_CHECKPOINT_FILE), run_key or datetime.now().strftime('%Y-%m-%d'))
+
+    driver = None
+    shiny_client = None
+    own_session = None
+
+    try:
+        if engine == 'shiny':
+            shiny_client = ShinyClient(DASHBOARD_URL, output_ids=["c_trend_cases_country_month_out", "c_total_case_evolution"])
+            shiny_client.connect()
+        else:
+            if session is None:
+                session = own_session = BrowserSession(download_directory, capture=engine == 'capture')
+            elif engine == 'capture' and not session.capture_frames:
+                logger.warning("The shared browser session does not capture websocket frames, using the selenium engine")
+            driver = session.start().driver
+
+        # One extractor for the preflight and the full run, so the preflight country is not scraped twice
+        extractor = CountryDataExtractor(driver, shiny_client=shiny_client, capture=session.capture if session else None)
+
+        # Run debug mode first (unless this run already extracted the preflight country before it was interrupted)
+        if checkpoint.missing(PREFLIGHT_COUNTRY):
+            debug_line, debug_bar = debug_first_country(driver, download_directory, shiny_client, extractor=extractor)
+        else:
+            debug_line, debug_bar = checkpoint.country_data(PREFLIGHT_COUNTRY)
+
+        # Only run full extraction if debug is successful
+        if debug_bar.empty:
+            logger.error("Debug failed for bar chart, check the debug output above. The bar chart might be: "
+                         "1. in a different tab/section that needs to be clicked, "
+                         "2. have a different ID than 'c_total_case_evolution', "
+                         "3. not be an ECharts instance, "
+                         "4. loaded dynamically after additional user interaction")
+            return SCRAPE_FAILED
+
+        logger.info("Debug successful, running full extraction")
+        final_line_data, final_bar_data = main(driver, download_directory, shiny_client, workers,
+                                               extractor=extractor, storage=storage, force_write=force_write, tabs=tabs,
+                                               driver_factory=session.new_driver if session else None, checkpoint=checkpoint)
+        if final_line_data.empty and final_bar_data.empty:
+            return SCRAPE_FAILED
+        # the missing units stay in the checkpoint: the run is retried and resumes from it
+        return SCRAPE_INCOMPLETE if any(checkpoint.missing(country) for country in COUNTRIES) else SCRAPE_SUCCESS
+
+    finally:
+        if shiny_client is not None:
+            shiny_client.close()
+        if own_session is not None:
+            own_session.close()
+
 
 # Alternative: Use the class directly
 # extractor = CountryDataExtractor(driver)
 # line_data, bar_data = extractor.extract_data_for_countries(countries_list, output_dir, timestamp)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if run() == SCRAPE_SUCCESS else 1)
@@ -0,0 +1,74 @@
+# Time-to-first-chart of the standard and the lean browser profile
+# Each run launches a fresh Chrome (create_driver), waits until the first country chart has data and records
+# the time since the launch started, the number of resources the page requested and the bytes transferred.
+#
+# Usage:
+#   python scraper/benchmark_browser.py [RUNS]
+
+import statistics
+import sys
+import tempfile
+import time
+
+from browser_session import create_driver
+from readiness import RENDER_TIMEOUT, wait_until
+
+# The bar chart of the national scraper (shown once the country profile is open)
+FIRST_CHART_ID = "c_total_case_evolution"
+
+CHART_HAS_DATA_JS = """
+var element = document.getElementById(arguments[0]);
+var chart = (element && window.echarts) ? echarts.getInstanceByDom(element) : null;
+var option = chart ? chart.getOption() : null;
+return !!(option && option.series && option.series.some(function(series) { return series.data && series.data.length; }));
+"""
+
+RESOURCES_JS = """
+var entries = performance.getEntriesByType('resource');
+return {count: entries.length, bytes: entries.reduce(function(total, entry) { return total + (entry.transferSize || 0); }, 0)};
+"""
+
+
+def time_to_first_chart(download_directory, lean):
+    """
+    Launch Chrome with or without the lean profile and time it until the first chart has data.
+
+    Returns:
+        dict: seconds (None if the chart did not show up), resources, bytes.
+    """
+    start = time.perf_counter()
+    driver = create_driver(download_directory, lean=lean)
+    try:
+        rendered = wait_until(driver, lambda d: d.execute_script(CHART_HAS_DATA_JS, FIRST_CHART_ID), RENDER_TIMEOUT)
+        seconds = time.perf_counter() - start if rendered else None
+        resources = driver.execute_script(RESOURCES_JS)
+    finally:
+        driver.quit()
+    return {"seconds": seconds, "resources": resources["count"], "bytes": resources["bytes"]}
+
+
+def main(argv):
+    runs = int(argv[1]) if len(argv) > 1 else 3
+
+    results = {"standard": [], "lean": []}
+    with tempfile.TemporaryDirectory() as download_directory:
+        # alternate the profiles so both see the same network conditions
+        for run in range(runs):
+            for profile in results:
+                result = time_to_first_chart(download_directory, lean=profile == "lean")
+                results[profile].append(result)
+                seconds = f"{result['seconds']:.1f}s" if result['seconds'] is not None else "no chart"
+                print(f"run {run + 1} {profile:>8}: {seconds} ({result['resources']} resources, {result['bytes'] / 1024:.0f} KiB)")
+
+    print()
+    print(f"{'profile':>8}  {'median s':>8}  {'resources':>9}  {'KiB':>7}")
+    for profile, profile_results in results.items():
+        seconds = [result["seconds"] for result in profile_results if result["seconds"] is not None]
+        print(f"{profile:>8}  {statistics.median(seconds) if seconds else float('nan'):>8.1f}  "
+              f"{statistics.median(result['resources'] for result in profile_results):>9.0f}  "
+              f"{statistics.median(result['bytes'] for result in profile_results) / 1024:>7.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
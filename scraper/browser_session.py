@@ -0,0 +1,327 @@
+# Shared browser session for the dashboard scrapers
+# One warmed-up Chrome (dashboard loaded, Shiny connected, 'country profile' tab open) runs any number of
+# extraction jobs, so the browser launch and the Shiny session start-up are paid once per batch instead of
+# once per script. A job is any callable that takes the session, e.g. the national and Indonesia scrapers:
+#
+#   with BrowserSession(download_directory) as session:
+#       session.run_jobs({"national": national_job, "indonesia": indonesia_job})
+#
+# or from the command line (jobs run in the given order):
+#   python scraper/browser_session.py national indonesia
+
+import os
+import sys
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import WebDriverException
+
+from driver_bootstrap import LaunchTimer, bootstrap, chrome_build, major_version
+from shiny_capture import ShinyFrameCapture, enable_frame_capture
+from shiny_client import DASHBOARD_URL
+from readiness import ShinyReadiness
+from scrape_logging import get_logger, log_record
+
+logger = get_logger("browser")
+
+
+# Lean launch profile (on unless SEARO_LEAN_BROWSER=0): no images, no GPU raster, a small fixed viewport and
+# no requests for resources the extractors never read. Only resource types and third-party hosts are blocked
+# (images, web fonts, map tiles, analytics); the app's own scripts and styles load as usual.
+LEAN_BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*fonts.googleapis.com*", "*fonts.gstatic.com*", "*font-awesome*", "*fontawesome*",
+    "*tile.openstreetmap.org*", "*basemaps.cartocdn.com*", "*arcgisonline.com*", "*tiles.mapbox.com*",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+]
+LEAN_ARGUMENTS = ["--blink-settings=imagesEnabled=false", "--disable-gpu", "--disable-gpu-rasterization",
+                  "--window-size=1280,900"]
+
+# Tabs in the background keep their timers and rendering going (see open_dashboard_tab)
+BACKGROUND_TAB_ARGUMENTS = ["--disable-background-timer-throttling", "--disable-renderer-backgrounding",
+                            "--disable-backgrounding-occluded-windows"]
+
+# Scripts the extractors need: if one is missing after a lean page load, the page is reloaded without blocking
+REQUIRED_SCRIPTS_JS = """
+return {
+    jQuery: !!window.jQuery,
+    Shiny: !!window.Shiny,
+    HTMLWidgets: !!window.HTMLWidgets
+};
+"""
+
+
+def lean_profile_enabled():
+    return os.getenv("SEARO_LEAN_BROWSER", "1") != "0"
+
+
+def frame_capture_enabled():
+    """Capture the Shiny websocket frames (SEARO_ENGINE=capture)"""
+    return os.getenv("SEARO_ENGINE", "").lower() == "capture"
+
+
+def get_chrome_version():
+    """Major version of the installed Chrome (cached per Chrome build, see driver_bootstrap)"""
+    return major_version(chrome_build())
+
+
+def create_driver(download_directory, chrome_version=None, headless=True, lean=None, capture=False):
+    """
+    Launch Chrome, load the dashboard and open the 'country profile' side panel.
+
+    The patched chromedriver comes from the driver_bootstrap cache; every launch phase is timed.
+
+    Args:
+        download_directory (str): Chrome download directory.
+        chrome_version (int): Major Chrome version, detected when not given.
+        headless (bool): Run Chrome without a window.
+        lean (bool): Use the lean launch profile (default: SEARO_LEAN_BROWSER, on).
+        capture (bool): Log the websocket frames for ShinyFrameCapture.
+
+    Returns:
+        The undetected_chromedriver instance.
+    """
+    if lean is None:
+        lean = lean_profile_enabled()
+    timer = LaunchTimer()
+    build, driver_executable, cold = bootstrap(timer)
+
+    with timer.phase("import"):
+        import undetected_chromedriver as uc  # slow to import, only needed when a browser is launched
+
+    prefs = {"download.default_directory": download_directory,}
+    if lean:
+        prefs["profile.managed_default_content_settings.images"] = 2
+
+    # set chrome download directory
+    chrome_options = uc.ChromeOptions()
+    chrome_options.add_experimental_option("prefs", prefs)
+    if lean:
+        for argument in LEAN_ARGUMENTS:
+            chrome_options.add_argument(argument)
+    for argument in BACKGROUND_TAB_ARGUMENTS:
+        chrome_options.add_argument(argument)
+    if capture:
+        enable_frame_capture(chrome_options)
+
+    with timer.phase("launch"):
+        driver = uc.Chrome(headless=headless, use_subprocess=False, options = chrome_options,
+                           version_main=chrome_version or major_version(build), driver_executable_path=driver_executable)
+    if lean:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": LEAN_BLOCKED_URLS})
+
+    with timer.phase("page_load"):
+        driver.get(DASHBOARD_URL + '#')
+        logger.info("Loaded %s", driver.title)
+        ShinyReadiness(driver).wait_for_shiny_ready()
+
+        if lean:
+            scripts = driver.execute_script(REQUIRED_SCRIPTS_JS)
+            missing = [name for name, loaded in scripts.items() if not loaded]
+            if missing:
+                logger.warning("%s missing with the lean profile, reloading without blocking", ", ".join(missing))
+                driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": []})
+                driver.get(DASHBOARD_URL + '#')
+                ShinyReadiness(driver).wait_for_shiny_ready()
+
+    with timer.phase("side_panel"):
+        open_country_profile(driver)
+
+    timer.report(build=build, cold=cold, lean=lean, capture=capture)
+    return driver
+
+
+def open_country_profile(driver):
+    """Click the side panel ('country profile')"""
+    side_panel = WebDriverWait(driver, 20).until(
+        EC.element_to_be_clickable((By.ID, "tab-sidebar_country_profile"))
+    )
+    driver.execute_script("arguments[0].scrollIntoView();", side_panel)
+    driver.execute_script("arguments[0].click();", side_panel)
+
+
+def open_dashboard_tab(driver, lean=None):
+    """
+    Open the dashboard in a new tab of the same browser (a separate Shiny session) with the
+    'country profile' side panel open. The new tab stays the current window.
+
+    Returns:
+        str: The tab's window handle.
+    """
+    if lean is None:
+        lean = lean_profile_enabled()
+
+    driver.switch_to.new_window('tab')
+    if lean:
+        # blocked URLs are set per tab
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": LEAN_BLOCKED_URLS})
+    driver.get(DASHBOARD_URL + '#')
+    ShinyReadiness(driver).wait_for_shiny_ready()
+    open_country_profile(driver)
+    return driver.current_window_handle
+
+
+def browser_rss(driver):
+    """
+    Resident memory (bytes) of the browser: the Chrome process and all its children (renderers, GPU, ...).
+
+    Returns None when psutil is not installed or the process cannot be found.
+    """
+    try:
+        import psutil
+    except ImportError:
+        return None
+
+    # undetected_chromedriver starts Chrome itself (browser_pid), plain Selenium through chromedriver
+    pid = getattr(driver, 'browser_pid', None) or getattr(getattr(getattr(driver, 'service', None), 'process', None), 'pid', None)
+    if pid is None:
+        return None
+    try:
+        process = psutil.Process(pid)
+        total = process.memory_info().rss
+        for child in process.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                continue
+        return total
+    except psutil.Error:
+        return None
+
+
+def selected_country(driver):
+    """Return the label of the country currently selected in the country profile, or None"""
+    selected = driver.execute_script("""
+        var select = document.getElementById('c_country_selection');
+        return (select && select.selectedIndex >= 0) ? select.options[select.selectedIndex].text : null;
+    """)
+    return selected.strip() if selected else None
+
+
+class BrowserSession:
+    """
+    One long-lived browser on the dashboard, shared by extraction jobs
+    """
+
+    def __init__(self, download_directory, chrome_version=None, headless=True, lean=None, capture=None):
+        """
+        Args:
+            download_directory (str): Chrome download directory (also the jobs' output folder).
+            chrome_version (int): Major Chrome version, detected when not given.
+            headless (bool): Run Chrome without a window.
+            lean (bool): Use the lean launch profile (default: SEARO_LEAN_BROWSER, on).
+            capture (bool): Capture the Shiny websocket frames into self.capture (default: SEARO_ENGINE=capture).
+        """
+        self.download_directory = download_directory
+        self.chrome_version = chrome_version
+        self.headless = headless
+        self.lean = lean_profile_enabled() if lean is None else lean
+        self.capture_frames = frame_capture_enabled() if capture is None else capture
+        self.driver = None
+        self.readiness = None
+        self.capture = None
+
+    def start(self):
+        """Launch the browser (once) and wait until the dashboard is ready"""
+        if self.driver is None:
+            if self.chrome_version is None:
+                self.chrome_version = get_chrome_version()
+            self.driver = create_driver(self.download_directory, self.chrome_version, self.headless, self.lean, self.capture_frames)
+            self.readiness = ShinyReadiness(self.driver)
+            if self.capture_frames:
+                self.capture = ShinyFrameCapture(self.driver)
+        return self
+
+    def new_driver(self):
+        """Launch an extra browser with the same settings (e.g. for parallel workers); the caller quits it"""
+        return create_driver(self.download_directory, self.chrome_version, self.headless, self.lean, self.capture_frames)
+
+    def alive(self):
+        """True if the browser still answers (False after a crash or when it was never started)"""
+        if self.driver is None:
+            return False
+        try:
+            self.driver.execute_script("return 1;")
+            return True
+        except WebDriverException:
+            return False
+
+    def close(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            finally:
+                self.driver = None
+                self.readiness = None
+                self.capture = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def run_jobs(self, jobs):
+        """
+        Run extraction jobs one after the other against this browser.
+
+        A failing job is logged and does not stop the others.
+
+        Args:
+            jobs (dict): Job name -> callable taking the session.
+
+        Returns:
+            dict: Job name -> the job's return value, or the exception it raised.
+        """
+        self.start()
+        results = {}
+        for name, job in jobs.items():
+            if not self.alive():
+                # e.g. the previous job's browser crashed: the next job gets a new one
+                logger.warning("Browser not responding, restarting it before job %s", name)
+                try:
+                    self.close()
+                except Exception as e:
+                    logger.debug("Could not quit the old browser: %s", e)
+                self.start()
+            logger.info("Running job: %s", name)
+            try:
+                results[name] = job(self)
+                log_record("job", name=name, status="success")
+            except Exception as e:
+                logger.exception("Job %s failed: %s", name, e)
+                log_record("job", name=name, status="failed", error=str(e))
+                results[name] = e
+        return results
+
+
+def main(argv):
+    # imported here: both scrapers import this module
+    import SEARO_national_selenium_run as national_scraper
+    import SEARO_Indonesia_subnational as indonesia_scraper
+    from run_state import SCRAPE_SUCCESS
+
+    available = {
+        "national": lambda session: national_scraper.run(session=session) == SCRAPE_SUCCESS,
+        "indonesia": lambda session: indonesia_scraper.run(session=session),
+    }
+    names = argv[1:] or list(available)
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        print(f"Unknown jobs: {', '.join(unknown)} (available: {', '.join(available)})")
+        return 1
+
+    download_directory = os.path.join(os.getenv('GITHUB_WORKSPACE', os.getcwd()), 'output')
+    with BrowserSession(download_directory) as session:
+        results = session.run_jobs({name: available[name] for name in names})
+
+    # national returns whether every country was extracted, indonesia the saved file (None if nothing was found)
+    return 0 if all(result and not isinstance(result, Exception) for result in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,104 @@
+# Checkpoint of a national scraping run
+# Every completed (country, chart) unit is appended to a JSON lines file as soon as it is extracted,
+# together with its data. A run that crashes (or is cancelled) leaves the file behind, and a rerun for the
+# same run key (the report date) loads it and only extracts the missing units. The file is removed once
+# a run has completed every unit and saved its outputs. Without a path the units are only kept in memory.
+#
+#   {"run": "2025-06-04"}                                                  first line: the run key
+#   {"country": "India", "chart": "line", "columns": [...], "data": [...]} one line per completed unit
+
+import json
+import os
+import threading
+
+import pandas as pd
+
+from scrape_logging import get_logger
+
+logger = get_logger("checkpoint")
+
+DEFAULT_CHECKPOINT_FILE = "SEARO_National_checkpoint.jsonl"
+
+CHARTS = ("line", "bar")
+
+
+class RunCheckpoint:
+    """
+    Completed (country, chart) units of one run, kept in an append-only file
+    """
+
+    def __init__(self, path, run_key):
+        """
+        Args:
+            path (str): Checkpoint file (None: in memory only).
+            run_key (str): Identifies the run (e.g. the report date); a file from another run is discarded.
+        """
+        self.path = path
+        self.run_key = str(run_key)
+        self.units = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+
+        with open(self.path, encoding="utf-8") as handle:
+            lines = handle.read().splitlines()
+
+        try:
+            header = json.loads(lines[0]) if lines else {}
+        except ValueError:
+            header = {}
+        if header.get("run") != self.run_key:
+            logger.info("Ignoring the checkpoint of run %s (this run: %s)", header.get("run"), self.run_key)
+            os.remove(self.path)
+            return
+
+        for line in lines[1:]:
+            try:
+                unit = json.loads(line)
+            except ValueError:
+                # the last line of a run that crashed while writing it
+                continue
+            self.units[(unit["country"], unit["chart"])] = pd.DataFrame(unit["data"], columns=unit["columns"])
+
+        if self.units:
+            logger.info("Resuming run %s: %d units already extracted", self.run_key, len(self.units))
+
+    def done(self, country, chart):
+        return (country, chart) in self.units
+
+    def missing(self, country):
+        """Charts of a country that still have to be extracted"""
+        return [chart for chart in CHARTS if (country, chart) not in self.units]
+
+    def record(self, country, chart, data):
+        """Store a completed unit (appended to the file right away)"""
+        with self._lock:
+            self.units[(country, chart)] = data
+            if not self.path:
+                return
+
+            line = json.dumps({"country": country, "chart": chart, "columns": list(data.columns),
+                               "data": data.astype(object).where(data.notna(), None).values.tolist()}, default=str)
+            new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            with open(self.path, "ab+") as handle:
+                if new_file:
+                    handle.write((json.dumps({"run": self.run_key}) + "\n").encode("utf-8"))
+                else:
+                    # a line cut off by a crash is left on its own line
+                    handle.seek(-1, os.SEEK_END)
+                    if handle.read(1) != b"\n":
+                        handle.write(b"\n")
+                handle.write((line + "\n").encode("utf-8"))
+
+    def country_data(self, country):
+        """(line_data, bar_data) of a country, empty frames for the missing charts"""
+        return tuple(self.units.get((country, chart), pd.DataFrame()) for chart in CHARTS)
+
+    def clear(self):
+        """Remove the file, e.g. after a complete run"""
+        with self._lock:
+            if self.path and os.path.exists(self.path):
+                os.remove(self.path)
@@ -0,0 +1,303 @@
+# Consolidate the timestamped snapshot CSVs in output/ into one revision database
+# Every SEARO_National_data_* (line chart) and SEARO_National_data_barchart_* (bar chart) file is parsed in a
+# process pool, and each (country, chart, period, series) value is stored once as an interval:
+# the value, the first run it was seen in and the last run it was seen in. A new interval starts only when
+# the reported value changes, so identical rows across runs collapse into one. A value missing from a snapshot
+# of its chart ends its interval there; if it comes back later, that is a new interval.
+# Files already ingested are skipped, so a nightly refresh only parses the new files.
+#
+# Usage:
+#   python scraper/consolidate_history.py [OUTPUT_DIR] [DATABASE]
+#   python scraper/consolidate_history.py output output/SEARO_National_history.sqlite Nepal 202403
+#
+# Periods are YYYYMM integers; runs are "YYYYMMDD_HHMM" timestamps from the file names.
+
+import csv
+import os
+import re
+import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from parquet_writer import MONTH_NUMBERS
+from scrape_logging import get_logger
+
+logger = get_logger("history")
+
+DEFAULT_HISTORY_FILE = "SEARO_National_history.sqlite"
+
+# SEARO_National_data_20250604_0904.csv, SEARO_National_data_barchart_20250604_0904.csv and the
+# first files without the underscore (SEARO_National_data_202412181612.csv)
+_FILE_RE = re.compile(r'^SEARO_National_data_(barchart_)?(\d{8})_?(\d{4})\.csv$')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ingested_files (
+    file_name TEXT PRIMARY KEY,
+    run_ts TEXT NOT NULL,
+    chart TEXT NOT NULL,
+    rows INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS intervals (
+    country TEXT NOT NULL,
+    chart TEXT NOT NULL,
+    period INTEGER NOT NULL,
+    series TEXT NOT NULL,
+    value REAL NOT NULL,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS intervals_key ON intervals (country, chart, period, series, first_seen);
+CREATE INDEX IF NOT EXISTS intervals_period ON intervals (chart, period);
+"""
+
+
+def parse_file_name(file_name):
+    """
+    Return (run_ts, chart) for a snapshot file name, or None for other files.
+
+    Example: "SEARO_National_data_barchart_20250604_0904.csv" -> ("20250604_0904", "bar")
+    """
+    match = _FILE_RE.match(file_name)
+    if not match:
+        return None
+    return f"{match.group(2)}_{match.group(3)}", "bar" if match.group(1) else "line"
+
+
+def _period(month, year):
+    month_number = MONTH_NUMBERS.get(str(month).strip()[:3].lower())
+    try:
+        return int(year) * 100 + month_number if month_number else None
+    except ValueError:
+        return None
+
+
+def _value(text):
+    """Parse a Value cell ("5079.0", "51,183"); None for NA/empty"""
+    text = (text or "").replace(",", "").strip()
+    if not text or text.upper() == "NA":
+        return None
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def read_snapshot(path):
+    """
+    Parse one snapshot CSV (any of the formats the scraper has written) into unique rows.
+
+    Formats:
+        Month,Year,Value,Chart_Type,Country      line chart
+        Period,Series,Value,Chart_Type,Country  bar chart
+        Month,Year,Value,Country                first line chart files (NA for missing values)
+        Year,Month,Value,Country                first bar chart file ("51,183" style values)
+
+    Returns:
+        tuple: (file_name, run_ts, chart, rows) with rows a list of (country, period, series, value).
+    """
+    file_name = os.path.basename(path)
+    run_ts, chart = parse_file_name(file_name)
+
+    rows = {}
+    with open(path, newline="", encoding="utf-8") as handle:
+        for record in csv.DictReader(handle):
+            if 'Period' in record:
+                month, _, year = (record['Period'] or "").partition('-')
+                series = record['Series']
+            else:
+                month, year = record['Month'], record['Year']
+                # the line chart has one series per year, the first bar chart file had no series column
+                series = year if chart == "line" else "Total cases"
+
+            period = _period(month, year)
+            value = _value(record['Value'])
+            if period is None or value is None:
+                continue
+            rows[(record['Country'], period, series)] = value
+
+    return file_name, run_ts, chart, [key + (value,) for key, value in rows.items()]
+
+
+class HistoryDatabase:
+    """
+    Revision database of every value reported in the snapshot files
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(_SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def ingested_files(self):
+        return {row[0] for row in self.connection.execute("SELECT file_name FROM ingested_files")}
+
+    def ingest_directory(self, output_directory, processes=None):
+        """
+        Parse and ingest the snapshot files that are not in the database yet.
+
+        Files are parsed in a process pool and applied in run order.
+
+        Returns:
+            int: Number of files ingested.
+        """
+        done = self.ingested_files()
+        new_files = sorted(
+            (parse_file_name(file_name)[0], file_name)
+            for file_name in os.listdir(output_directory)
+            if parse_file_name(file_name) and file_name not in done
+        )
+        if not new_files:
+            logger.info("No new snapshot files in %s", output_directory)
+            return 0
+
+        latest = self.connection.execute("SELECT MAX(run_ts) FROM ingested_files").fetchone()[0]
+        if latest and new_files[0][0] < latest:
+            logger.warning("%s is older than the latest ingested run %s, its values are merged as if it were newer",
+                           new_files[0][1], latest)
+
+        paths = [os.path.join(output_directory, file_name) for _, file_name in new_files]
+        logger.info("Ingesting %d new snapshot files", len(paths))
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            parsed = list(pool.map(read_snapshot, paths, chunksize=16))
+
+        self._apply(parsed)
+        return len(parsed)
+
+    def _apply(self, parsed):
+        """Merge parsed snapshots (in run order) into the intervals table"""
+        # Latest run applied per chart: only intervals seen in it are still open
+        previous_run = dict(self.connection.execute("SELECT chart, MAX(run_ts) FROM ingested_files GROUP BY chart"))
+
+        # Latest interval of every key: key -> [rowid, value, last_seen]
+        current = {}
+        for rowid, country, chart, period, series, value, last_seen in self.connection.execute("""
+            SELECT rowid, country, chart, period, series, value, last_seen FROM intervals
+            ORDER BY first_seen
+        """):
+            current[(country, chart, period, series)] = [rowid, value, last_seen]
+
+        extended = {}
+        new_intervals = []
+        closed = 0
+
+        for file_name, run_ts, chart, rows in parsed:
+            present = set()
+            for country, period, series, value in rows:
+                key = (country, chart, period, series)
+                present.add(key)
+                latest = current.get(key)
+                if latest is not None and latest[1] == value and latest[2] >= previous_run.get(chart, ""):
+                    # same value as the open interval: extend it
+                    if run_ts > latest[2]:
+                        latest[2] = run_ts
+                        if latest[0] is not None:
+                            extended[latest[0]] = run_ts
+                    continue
+
+                interval = [None, value, run_ts]
+                current[key] = interval
+                new_intervals.append((key, interval, run_ts))
+
+            # keys of the previous run of this chart that this snapshot does not have: their intervals end there
+            if run_ts > previous_run.get(chart, run_ts):
+                closed += sum(1 for key, latest in current.items()
+                              if key[1] == chart and latest[2] == previous_run[chart] and key not in present)
+            previous_run[chart] = max(run_ts, previous_run.get(chart, ""))
+
+        with self.connection:
+            self.connection.executemany(
+                "UPDATE intervals SET last_seen = ? WHERE rowid = ?",
+                [(last_seen, rowid) for rowid, last_seen in extended.items()]
+            )
+            self.connection.executemany(
+                "INSERT INTO intervals VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [key + (interval[1], first_seen, interval[2]) for key, interval, first_seen in new_intervals]
+            )
+            self.connection.executemany(
+                "INSERT INTO ingested_files VALUES (?, ?, ?, ?)",
+                [(file_name, run_ts, chart, len(rows)) for file_name, run_ts, chart, rows in parsed]
+            )
+
+        logger.info("%d new intervals, %d extended, %d closed", len(new_intervals), len(extended), closed)
+
+    def value_history(self, country, period, chart="line", series=None):
+        """
+        Every value reported for one country and period, as of each run.
+
+        Args:
+            country (str): Country name.
+            period (int): YYYYMM, e.g. 202403.
+            chart (str): "line" or "bar".
+            series (str): Series name (defaults to the year for the line chart, any for the bar chart).
+
+        Returns:
+            list: (series, value, first_seen, last_seen) tuples, oldest first.
+        """
+        if series is None and chart == "line":
+            series = str(period // 100)
+        query = """
+            SELECT series, value, first_seen, last_seen FROM intervals
+            WHERE country = ? AND chart = ? AND period = ?
+        """
+        parameters = [country, chart, period]
+        if series is not None:
+            query += " AND series = ?"
+            parameters.append(series)
+        return self.connection.execute(query + " ORDER BY series, first_seen", parameters).fetchall()
+
+    def values_as_of(self, country, first_period, last_period, run_ts=None, chart="line"):
+        """
+        The values of a period range as they were reported in a run.
+
+        Args:
+            country (str): Country name.
+            first_period (int): First YYYYMM period (inclusive).
+            last_period (int): Last YYYYMM period (inclusive).
+            run_ts (str): Run timestamp ("YYYYMMDD_HHMM"), the latest ingested run if None
+                (otherwise the latest ingested run of the chart at or before it).
+            chart (str): "line" or "bar".
+
+        Returns:
+            list: (period, series, value) tuples, in period order (values the run did not report are left out).
+        """
+        if run_ts is None:
+            run_ts = self.connection.execute("SELECT MAX(run_ts) FROM ingested_files WHERE chart = ?", (chart,)).fetchone()[0]
+        else:
+            run_ts = self.connection.execute("SELECT MAX(run_ts) FROM ingested_files WHERE chart = ? AND run_ts <= ?",
+                                             (chart, run_ts)).fetchone()[0]
+        if run_ts is None:
+            return []
+
+        return self.connection.execute("""
+            SELECT period, series, value FROM intervals AS outer_interval
+            WHERE country = ? AND chart = ? AND period BETWEEN ? AND ? AND first_seen <= ? AND last_seen >= ?
+              AND first_seen = (
+                  SELECT MAX(first_seen) FROM intervals
+                  WHERE country = outer_interval.country AND chart = outer_interval.chart
+                    AND period = outer_interval.period AND series = outer_interval.series
+                    AND first_seen <= ?
+              )
+            ORDER BY period, series
+        """, (country, chart, first_period, last_period, run_ts, run_ts, run_ts)).fetchall()
+
+
+def main(argv):
+    output_directory = argv[1] if len(argv) > 1 else "output"
+    database_path = argv[2] if len(argv) > 2 else os.path.join(output_directory, DEFAULT_HISTORY_FILE)
+
+    database = HistoryDatabase(database_path)
+    try:
+        database.ingest_directory(output_directory)
+        if len(argv) > 4:
+            for series, value, first_seen, last_seen in database.value_history(argv[3], int(argv[4])):
+                print(f"{series}\t{value:g}\t{first_seen}\t{last_seen}")
+    finally:
+        database.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,226 @@
+# Append-only delta store for the national chart data
+# Instead of re-dumping every country and period each day, each run only records the values that were
+# inserted, changed or removed since the previous run, keyed by (country, chart, period, series) and
+# tagged with the run timestamp. Any historical snapshot can be rebuilt on demand.
+# The line chart uses Month as the period and Year as the series, the bar chart Period and Series.
+#
+# Usage:
+#   python scraper/delta_store.py output/SEARO_National_delta.sqlite              # list runs
+#   python scraper/delta_store.py output/SEARO_National_delta.sqlite 20250604_0904 output/  # export snapshot CSVs
+
+import json
+import sqlite3
+import sys
+
+import pandas as pd
+
+from scrape_logging import get_logger
+
+logger = get_logger("delta_store")
+
+DEFAULT_STORE_FILE = "SEARO_National_delta.sqlite"
+
+# chart type -> (period column, series column) of the scraped DataFrame
+CHART_COLUMNS = {
+    "line": ("Month", "Year"),
+    "bar": ("Period", "Series"),
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    run_ts TEXT NOT NULL UNIQUE,
+    countries TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS changes (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    country TEXT NOT NULL,
+    chart TEXT NOT NULL,
+    period TEXT NOT NULL,
+    series TEXT NOT NULL,
+    op TEXT NOT NULL,
+    value REAL,
+    ordinal INTEGER
+);
+CREATE INDEX IF NOT EXISTS changes_key ON changes (chart, country, period, series, run_id);
+"""
+
+# Latest record of every key as of a run (removed keys included, filtered by the caller)
+_STATE_SQL = """
+SELECT c.country, c.period, c.series, c.op, c.value, c.ordinal
+FROM changes c
+JOIN (
+    SELECT chart, country, period, series, MAX(run_id) AS run_id
+    FROM changes
+    WHERE chart = ? AND run_id <= ?
+    GROUP BY chart, country, period, series
+) latest USING (chart, country, period, series, run_id)
+"""
+
+
+class DeltaStore:
+    """
+    SQLite-backed append-only store of per-run changes
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): SQLite file (created if it does not exist).
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(_SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def runs(self):
+        """Return the recorded run timestamps, oldest first"""
+        return [row[0] for row in self.connection.execute("SELECT run_ts FROM runs ORDER BY run_id")]
+
+    def _run_id(self, run_ts=None):
+        if run_ts is None:
+            row = self.connection.execute("SELECT MAX(run_id) FROM runs").fetchone()
+        else:
+            row = self.connection.execute("SELECT run_id FROM runs WHERE run_ts = ?", (run_ts,)).fetchone()
+            if row is None:
+                raise KeyError(f"Run {run_ts} not found in {self.path}")
+        return row[0]
+
+    def _state(self, chart, run_id):
+        """Return {(country, period, series): (value, ordinal)} as of run_id"""
+        if run_id is None:
+            return {}
+        state = {}
+        for country, period, series, op, value, ordinal in self.connection.execute(_STATE_SQL, (chart, run_id)):
+            if op != "remove":
+                state[(country, period, series)] = (value, ordinal)
+        return state
+
+    @staticmethod
+    def _frame_state(df, chart):
+        """Return {(country, period, series): (value, ordinal)} for a scraped DataFrame"""
+        if df is None or df.empty:
+            return {}
+        period_column, series_column = CHART_COLUMNS[chart]
+        # the ordinal is the position within the country, so a new month only shifts its own country
+        ordinals = df.groupby('Country', sort=False).cumcount()
+        keys = zip(df['Country'].astype(str), df[period_column].astype(str), df[series_column].astype(str))
+        return {key: (float(value), int(ordinal)) for key, value, ordinal in zip(keys, df['Value'], ordinals)}
+
+    def record_run(self, run_ts, line_df, bar_df):
+        """
+        Record one scrape run as the differences from the latest stored run.
+
+        Args:
+            run_ts (str): Run timestamp (e.g. "20250604_0904"), must be new.
+            line_df (DataFrame): Line chart data of the run (Month, Year, Value, Chart_Type, Country).
+            bar_df (DataFrame): Bar chart data of the run (Period, Series, Value, Chart_Type, Country).
+
+        Returns:
+            dict: Number of "insert", "change" and "remove" records written.
+        """
+        counts = {"insert": 0, "change": 0, "remove": 0}
+        previous_run = self._run_id()
+
+        # Country order of this run, so snapshots come back in the same order as the CSV files
+        countries = []
+        for df in (line_df, bar_df):
+            if df is not None and not df.empty:
+                countries.extend(country for country in pd.unique(df['Country']) if country not in countries)
+
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO runs (run_ts, countries) VALUES (?, ?)", (run_ts, json.dumps(countries))
+            )
+            run_id = cursor.lastrowid
+
+            rows = []
+            for chart, df in (("line", line_df), ("bar", bar_df)):
+                old = self._state(chart, previous_run)
+                new = self._frame_state(df, chart)
+
+                for key, (value, ordinal) in new.items():
+                    if key not in old:
+                        op = "insert"
+                    elif old[key] != (value, ordinal):
+                        op = "change"
+                    else:
+                        continue
+                    rows.append((run_id, key[0], chart, key[1], key[2], op, value, ordinal))
+                    counts[op] += 1
+
+                for key in old.keys() - new.keys():
+                    rows.append((run_id, key[0], chart, key[1], key[2], "remove", None, None))
+                    counts["remove"] += 1
+
+            self.connection.executemany("INSERT INTO changes VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+        logger.info("Delta store run %s: %d inserted, %d changed, %d removed",
+                    run_ts, counts["insert"], counts["change"], counts["remove"])
+        return counts
+
+    def snapshot(self, run_ts=None):
+        """
+        Rebuild the data of a run as it was scraped.
+
+        Args:
+            run_ts (str): Run timestamp, the latest run if None.
+
+        Returns:
+            tuple: (line_df, bar_df) with the same columns as the snapshot CSV files.
+        """
+        run_id = self._run_id(run_ts)
+        if run_id is None:
+            return pd.DataFrame(), pd.DataFrame()
+
+        countries = json.loads(self.connection.execute(
+            "SELECT countries FROM runs WHERE run_id = ?", (run_id,)
+        ).fetchone()[0])
+        country_order = {country: index for index, country in enumerate(countries)}
+
+        frames = []
+        for chart in ("line", "bar"):
+            state = self._state(chart, run_id)
+            if not state:
+                frames.append(pd.DataFrame())
+                continue
+
+            ordered = sorted(state.items(), key=lambda item: (country_order.get(item[0][0], len(country_order)), item[1][1]))
+            period_column, series_column = CHART_COLUMNS[chart]
+            frames.append(pd.DataFrame({
+                period_column: [key[1] for key, _ in ordered],
+                series_column: [key[2] for key, _ in ordered],
+                'Value': [value for _, (value, _) in ordered],
+                'Chart_Type': chart,
+                'Country': [key[0] for key, _ in ordered],
+            }))
+
+        return frames[0], frames[1]
+
+
+def main(argv):
+    if len(argv) < 2:
+        print("Usage: delta_store.py STORE [RUN_TS OUTPUT_DIR]")
+        return 1
+
+    store = DeltaStore(argv[1])
+    try:
+        if len(argv) < 4:
+            for run_ts in store.runs():
+                print(run_ts)
+            return 0
+
+        run_ts, output_directory = argv[2], argv[3]
+        line_df, bar_df = store.snapshot(run_ts)
+        line_df.to_csv(f"{output_directory}/SEARO_National_data_{run_ts}.csv", index=False)
+        bar_df.to_csv(f"{output_directory}/SEARO_National_data_barchart_{run_ts}.csv", index=False)
+        print(f"Exported {len(line_df)} line and {len(bar_df)} bar rows for run {run_ts}")
+        return 0
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,189 @@
+# Chrome / chromedriver bootstrap shared by the scrapers
+# Launching undetected_chromedriver normally costs a Chrome version lookup (a shell per candidate binary) and a
+# chromedriver download + patch on every run. Both are cached here, keyed on the installed Chrome build:
+#   - chrome_build.json holds the build of the Chrome binary together with the binary's size and mtime,
+#     so the version is only asked from Chrome again when the binary changed (i.e. Chrome was upgraded)
+#   - <build>/chromedriver is the patched driver for that build, handed to uc.Chrome as
+#     driver_executable_path (uc neither re-downloads nor deletes a driver it was given)
+# The cache lives in SEARO_DRIVER_CACHE (default ~/.cache/searo-driver); the workflow restores it between runs.
+#
+# Each launch phase is timed with LaunchTimer and written as one "launch" log record.
+
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+
+from scrape_logging import get_logger, log_record
+
+logger = get_logger("bootstrap")
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "searo-driver")
+BUILD_CACHE_FILE = "chrome_build.json"
+
+# Chrome binaries tried on Linux, in order
+CHROME_BINARIES = ["google-chrome", "google-chrome-stable", "chromium-browser", "chromium"]
+
+_BUILD_RE = re.compile(r'\b(\d+\.\d+\.\d+\.\d+)\b')
+
+
+def cache_directory():
+    return os.getenv("SEARO_DRIVER_CACHE") or DEFAULT_CACHE_DIR
+
+
+def _load_json(path):
+    try:
+        with open(path, encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return {}
+
+
+def _windows_chrome_build():
+    import winreg  # Windows only
+
+    with winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Software\Google\Chrome\BLBeacon") as key:
+        return winreg.QueryValueEx(key, "version")[0]
+
+
+def chrome_build(cache_dir=None):
+    """
+    Return the full build of the installed Chrome (e.g. "131.0.6778.85").
+
+    On Linux the binary is only run (without a shell) when it is not in the cache or has changed since.
+
+    Raises:
+        RuntimeError: No Chrome found or its version could not be read.
+    """
+    if sys.platform == "win32":
+        try:
+            return _windows_chrome_build()
+        except OSError as e:
+            raise RuntimeError("Failed to get Chrome version") from e
+
+    cache_dir = cache_dir or cache_directory()
+    cache_path = os.path.join(cache_dir, BUILD_CACHE_FILE)
+    cached = _load_json(cache_path)
+
+    for name in CHROME_BINARIES:
+        binary = shutil.which(name)
+        if not binary:
+            continue
+
+        stat = os.stat(binary)  # follows the symlink to the installed build
+        signature = {"binary": binary, "size": stat.st_size, "mtime": stat.st_mtime}
+        if cached.get("build") and all(cached.get(key) == value for key, value in signature.items()):
+            logger.debug("Chrome build %s (cached)", cached["build"])
+            return cached["build"]
+
+        try:
+            output = subprocess.run([binary, "--version"], capture_output=True, text=True, timeout=30, check=True).stdout
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.debug("%s --version failed: %s", binary, e)
+            continue
+
+        match = _BUILD_RE.search(output)
+        if not match:
+            continue
+
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(cache_path, "w", encoding="utf-8") as handle:
+            json.dump(dict(signature, build=match.group(1)), handle, indent=2)
+        logger.info("Detected Chrome %s (%s)", match.group(1), binary)
+        return match.group(1)
+
+    raise RuntimeError("Could not determine Chrome version")
+
+
+def major_version(build):
+    return int(build.split(".")[0])
+
+
+def driver_path(build, cache_dir=None):
+    """Path of the cached patched chromedriver for a Chrome build (it may not exist yet)"""
+    exe_name = "chromedriver.exe" if sys.platform == "win32" else "chromedriver"
+    return os.path.join(cache_dir or cache_directory(), build, exe_name)
+
+
+def patched_driver(build, cache_dir=None):
+    """
+    Return the path of a patched chromedriver for the Chrome build, downloading and patching it
+    only if it is not cached yet. Drivers of other builds are removed from the cache.
+    """
+    cache_dir = cache_dir or cache_directory()
+    path = driver_path(build, cache_dir)
+    if os.path.exists(path):
+        return path
+
+    from undetected_chromedriver.patcher import Patcher  # slow to import, only needed on a cold start
+
+    logger.info("No cached chromedriver for Chrome %s, downloading and patching", build)
+    patcher = Patcher(version_main=major_version(build))
+    patcher.auto()
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary_path = path + ".tmp"
+    shutil.copy2(patcher.executable_path, temporary_path)
+    os.replace(temporary_path, path)
+
+    for entry in os.listdir(cache_dir):
+        if entry != build and os.path.isdir(os.path.join(cache_dir, entry)):
+            shutil.rmtree(os.path.join(cache_dir, entry), ignore_errors=True)
+    return path
+
+
+class LaunchTimer:
+    """
+    Wall time of the phases of a browser launch:
+
+        timer = LaunchTimer()
+        with timer.phase("detect"):
+            ...
+        timer.report(cold=False)
+    """
+
+    def __init__(self):
+        self.phases = {}
+        self._start = time.perf_counter()
+
+    def phase(self, name):
+        return _Phase(self, name)
+
+    def report(self, **fields):
+        """Log the phase timings as one "launch" record"""
+        total = time.perf_counter() - self._start
+        logger.info("Browser launch %.1fs (%s)", total,
+                    ", ".join(f"{name} {seconds:.1f}s" for name, seconds in self.phases.items()))
+        log_record("launch", total=round(total, 3), **{name: round(seconds, 3) for name, seconds in self.phases.items()}, **fields)
+
+
+class _Phase:
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.timer.phases[self.name] = self.timer.phases.get(self.name, 0.0) + time.perf_counter() - self.start
+
+
+def bootstrap(timer=None):
+    """
+    Detect Chrome and get its patched driver.
+
+    Returns:
+        tuple: (build, driver path, cold) - cold is True if the driver had to be downloaded.
+    """
+    timer = timer or LaunchTimer()
+    with timer.phase("detect"):
+        build = chrome_build()
+    with timer.phase("driver"):
+        cold = not os.path.exists(driver_path(build))
+        path = patched_driver(build)
+    return build, path, cold
@@ -0,0 +1,93 @@
+# Content fingerprints of the scraped chart data
+# Each country's line and bar chart data is normalized (sorted rows, fixed value format) and hashed.
+# The latest fingerprints are kept in a small JSON file next to the outputs, so a run can tell which
+# countries actually changed and skip writing a new snapshot when nothing did.
+
+import hashlib
+import json
+import os
+
+from scrape_logging import get_logger
+
+logger = get_logger("fingerprints")
+
+DEFAULT_FINGERPRINT_FILE = "SEARO_National_fingerprints.json"
+
+# Columns hashed for each chart type (Chart_Type and Country are implied by the key)
+_KEY_COLUMNS = {
+    "line": ["Month", "Year"],
+    "bar": ["Period", "Series"],
+}
+
+
+def fingerprint_frame(df, chart_type):
+    """
+    Hash the normalized content of one country's chart data.
+
+    Rows are sorted by their key columns and values are written with a fixed format, so the
+    fingerprint does not depend on row order or float formatting.
+
+    Returns:
+        str: Hex digest, or None if there is no data.
+    """
+    if df is None or df.empty:
+        return None
+
+    key_columns = _KEY_COLUMNS[chart_type]
+    normalized = df[key_columns + ['Value']].astype({column: str for column in key_columns})
+    normalized = normalized.sort_values(key_columns, kind='stable')
+
+    digest = hashlib.sha256()
+    for row in zip(*(normalized[column] for column in key_columns), normalized['Value']):
+        digest.update(("\t".join(row[:-1]) + f"\t{float(row[-1]):.6f}\n").encode())
+    return digest.hexdigest()
+
+
+def load_fingerprints(path):
+    """Return the stored {country: {chart_type: digest}}, empty if the file does not exist"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def save_fingerprints(path, fingerprints):
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(fingerprints, handle, indent=2, sort_keys=True)
+
+
+def compare_fingerprints(stored, results):
+    """
+    Fingerprint the extracted data of each country and compare it with the stored fingerprints.
+
+    Args:
+        stored (dict): Fingerprints from the previous write ({country: {chart_type: digest}}).
+        results (dict): country -> (line_data, bar_data), or None if the extraction failed.
+
+    Returns:
+        tuple: (status, current) where status is country -> "changed", "unchanged" or "failed" and
+               current is the updated fingerprints (failed charts keep their stored fingerprint).
+    """
+    status = {}
+    current = {}
+
+    for country, country_result in results.items():
+        if country_result is None or (country_result[0].empty and country_result[1].empty):
+            status[country] = "failed"
+            continue
+
+        line_data, bar_data = country_result
+
+        previous = stored.get(country, {})
+        # an empty chart is an extraction failure, not a change: keep its stored fingerprint
+        current[country] = {
+            "line": fingerprint_frame(line_data, "line") or previous.get("line"),
+            "bar": fingerprint_frame(bar_data, "bar") or previous.get("bar"),
+        }
+        status[country] = "unchanged" if previous == current[country] else "changed"
+
+    # failed countries and countries that were not scraped this time keep their fingerprint
+    for country, digests in stored.items():
+        current.setdefault(country, digests)
+
+    return status, current
@@ -0,0 +1,380 @@
+# Asyncio orchestration of a scraping run
+# The run is modelled as tasks: the report date check, one extraction per country, the Indonesia monthly pulls
+# and the writers. Blocking work (HTTP, Selenium, file writes) runs in a thread pool through run_in_executor,
+# the event loop only schedules it:
+#   - concurrency is bounded per resource: a queue of extraction sessions (SEARO_WORKERS browsers, or Shiny
+#     clients with SEARO_ENGINE=shiny), each serving one task at a time, and a semaphore for HTTP requests
+#   - every task has a deadline (asyncio.wait_for), a country one per extraction attempt. A thread cannot be
+#     stopped, so a browser attempt that misses it gets its extractor cancelled (no further attempts, browser
+#     launches or checkpoint writes) and its browser closed, which makes the blocked Selenium call fail; the
+#     next attempt runs on a new session
+#   - a country is attempted up to RETRY_ATTEMPTS times (a fresh page, or a new browser after a crash)
+#   - independent work overlaps: each country's charts are written to the run checkpoint (checkpoint.py) by a
+#     writer task while its session already extracts the next country, and the Indonesia months are pulled on
+#     their own browser next to the country extractions. The snapshot files are assembled from the checkpoint
+#     once every country is done; a rerun for the same report date only extracts the countries that are missing
+#
+# Usage:
+#   python scraper/orchestrator.py                  check the report date, scrape if it changed
+#   python scraper/orchestrator.py --force          scrape whatever the report date
+#   python scraper/orchestrator.py --no-indonesia   national data only
+
+import asyncio
+import functools
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from checkpoint import DEFAULT_CHECKPOINT_FILE, RunCheckpoint
+from run_state import SCRAPE_FAILED, SCRAPE_INCOMPLETE, SCRAPE_SUCCESS
+from scrape_logging import get_logger, log_record
+
+logger = get_logger("orchestrator")
+
+# Deadlines (seconds) per task
+CHECK_DEADLINE = 90
+LAUNCH_DEADLINE = 180
+COUNTRY_DEADLINE = 240
+MONTH_DEADLINE = 60
+WRITE_DEADLINE = 300
+
+# Concurrent HTTP requests (report date check, Shiny client connections)
+HTTP_CONCURRENCY = 2
+
+
+class _Slot:
+    """One extraction session: an extractor and how to close what it runs on"""
+
+    def __init__(self, extractor, close):
+        self.extractor = extractor
+        self.close = close
+
+
+class Orchestrator:
+    """
+    Runs the scraping tasks of one run on an event loop
+    """
+
+    def __init__(self, download_directory, workers=1, engine="selenium", storage="csv", force_write=False, indonesia=True):
+        """
+        Args:
+            download_directory (str): Output folder.
+            workers (int): Extraction sessions for the country tasks.
+            engine (str): "selenium", "capture" or "shiny" (see SEARO_national_selenium_run.run).
+            storage (str): Storage outputs, e.g. "csv" or "csv,parquet".
+            force_write (bool): Save a snapshot even if no country's data changed.
+            indonesia (bool): Also pull the Indonesia provinces table (on its own browser).
+        """
+        self.download_directory = download_directory
+        self.workers = max(1, workers)
+        self.engine = engine
+        self.storage = storage
+        self.force_write = force_write
+        self.indonesia = indonesia
+
+        # the country sessions, the Indonesia browser, and the writers / HTTP calls next to them
+        self.executor = ThreadPoolExecutor(max_workers=self.workers + 3, thread_name_prefix="searo")
+        self.http = asyncio.Semaphore(HTTP_CONCURRENCY)
+        # undetected_chromedriver launches are not safe to run concurrently; the thread lock also covers the
+        # replacement browsers the extractors start on their own after a crash
+        self.launch_lock = asyncio.Lock()
+        self.driver_launch_lock = threading.Lock()
+        self.slots = asyncio.Queue()
+        # sessions in use or in the queue; when the last one is lost the waiting tasks fail instead of hanging
+        self.live_slots = 0
+        # completed (country, chart) units, keyed on the report date once it is known
+        self.checkpoint = None
+
+    async def blocking(self, deadline, function, *args, **kwargs):
+        """Run a blocking call in the thread pool; raises TimeoutError when it takes longer than deadline"""
+        loop = asyncio.get_running_loop()
+        return await asyncio.wait_for(loop.run_in_executor(self.executor, functools.partial(function, *args, **kwargs)), deadline)
+
+    # Sessions
+
+    def _open_slot(self):
+        from SEARO_national_selenium_run import CountryDataExtractor, ExtractionCancelled
+        from browser_session import BrowserSession
+        from shiny_client import ShinyClient, DASHBOARD_URL
+
+        if self.engine == "shiny":
+            client = ShinyClient(DASHBOARD_URL, output_ids=["c_trend_cases_country_month_out", "c_total_case_evolution"])
+            client.connect()
+            extractor = CountryDataExtractor(None, shiny_client=client)
+            extractor.checkpoint = self.checkpoint
+            return _Slot(extractor, client.close)
+
+        session = BrowserSession(self.download_directory, capture=self.engine == "capture")
+        with self.driver_launch_lock:
+            session.start()
+
+        def new_driver():
+            # no browser for an attempt the orchestrator has given up on (its session is being closed)
+            if extractor.cancelled.is_set():
+                raise ExtractionCancelled("extraction session closed")
+            with self.driver_launch_lock:
+                return session.new_driver()
+
+        def close():
+            # the extractor may be on a browser of its own after a crash
+            extractor._quit_replacement_drivers()
+            session.close()
+
+        extractor = CountryDataExtractor(session.driver, capture=session.capture)
+        extractor.checkpoint = self.checkpoint
+        extractor.driver_factory = new_driver
+        return _Slot(extractor, close)
+
+    async def open_slot(self):
+        if self.engine == "shiny":
+            async with self.http:
+                return await self.blocking(LAUNCH_DEADLINE, self._open_slot)
+        async with self.launch_lock:
+            return await self.blocking(LAUNCH_DEADLINE, self._open_slot)
+
+    async def add_slot(self):
+        self.slots.put_nowait(await self.open_slot())
+        self.live_slots += 1
+
+    async def close_slot(self, slot):
+        try:
+            await self.blocking(LAUNCH_DEADLINE, slot.close)
+        except Exception as e:
+            logger.warning("Could not close an extraction session: %s", e)
+
+    # Tasks
+
+    async def check(self):
+        """Report date check; returns (report_date, should_scrape, state)"""
+        from SEARO_main_scraper import check_for_update, fetch_report_date
+        from run_state import RunState
+
+        async with self.http:
+            report_date = await self.blocking(CHECK_DEADLINE, fetch_report_date)
+        if report_date is None:
+            return None, False, None
+
+        state = RunState()
+        return report_date, check_for_update(state, report_date), state
+
+    async def take_slot(self, country):
+        """Next free session, or None (logged) when every session has been lost"""
+        slot = await self.slots.get()
+        if slot is None:
+            # no session left: pass the marker on to the next waiting task
+            self.slots.put_nowait(None)
+            logger.error("%s: no extraction session left", country)
+            log_record("extraction_failed", country=country, error="no extraction session left", engine=self.engine)
+        return slot
+
+    def release_slot(self, slot):
+        """Put a working session back, or count a lost one (None)"""
+        if slot is not None:
+            self.slots.put_nowait(slot)
+            return
+        self.live_slots -= 1
+        if self.live_slots == 0:
+            self.slots.put_nowait(None)
+
+    async def replace_slot(self, slot):
+        """Cancel and close a session whose attempt missed its deadline; returns a new session or None"""
+        # the attempt's thread keeps running until its Selenium call fails: stop it from going any further
+        slot.extractor.cancelled.set()
+        await self.close_slot(slot)
+        try:
+            return await self.open_slot()
+        except Exception as e:
+            logger.error("Could not replace the extraction session: %s", e or type(e).__name__)
+            return None
+
+    async def write_units(self, country, units):
+        """Add a country's extracted charts to the checkpoint"""
+        for chart, data in units.items():
+            await self.blocking(WRITE_DEADLINE, self.checkpoint.record, country, chart, data)
+
+    async def extract_country(self, country):
+        """
+        Extract the missing charts of one country on the next free session, up to max_attempts attempts
+        with a deadline each. The charts are written to the checkpoint by a writer task, the session is
+        released for the next country meanwhile.
+        """
+        slot = await self.take_slot(country)
+        if slot is None:
+            return
+
+        charts = self.checkpoint.missing(country)
+        writers = []
+        fresh = True
+        try:
+            for attempt in range(1, slot.extractor.max_attempts + 1):
+                if not charts:
+                    break
+                if attempt > 1:
+                    logger.info("%s: retrying %s chart (attempt %d/%d)", country, " and ".join(charts), attempt, slot.extractor.max_attempts)
+
+                try:
+                    units = await self.blocking(COUNTRY_DEADLINE, slot.extractor._extract_attempt, country, charts, attempt, not fresh)
+                except (TimeoutError, asyncio.TimeoutError):
+                    logger.error("%s: no result within %ss (attempt %d)", country, COUNTRY_DEADLINE, attempt)
+                    log_record("extraction_failed", country=country, error=f"no result within {COUNTRY_DEADLINE}s",
+                               engine=self.engine, attempt=attempt)
+                    slot = await self.replace_slot(slot)
+                    if slot is None:
+                        break
+                    fresh = True
+                    continue
+
+                fresh = False
+                if units:
+                    writers.append(asyncio.create_task(self.write_units(country, units)))
+                    charts = [chart for chart in charts if chart not in units]
+        finally:
+            self.release_slot(slot)
+
+        for result in await asyncio.gather(*writers, return_exceptions=True):
+            if isinstance(result, BaseException):
+                logger.error("%s: could not write to the checkpoint - %s", country, result or type(result).__name__)
+
+    async def national(self):
+        """
+        Extract every country missing from the checkpoint on the session pool, then write the snapshot.
+
+        Returns:
+            str: SCRAPE_SUCCESS, SCRAPE_INCOMPLETE (countries left in the checkpoint) or SCRAPE_FAILED (no data).
+        """
+        import SEARO_national_selenium_run as national_scraper
+        from SEARO_national_selenium_run import COUNTRIES
+
+        if self.checkpoint is None:
+            self.checkpoint = RunCheckpoint(None, datetime.now().strftime('%Y-%m-%d'))
+        remaining = [country for country in COUNTRIES if self.checkpoint.missing(country)]
+        if len(remaining) < len(COUNTRIES):
+            logger.info("Already extracted in this run: %s", ", ".join(country for country in COUNTRIES if country not in remaining))
+
+        if remaining:
+            try:
+                for _ in range(min(self.workers, len(remaining))):
+                    await self.add_slot()
+                await asyncio.gather(*(self.extract_country(country) for country in remaining))
+            finally:
+                while not self.slots.empty():
+                    slot = self.slots.get_nowait()
+                    if slot is not None:
+                        await self.close_slot(slot)
+
+        # writing does not need a browser: the sessions are closed while the Indonesia pulls may still run
+        writer = national_scraper.CountryDataExtractor(None)
+        today = datetime.now().strftime('%Y%m%d_%H%M')
+        results = {country: self.checkpoint.country_data(country) for country in COUNTRIES}
+        line_data, bar_data = await self.blocking(WRITE_DEADLINE, writer._save_results, COUNTRIES, results,
+                                                  self.download_directory, today, self.storage, self.force_write)
+        if line_data.empty and bar_data.empty:
+            return SCRAPE_FAILED
+        if any(self.checkpoint.missing(country) for country in COUNTRIES):
+            return SCRAPE_INCOMPLETE
+        self.checkpoint.clear()
+        return SCRAPE_SUCCESS
+
+    async def indonesia_provinces(self):
+        """Pull every month of the Indonesia provinces table on a dedicated browser and write it; returns the file path"""
+        import SEARO_Indonesia_subnational as indonesia_scraper
+        from browser_session import BrowserSession
+        from readiness import ShinyReadiness
+
+        session = BrowserSession(self.download_directory, capture=self.engine == "capture")
+        async with self.launch_lock:
+            await self.blocking(LAUNCH_DEADLINE, session.start)
+
+        try:
+            driver = session.driver
+            readiness = ShinyReadiness(driver)
+            await self.blocking(COUNTRY_DEADLINE, indonesia_scraper.select_indonesia, driver, readiness)
+            months = await self.blocking(MONTH_DEADLINE, indonesia_scraper.month_sequence, driver)
+
+            data = []
+            for pulled, month in enumerate(months):
+                try:
+                    data.extend(await self.blocking(MONTH_DEADLINE, indonesia_scraper.seek_month, driver, readiness, month, session.capture))
+                except (TimeoutError, asyncio.TimeoutError):
+                    # one browser: a month that misses its deadline ends the pulls (the browser is closed below),
+                    # the months pulled so far are still written
+                    logger.error("Indonesia %s: no result within %ss, stopping after %d months", month, MONTH_DEADLINE, pulled)
+                    log_record("extraction_failed", country="Indonesia", chart="province_table", month=month,
+                               error=f"no result within {MONTH_DEADLINE}s")
+                    break
+        finally:
+            await self.blocking(LAUNCH_DEADLINE, session.close)
+
+        df = indonesia_scraper.provinces_frame(data)
+        if df.empty:
+            return None
+        return await self.blocking(WRITE_DEADLINE, indonesia_scraper.save_provinces, df, self.download_directory)
+
+    async def scrape(self):
+        """
+        Run the national extraction and the Indonesia pulls side by side.
+
+        Returns:
+            str: The outcome of the national extraction (see national); the Indonesia pulls are best effort.
+        """
+        tasks = [asyncio.create_task(self.national(), name="national")]
+        if self.indonesia:
+            tasks.append(asyncio.create_task(self.indonesia_provinces(), name="indonesia"))
+
+        try:
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            # cancel whatever is left, e.g. when this run is cancelled
+            for task in tasks:
+                task.cancel()
+
+        for task, result in zip(tasks, results):
+            if isinstance(result, BaseException):
+                logger.error("Task %s failed: %s", task.get_name(), result or type(result).__name__)
+                log_record("task", name=task.get_name(), status="failed", error=str(result) or type(result).__name__)
+            else:
+                log_record("task", name=task.get_name(), status="success")
+
+        return SCRAPE_FAILED if isinstance(results[0], BaseException) else results[0]
+
+    async def run(self, force=False):
+        """Check the report date and scrape when it changed (always with force); returns the exit code"""
+        try:
+            try:
+                report_date, should_scrape, state = await self.check()
+            except (TimeoutError, asyncio.TimeoutError):
+                logger.error("Report date check did not finish within %ss", CHECK_DEADLINE)
+                return 1
+            if report_date is None:
+                return 1
+            if not (should_scrape or force):
+                return 0
+
+            self.checkpoint = RunCheckpoint(os.path.join(self.download_directory, DEFAULT_CHECKPOINT_FILE), report_date)
+
+            # an incomplete scrape is not recorded as a success: the next run scrapes the report date again
+            status = await self.scrape()
+            state.record_scrape(report_date, status)
+            log_record("scrape", status=status, report_date=report_date)
+            return 0 if status == SCRAPE_SUCCESS else 1
+        finally:
+            # threads blocked on a closed browser fail on their own, do not wait for them
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def main(argv):
+    orchestrator = Orchestrator(
+        download_directory=os.path.join(os.getenv('GITHUB_WORKSPACE', os.getcwd()), 'output'),
+        workers=int(os.getenv('SEARO_WORKERS', '1')),
+        engine=os.getenv('SEARO_ENGINE', 'selenium').lower(),
+        storage=os.getenv('SEARO_STORAGE', 'csv').lower(),
+        force_write=os.getenv('SEARO_FORCE_WRITE', '').lower() in ('1', 'true', 'yes'),
+        indonesia="--no-indonesia" not in argv[1:],
+    )
+    return asyncio.run(orchestrator.run(force="--force" in argv[1:]))
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
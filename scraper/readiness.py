@@ -0,0 +1,191 @@
+# Event-driven readiness checks for the SEARO dashboard (Shiny + ECharts)
+# Instead of fixed time.sleep() calls, wait on real signals from the page:
+#   - Shiny's shiny:busy / shiny:idle / shiny:value events (per output ID)
+#   - the ECharts 'finished' event (chart re-rendered)
+#   - a change in the option/content hash compared with the previous state
+# Every wait has its own timeout and returns as soon as the signal is seen.
+
+import time
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+from scrape_logging import get_logger
+
+logger = get_logger("readiness")
+
+# Default timeouts (seconds) for each kind of wait
+PAGE_LOAD_TIMEOUT = 30
+RENDER_TIMEOUT = 20
+TABLE_RENDER_TIMEOUT = 30
+
+POLL_INTERVAL = 0.2
+
+# Installs the page-side event counters once per page load
+INSTALL_LISTENERS_JS = """
+if (!window.__searoReady) {
+    var state = window.__searoReady = {busy: false, idleCount: 0, values: {}, errors: {}, finished: {}};
+    if (window.jQuery) {
+        jQuery(document).on('shiny:busy', function() { state.busy = true; });
+        jQuery(document).on('shiny:idle', function() { state.busy = false; state.idleCount++; });
+        jQuery(document).on('shiny:value', function(event) { state.values[event.name] = (state.values[event.name] || 0) + 1; });
+        jQuery(document).on('shiny:error', function(event) { state.errors[event.name] = (state.errors[event.name] || 0) + 1; });
+    }
+}
+return !!window.jQuery;
+"""
+
+# arguments[0]: output IDs; returns the counters and a content hash per output
+READINESS_STATE_JS = """
+var ids = arguments[0];
+var state = window.__searoReady || {busy: false, idleCount: 0, values: {}, errors: {}, finished: {}};
+
+function hashString(text) {
+    var hash = 5381;
+    for (var i = 0; i < text.length; i++) {
+        hash = ((hash << 5) + hash + text.charCodeAt(i)) | 0;
+    }
+    return hash;
+}
+
+var result = {
+    connected: !!(window.Shiny && Shiny.shinyapp && Shiny.shinyapp.isConnected()),
+    busy: state.busy,
+    idleCount: state.idleCount,
+    outputs: {}
+};
+
+ids.forEach(function(id) {
+    var info = {values: state.values[id] || 0, errors: state.errors[id] || 0, finished: state.finished[id] || 0, hooked: false, hash: null};
+    var element = document.getElementById(id);
+    var instance = (element && window.echarts) ? echarts.getInstanceByDom(element) : null;
+
+    if (instance) {
+        if (!instance.__searoHooked) {
+            instance.on('finished', function() { state.finished[id] = (state.finished[id] || 0) + 1; });
+            instance.__searoHooked = true;
+        }
+        info.hooked = true;
+        var option = instance.getOption() || {};
+        info.hash = hashString(JSON.stringify({
+            x: option.xAxis && option.xAxis[0] ? option.xAxis[0].data : null,
+            s: (option.series || []).map(function(series) { return [series.name, series.data]; })
+        }));
+    } else if (element) {
+        // tables and other outputs: hash the rendered content
+        info.hash = hashString(element.textContent || '');
+    }
+    result.outputs[id] = info;
+});
+
+return result;
+"""
+
+
+class StaleOutputError(RuntimeError):
+    """An output did not receive a new value after an input change (it may still show the previous selection)"""
+
+
+def stale_outputs(status):
+    """Output IDs that are not "updated" in a wait_for_render / ShinyFrameCapture.wait_for_values status"""
+    return sorted(output_id for output_id, value in status.items() if value != "updated")
+
+
+def wait_until(driver, condition, timeout, poll_frequency=POLL_INTERVAL):
+    """
+    Poll condition(driver) until it returns a truthy value.
+
+    Returns:
+        The condition's value, or None on timeout.
+    """
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=poll_frequency).until(condition)
+    except TimeoutException:
+        return None
+
+
+class ShinyReadiness:
+    """
+    Waits for Shiny outputs to be recomputed and re-rendered
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def install(self):
+        """Install the page-side event listeners (safe to call repeatedly)"""
+        has_jquery = self.driver.execute_script(INSTALL_LISTENERS_JS)
+        if not has_jquery:
+            logger.warning("jQuery not found, readiness falls back to content hashes only")
+
+    def wait_for_shiny_ready(self, timeout=PAGE_LOAD_TIMEOUT):
+        """Wait until the Shiny session is connected, then install the listeners"""
+        start = time.monotonic()
+        connected = wait_until(
+            self.driver,
+            lambda d: d.execute_script("return !!(window.Shiny && Shiny.shinyapp && Shiny.shinyapp.isConnected());"),
+            timeout
+        )
+        if not connected:
+            logger.warning("Shiny session not connected after %ss, continuing anyway", timeout)
+        self.install()
+        logger.info("Shiny ready after %.1fs", time.monotonic() - start)
+        return bool(connected)
+
+    def mark(self, output_ids):
+        """
+        Record the current state of the outputs; pass the result to wait_for_render after
+        changing an input.
+        """
+        self.install()
+        return self.driver.execute_script(READINESS_STATE_JS, list(output_ids))
+
+    def wait_for_render(self, output_ids, since, timeout=RENDER_TIMEOUT):
+        """
+        Wait until every output has a new value from the server and has re-rendered,
+        and Shiny is idle.
+
+        An output counts as re-rendered when its content hash differs from `since`, or when
+        a new value arrived and (for charts) the ECharts 'finished' event fired after it.
+
+        Args:
+            output_ids (list): Output IDs to wait for.
+            since (dict): State recorded with mark() before the input change.
+            timeout (int): Seconds before giving up.
+
+        Returns:
+            dict: Output ID -> "updated" or "stale" (still showing the content from `since`).
+        """
+        output_ids = list(output_ids)
+        previous = since.get('outputs', {})
+        start = time.monotonic()
+        status = {}
+
+        def rendered(driver):
+            state = driver.execute_script(READINESS_STATE_JS, output_ids)
+            for output_id in output_ids:
+                current = state['outputs'][output_id]
+                before = previous.get(output_id, {})
+                received = current['values'] > before.get('values', 0) or current['errors'] > before.get('errors', 0)
+                changed = current['hash'] is not None and current['hash'] != before.get('hash')
+
+                if changed:
+                    status[output_id] = "updated"
+                elif received and (not current['hooked'] or current['finished'] > before.get('finished', 0)):
+                    # same content as before, but the server did send it and it was re-drawn
+                    status[output_id] = "updated"
+                else:
+                    status[output_id] = "stale"
+            return not state['busy'] and all(value == "updated" for value in status.values())
+
+        if wait_until(self.driver, rendered, timeout):
+            logger.debug("Outputs re-rendered after %.1fs: %s", time.monotonic() - start, ", ".join(output_ids))
+        else:
+            stale = [output_id for output_id, value in status.items() if value != "updated"]
+            logger.warning("%s not re-rendered after %ss (may still show the previous selection)", ", ".join(stale) or "Shiny", timeout)
+        return status
+
+    def wait_for_idle(self, timeout=RENDER_TIMEOUT):
+        """Wait until Shiny reports it is idle"""
+        self.install()
+        return bool(wait_until(self.driver, lambda d: not d.execute_script("return window.__searoReady.busy;"), timeout))
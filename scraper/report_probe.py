@@ -0,0 +1,133 @@
+# Cheap check of the dashboard's "Data as of" date
+# Used by SEARO_main_scraper.py to decide whether a scrape is needed:
+#   - one pooled requests.Session with connect/read timeouts
+#   - If-None-Match / If-Modified-Since from the validators cached after the last fetch
+#     (a 304 answer reuses the cached paragraph without downloading the page); the cache file is not
+#     committed, the workflow keeps it in the Actions cache
+#   - the body is streamed and the download stops as soon as the paragraph is found,
+#     matched with a precompiled pattern instead of parsing the whole DOM
+#   - retries back off exponentially with jitter
+
+import json
+import os
+import random
+import re
+import time
+from html import unescape
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from scrape_logging import get_logger
+
+logger = get_logger("probe")
+
+DEFAULT_CACHE_FILE = "report_probe_cache.json"
+
+# (connect, read) timeouts in seconds
+REQUEST_TIMEOUT = (5, 15)
+
+# <p>Data as of 12 May 2025</p> (a paragraph with text only, like the BeautifulSoup lookup it replaces)
+_DATE_PARAGRAPH_RE = re.compile(rb'<p\b[^>]*>([^<]*Data as of[^<]*)</p>', re.I)
+# Keep the end of the previous chunk so a paragraph split across chunks is still found
+_CHUNK_OVERLAP = 1024
+
+_session = None
+
+
+def _get_session():
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        _session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        _session.headers["Accept-Encoding"] = "gzip, deflate"
+    return _session
+
+
+def _load_cache(path):
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding="utf-8") as handle:
+            return json.load(handle)
+    except ValueError:
+        return {}
+
+
+def _save_cache(path, cache):
+    if path:
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(cache, handle, indent=2)
+
+
+def _scan_for_paragraph(response, chunk_size=16384):
+    """Read the streamed body until the "Data as of" paragraph is found; returns its text or None"""
+    buffer = b""
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        buffer = buffer[-_CHUNK_OVERLAP:] + chunk
+        match = _DATE_PARAGRAPH_RE.search(buffer)
+        if match:
+            return unescape(match.group(1).decode("utf-8", errors="replace")).strip()
+    return None
+
+
+def backoff_delay(attempt, base=2.0, cap=30.0):
+    """Exponential backoff with full jitter: a random delay in [0, min(cap, base * 2**attempt)]"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def fetch_date_paragraph(url, max_attempts=3, cache_file=DEFAULT_CACHE_FILE):
+    """
+    Fetch the text of the dashboard's "Data as of" paragraph.
+
+    Args:
+        url (str): Dashboard URL.
+        max_attempts (int): Attempts before giving up.
+        cache_file (str): JSON file with the validators and paragraph of the last fetch (None to disable).
+
+    Returns:
+        str: The paragraph text, or None if it could not be fetched.
+    """
+    url = url.split('#')[0]
+    cache = _load_cache(cache_file)
+    if cache.get("url") != url:
+        cache = {}
+
+    headers = {}
+    if cache.get("paragraph"):
+        if cache.get("etag"):
+            headers["If-None-Match"] = cache["etag"]
+        if cache.get("last_modified"):
+            headers["If-Modified-Since"] = cache["last_modified"]
+
+    session = _get_session()
+    for attempt in range(max_attempts):
+        start = time.monotonic()
+        try:
+            with session.get(url, headers=headers, timeout=REQUEST_TIMEOUT, stream=True) as response:
+                if response.status_code == 304:
+                    logger.info("Page not modified (%.2fs), using the cached paragraph", time.monotonic() - start)
+                    return cache["paragraph"]
+
+                response.raise_for_status()
+                paragraph = _scan_for_paragraph(response)
+
+                if paragraph:
+                    logger.info("Found the date paragraph in %.2fs", time.monotonic() - start)
+                    _save_cache(cache_file, {
+                        "url": url,
+                        "etag": response.headers.get("ETag"),
+                        "last_modified": response.headers.get("Last-Modified"),
+                        "paragraph": paragraph,
+                    })
+                    return paragraph
+
+                logger.warning("Attempt %d: 'Data as of' paragraph not found. Retrying...", attempt + 1)
+        except requests.RequestException as e:
+            logger.warning("Attempt %d: Encountered an error: %s. Retrying...", attempt + 1, e)
+
+        if attempt + 1 < max_attempts:
+            time.sleep(backoff_delay(attempt))
+
+    logger.error("Maximum attempts reached. Failed to fetch the 'Data as of' paragraph.")
+    return None
@@ -0,0 +1,126 @@
+# Local run state for the daily scrape
+# report_date.csv (Sys_date,Report_date) gets one row per check of the dashboard's report date, and
+# scrape_status.csv (Sys_date,Report_date,Status) one row per scrape attempt ("success", "incomplete" or "failed").
+# Only "success" counts as scraped: an incomplete run (some countries left in the run checkpoint) is retried.
+# Both files are append-only: a run appends a line and reads only the last lines back, so the per-run cost
+# does not grow with the history. The files are committed by the workflow, so no download is needed.
+
+import csv
+import io
+import os
+from datetime import datetime
+
+from scrape_logging import get_logger
+
+logger = get_logger("run_state")
+
+REPORT_DATE_FILE = "report_date.csv"
+SCRAPE_STATUS_FILE = "scrape_status.csv"
+
+REPORT_DATE_HEADER = ["Sys_date", "Report_date"]
+SCRAPE_STATUS_HEADER = ["Sys_date", "Report_date", "Status"]
+
+SYS_DATE_FORMAT = "%Y-%m-%d %H:%M"
+
+# Scrape outcomes
+SCRAPE_SUCCESS = "success"
+SCRAPE_INCOMPLETE = "incomplete"
+SCRAPE_FAILED = "failed"
+
+
+def read_tail(path, n, block_size=4096):
+    """
+    Return the last n data rows of a CSV file (newest last), reading backwards from the end.
+
+    Args:
+        path (str): CSV file with a header row.
+        n (int): Number of rows.
+
+    Returns:
+        list: Rows as lists of strings, without the header.
+    """
+    if not os.path.exists(path):
+        return []
+
+    with open(path, "rb") as handle:
+        handle.seek(0, os.SEEK_END)
+        position = handle.tell()
+        data = b""
+        # n rows need n + 1 line breaks (plus one for a trailing newline)
+        while position > 0 and data.count(b"\n") <= n + 1:
+            read_size = min(block_size, position)
+            position -= read_size
+            handle.seek(position)
+            data = handle.read(read_size) + data
+
+    # drop the first line: the header, or a line cut in the middle
+    lines = data.decode("utf-8").splitlines()[1:]
+    rows = [row for row in csv.reader(lines) if row]
+    return rows[-n:]
+
+
+def append_row(path, header, row):
+    """Append one row to a CSV file, writing the header first if the file is new"""
+    new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+
+    with open(path, "ab+") as handle:
+        if not new_file:
+            # make sure the last row ended with a newline before appending
+            handle.seek(-1, os.SEEK_END)
+            needs_newline = handle.read(1) != b"\n"
+        else:
+            needs_newline = False
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        if new_file:
+            writer.writerow(header)
+        writer.writerow(row)
+        handle.write((b"\n" if needs_newline else b"") + buffer.getvalue().encode("utf-8"))
+
+
+class RunState:
+    """
+    Report dates seen and scrape outcomes, stored in append-only CSV files
+    """
+
+    def __init__(self, directory=".", report_file=REPORT_DATE_FILE, status_file=SCRAPE_STATUS_FILE):
+        self.report_path = os.path.join(directory, report_file)
+        self.status_path = os.path.join(directory, status_file)
+
+    @staticmethod
+    def _now():
+        return datetime.now().strftime(SYS_DATE_FORMAT)
+
+    def record_check(self, report_date, sys_date=None):
+        """Append the report date seen on the dashboard in this run"""
+        append_row(self.report_path, REPORT_DATE_HEADER, [sys_date or self._now(), report_date])
+
+    def record_scrape(self, report_date, status, sys_date=None):
+        """Append the outcome (SCRAPE_SUCCESS, SCRAPE_INCOMPLETE or SCRAPE_FAILED) of a scrape of the given report date"""
+        append_row(self.status_path, SCRAPE_STATUS_HEADER, [sys_date or self._now(), report_date, status])
+
+    def latest_report_dates(self, n=2):
+        """Return the last n (Sys_date, Report_date) checks, newest first"""
+        return [tuple(row[:2]) for row in reversed(read_tail(self.report_path, n))]
+
+    def last_successful_report_date(self, lookback=50):
+        """
+        Return the report date of the last successful scrape.
+
+        Before scrape_status.csv existed every recorded report date was assumed to be scraped,
+        so without any scrape status the latest recorded report date is returned.
+        """
+        if os.path.exists(self.status_path):
+            for sys_date, report_date, status in reversed(read_tail(self.status_path, lookback)):
+                if status == SCRAPE_SUCCESS:
+                    return report_date
+            logger.warning("No successful scrape in the last %d attempts", lookback)
+            return None
+
+        latest = self.latest_report_dates(1)
+        return latest[0][1] if latest else None
+
+    def has_changed_since_last_success(self, report_date):
+        """True if report_date differs from the report date of the last successful scrape"""
+        return report_date != self.last_successful_report_date()
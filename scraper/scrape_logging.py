@@ -0,0 +1,54 @@
+# Levelled logging for the SEARO scrapers
+# SEARO_LOG_LEVEL sets the level (DEBUG, INFO, WARNING, ...; default INFO).
+# SEARO_LOG_QUIET=1 is the production mode: only warnings and the JSON records are written,
+# so debug detail (per-point values, sample tables) is never even formatted.
+# log_record() writes one machine-readable JSON line per event, e.g. per country and chart:
+#   {"event": "extraction", "country": "India", "chart": "line", "rows": 132, "method": "direct"}
+
+import json
+import logging
+import os
+import sys
+from datetime import datetime, timezone
+
+_configured = False
+
+
+def _configure():
+    global _configured
+    if _configured:
+        return
+
+    quiet = os.getenv('SEARO_LOG_QUIET', '').lower() in ('1', 'true', 'yes')
+    level = logging.WARNING if quiet else getattr(logging, os.getenv('SEARO_LOG_LEVEL', 'INFO').upper(), logging.INFO)
+
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(levelname)s %(name)s: %(message)s"))
+    logger = logging.getLogger("searo")
+    logger.setLevel(level)
+    logger.addHandler(handler)
+    logger.propagate = False
+
+    # JSON records are written in every mode
+    record_handler = logging.StreamHandler(sys.stdout)
+    record_handler.setFormatter(logging.Formatter("%(message)s"))
+    records = logging.getLogger("searo_records")
+    records.setLevel(logging.INFO)
+    records.addHandler(record_handler)
+    records.propagate = False
+
+    _configured = True
+
+
+def get_logger(name):
+    """Return the logger for one scraper module, e.g. get_logger("national")"""
+    _configure()
+    return logging.getLogger(f"searo.{name}")
+
+
+def log_record(event, **fields):
+    """Write one JSON record (event name, UTC timestamp and the given fields)"""
+    _configure()
+    record = {"event": event, "ts": datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')}
+    record.update(fields)
+    logging.getLogger("searo_records").info(json.dumps(record, default=str))
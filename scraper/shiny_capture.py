@@ -0,0 +1,110 @@
+# Passive capture of the Shiny messages a browser receives
+# Chrome's performance log carries every DevTools Network event, including Network.webSocketFrameReceived
+# for the Shiny websocket. Decoding those frames (decode_shiny_frame) gives the output values as the server
+# sends them, before anything is rendered, so an input change only has to wait for the new values to arrive:
+# no DOM polling, no ECharts 'finished' events, no getOption() after a guessed render.
+#
+# The driver needs performance logging, see enable_frame_capture() (create_driver(..., capture=True)).
+# A ShinyFrameCapture has the same values / errors / get_echarts_data() as ShinyClient, so the extractors
+# read captured outputs the same way as with the browserless engine.
+
+import json
+import time
+
+from shiny_client import decode_shiny_frame, htmlwidget_to_echarts_data
+from scrape_logging import get_logger
+
+logger = get_logger("capture")
+
+POLL_INTERVAL = 0.1
+
+_TEXT_FRAME = 1
+
+
+def enable_frame_capture(chrome_options):
+    """Turn on the Chrome performance log (Network events only) in the driver options"""
+    chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    chrome_options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+
+
+class ShinyFrameCapture:
+    """
+    Shiny output values decoded from the websocket frames of a browser session
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.values = {}
+        self.errors = {}
+        self.busy = None
+        # number of values (or errors) received per output, to tell when a new one arrived
+        self.received = {}
+
+    def poll(self):
+        """
+        Read the performance log entries logged since the last poll and apply the Shiny messages.
+
+        Returns:
+            set: IDs of the outputs that received a value or an error.
+        """
+        updated = set()
+        for entry in self.driver.get_log("performance"):
+            try:
+                event = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError):
+                continue
+            if event.get("method") != "Network.webSocketFrameReceived":
+                continue
+
+            response = event.get("params", {}).get("response", {})
+            if response.get("opcode", _TEXT_FRAME) != _TEXT_FRAME:
+                continue
+
+            for message in decode_shiny_frame(response.get("payloadData")):
+                for output_id, value in (message.get("values") or {}).items():
+                    self.values[output_id] = value
+                    self.errors.pop(output_id, None)
+                    updated.add(output_id)
+                for output_id, error in (message.get("errors") or {}).items():
+                    self.errors[output_id] = error
+                    updated.add(output_id)
+                if "busy" in message:
+                    self.busy = message["busy"]
+
+        for output_id in updated:
+            self.received[output_id] = self.received.get(output_id, 0) + 1
+        return updated
+
+    def mark(self):
+        """Record how many values each output has received; pass the result to wait_for_values after an input change"""
+        self.poll()
+        return dict(self.received)
+
+    def wait_for_values(self, output_ids, since, timeout):
+        """
+        Wait until every output received a new value (or error) since mark() and the server is idle.
+
+        Returns:
+            dict: Output ID -> "updated" or "stale".
+        """
+        deadline = time.monotonic() + timeout
+        start = time.monotonic()
+        while True:
+            self.poll()
+            status = {output_id: "updated" if self.received.get(output_id, 0) > since.get(output_id, 0) else "stale"
+                      for output_id in output_ids}
+            if self.busy != "busy" and all(value == "updated" for value in status.values()):
+                logger.debug("Values received after %.2fs: %s", time.monotonic() - start, ", ".join(output_ids))
+                return status
+            if time.monotonic() >= deadline:
+                stale = [output_id for output_id, value in status.items() if value != "updated"]
+                logger.warning("%s: no new value after %ss", ", ".join(stale) or "Shiny still busy", timeout)
+                return status
+            time.sleep(POLL_INTERVAL)
+
+    def get_echarts_data(self, output_id, chart_type="line"):
+        """Captured chart output in the format of CountryDataExtractor.harvest_charts"""
+        self.poll()
+        if output_id in self.errors:
+            return {'error': f"Shiny output error: {self.errors[output_id]}"}
+        return htmlwidget_to_echarts_data(self.values.get(output_id), chart_type)
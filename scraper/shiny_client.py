@@ -0,0 +1,340 @@
+# Browserless client for the WHO SEARO dengue dashboard (Shiny app)
+# Talks to the Shiny server over the same SockJS/websocket channel the browser uses:
+# inputs (e.g. c_country_selection) are sent as Shiny "update" messages and the htmlwidget outputs
+# (e.g. c_trend_cases_country_month_out, c_total_case_evolution) are read from the "values" messages.
+# Works against shinyapps.io (SockJS + Shiny Server framing) and against a plain local Shiny server
+# started with shiny::runApp() (raw websocket at /websocket/), which is enough to test it locally.
+
+import json
+import random
+import re
+import string
+import time
+from html import unescape
+from urllib.parse import urlparse
+
+import requests
+
+from scrape_logging import get_logger
+
+logger = get_logger("shiny")
+
+DASHBOARD_URL = "https://worldhealthorg.shinyapps.io/searo-dengue-dashboard/"
+
+# shinyapps.io serves each app from a worker path, e.g. "_w_1a2b3c4d"
+_WORKER_RE = re.compile(r'_w_[0-9a-f]{6,}')
+# Shiny Server prefixes every payload with an optional message id ("1A#") and a multiplex channel ("0|m|")
+_FRAME_PREFIX_RE = re.compile(r'^(?:[0-9A-Fa-f]+#)?(?:\d+\|m\|)?')
+_SELECT_RE = r'<select[^>]*\bid="{input_id}"[^>]*>(.*?)</select>'
+_OPTION_RE = re.compile(r'<option[^>]*\bvalue="([^"]*)"[^>]*>(.*?)</option>', re.S)
+_INPUT_RE = r'<input[^>]*\bid="{input_id}"[^>]*>'
+_ATTRIBUTE_RE = re.compile(r'([\w-]+)="([^"]*)"')
+
+
+def decode_shiny_frame(frame):
+    """
+    Decode one websocket frame into the list of Shiny messages (dicts) it carries.
+
+    Handles plain Shiny websocket frames, SockJS frames ('o', 'h', 'a["..."]', 'c[...]')
+    and the Shiny Server message-id / multiplex prefixes.
+
+    Args:
+        frame (str): Raw websocket frame text.
+
+    Returns:
+        list: Decoded Shiny messages, empty for control frames.
+    """
+    if not frame or frame in ('o', 'h') or frame.startswith('c['):
+        return []
+
+    if frame.startswith('a['):
+        try:
+            payloads = json.loads(frame[1:])
+        except ValueError:
+            return []
+    else:
+        payloads = [frame]
+
+    messages = []
+    for payload in payloads:
+        payload = _FRAME_PREFIX_RE.sub('', payload, count=1)
+        # ACKs, channel open/close events etc. are not JSON messages
+        if not payload.startswith('{'):
+            continue
+        try:
+            messages.append(json.loads(payload))
+        except ValueError:
+            continue
+    return messages
+
+
+def htmlwidget_to_echarts_data(widget_value, chart_type="line"):
+    """
+    Convert an echarts4r htmlwidget output value into the same structure returned by the
+    JavaScript extractor in CountryDataExtractor (input for _convert_echarts_to_dataframe).
+
+    Args:
+        widget_value (dict): The Shiny output value ({'x': {'opts': {...}}, ...}).
+        chart_type (str): "line" or "bar".
+
+    Returns:
+        dict: {'success', 'xAxis', 'series', 'chartType'} or {'error': ...}
+    """
+    if not widget_value:
+        return {'error': "Output value not received"}
+
+    options = (widget_value.get('x') or {}).get('opts') or {}
+    if not options:
+        return {'error': "ECharts option not available"}
+
+    x_axis = options.get('xAxis') or {}
+    if isinstance(x_axis, list):
+        x_axis = x_axis[0] if x_axis else {}
+
+    series_list = options.get('series') or []
+    if isinstance(series_list, dict):
+        series_list = [series_list]
+
+    result = {
+        'success': True,
+        'xAxis': x_axis.get('data') or [],
+        'series': [],
+        'chartType': chart_type
+    }
+
+    for index, series in enumerate(series_list):
+        data = series.get('data') or []
+        result['series'].append({
+            'name': series.get('name') or f'Series_{index}',
+            'data': data,
+            'type': series.get('type') or 'unknown',
+            'dataLength': len(data)
+        })
+
+    return result
+
+
+class ShinyClient:
+    """
+    Minimal Shiny protocol client (no browser)
+    """
+
+    def __init__(self, app_url=DASHBOARD_URL, output_ids=(), initial_inputs=None, timeout=60):
+        """
+        Args:
+            app_url (str): URL of the Shiny app (the dashboard or a local stand-in server).
+            output_ids (list): Outputs to report as visible so that the server renders them.
+            initial_inputs (dict): Extra input values sent with the init message.
+            timeout (int): Seconds to wait for the server to become idle after an input change.
+        """
+        self.app_url = app_url.split('#')[0]
+        if not self.app_url.endswith('/'):
+            self.app_url += '/'
+        self.output_ids = list(output_ids)
+        self.initial_inputs = dict(initial_inputs or {})
+        self.timeout = timeout
+
+        self.html = None
+        self.config = {}
+        self.values = {}
+        self.errors = {}
+        self.busy = None
+
+        self._ws = None
+        self._sockjs = False
+        self._multiplex = False
+        self._message_id = None
+
+    def connect(self):
+        """Load the app page, open the websocket and send the Shiny init message"""
+        import websocket  # websocket-client, only needed for the shiny engine
+
+        http = requests.Session()
+        response = http.get(self.app_url, timeout=30)
+        response.raise_for_status()
+        self.html = response.text
+
+        ws_url = self._websocket_url(response.url)
+        cookie = "; ".join(f"{name}={value}" for name, value in http.cookies.items())
+        logger.info("Connecting to Shiny websocket: %s", ws_url)
+        self._ws = websocket.create_connection(ws_url, timeout=self.timeout, cookie=cookie or None)
+
+        if self._multiplex:
+            # open channel 0 on the Shiny Server multiplexer
+            self._send_raw("0|o|")
+
+        self._send({"method": "init", "data": self._init_data()})
+        self.wait_for_idle()
+        logger.info("Shiny session started (%d outputs received)", len(self.values))
+
+    def close(self):
+        """Close the websocket"""
+        if self._ws is not None:
+            try:
+                self._ws.close()
+            finally:
+                self._ws = None
+
+    # the extractor calls driver.quit() when it is done, keep the same name
+    quit = close
+
+    def _websocket_url(self, page_url):
+        """Build the websocket URL for the app (SockJS on Shiny Server, raw websocket otherwise)"""
+        parsed = urlparse(page_url)
+        scheme = 'wss' if parsed.scheme == 'https' else 'ws'
+        base = f"{scheme}://{parsed.netloc}{parsed.path.rsplit('/', 1)[0]}/"
+
+        worker = _WORKER_RE.search(self.html)
+        if worker and worker.group(0) not in base:
+            base += worker.group(0) + "/"
+
+        if 'shiny-server-client' not in self.html:
+            # plain Shiny (shiny::runApp) serves a raw websocket
+            return base + "websocket/"
+
+        self._sockjs = True
+        self._multiplex = True
+        robust_id = "".join(random.choices(string.ascii_letters + string.digits, k=18))
+        server_id = f"{random.randint(0, 999):03d}"
+        session_id = "".join(random.choices(string.ascii_lowercase + string.digits, k=8))
+        return f"{base}__sockjs__/n={robust_id}/{server_id}/{session_id}/websocket"
+
+    def _init_data(self):
+        """Input and client data sent with the init message"""
+        parsed = urlparse(self.app_url)
+        data = {
+            ".clientdata_pixelratio": 1,
+            ".clientdata_url_protocol": f"{parsed.scheme}:",
+            ".clientdata_url_hostname": parsed.hostname or "",
+            ".clientdata_url_port": str(parsed.port or ""),
+            ".clientdata_url_pathname": parsed.path,
+            ".clientdata_url_search": "",
+            ".clientdata_url_hash_initial": "",
+            ".clientdata_url_hash": "",
+            ".clientdata_singletons": "",
+            ".clientdata_allowDataUriScheme": True,
+        }
+        # outputs are suspended while hidden, so report the charts as visible
+        for output_id in self.output_ids:
+            data[f".clientdata_output_{output_id}_width"] = 800
+            data[f".clientdata_output_{output_id}_height"] = 400
+            data[f".clientdata_output_{output_id}_hidden"] = False
+        data.update(self.initial_inputs)
+        return data
+
+    def _send_raw(self, payload):
+        if self._message_id is not None:
+            payload = f"{self._message_id:X}#{payload}"
+            self._message_id += 1
+        if self._sockjs:
+            payload = json.dumps([payload])
+        self._ws.send(payload)
+
+    def _send(self, message):
+        payload = json.dumps(message)
+        if self._multiplex:
+            payload = "0|m|" + payload
+        self._send_raw(payload)
+
+    def _receive(self, timeout):
+        """Read one frame and apply the Shiny messages it contains; returns the messages"""
+        self._ws.settimeout(max(timeout, 0.1))
+        frame = self._ws.recv()
+
+        # Shiny Server robust connections number their messages, echo the scheme when sending
+        if self._message_id is None and re.match(r'^a\["[0-9A-Fa-f]+#', frame or ''):
+            self._message_id = 0
+
+        messages = decode_shiny_frame(frame)
+        for message in messages:
+            if 'config' in message:
+                self.config = message['config']
+            for output_id, value in (message.get('values') or {}).items():
+                self.values[output_id] = value
+                # a new value replaces an earlier error of the output
+                self.errors.pop(output_id, None)
+            if message.get('errors'):
+                self.errors.update(message['errors'])
+            if 'busy' in message:
+                self.busy = message['busy']
+        return messages
+
+    def wait_for_idle(self, timeout=None):
+        """
+        Read messages until the server reports it is idle.
+
+        Returns:
+            set: IDs of the outputs that received a value (or an error) while waiting.
+        """
+        deadline = time.monotonic() + (timeout or self.timeout)
+        updated = set()
+        seen_busy = False
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"Shiny server did not become idle within {timeout or self.timeout}s")
+
+            for message in self._receive(remaining):
+                updated.update(message.get('values') or {})
+                updated.update(message.get('errors') or {})
+                if message.get('busy') == 'busy':
+                    seen_busy = True
+                elif message.get('busy') == 'idle' and (seen_busy or updated):
+                    return updated
+
+    def set_inputs(self, inputs, timeout=None):
+        """
+        Send new input values and wait for the server to recompute.
+
+        Args:
+            inputs (dict): Input ID -> value.
+
+        Returns:
+            set: IDs of the outputs that were updated.
+        """
+        self._send({"method": "update", "data": inputs})
+        return self.wait_for_idle(timeout)
+
+    def input_choices(self, input_id):
+        """
+        Return the {label: value} choices of a select input, read from the page HTML
+        or from a renderUI output that contains it.
+        """
+        pattern = re.compile(_SELECT_RE.format(input_id=re.escape(input_id)), re.S)
+        for source in self._html_sources():
+            match = pattern.search(source)
+            if match:
+                return {unescape(label).strip(): unescape(value) for value, label in _OPTION_RE.findall(match.group(1))}
+        return {}
+
+    def _html_sources(self):
+        """The page HTML and the HTML of renderUI outputs"""
+        sources = [self.html or ""]
+        for value in self.values.values():
+            if isinstance(value, dict) and isinstance(value.get('html'), str):
+                sources.append(value['html'])
+        return sources
+
+    def input_attributes(self, input_id):
+        """
+        Return the attributes of an <input> tag (e.g. a slider's data-min / data-max), read from the
+        page HTML or from a renderUI output that contains it.
+        """
+        pattern = re.compile(_INPUT_RE.format(input_id=re.escape(input_id)))
+        for source in self._html_sources():
+            match = pattern.search(source)
+            if match:
+                return {name: unescape(value) for name, value in _ATTRIBUTE_RE.findall(match.group(0))}
+        return {}
+
+    def select(self, input_id, label, timeout=None):
+        """Select a choice of a select input by its label (falls back to using the label as value)"""
+        value = self.input_choices(input_id).get(label, label)
+        return self.set_inputs({input_id: value}, timeout)
+
+    def get_echarts_data(self, output_id, chart_type="line"):
+        """Return the latest value of an echarts4r output in the JavaScript extractor's format"""
+        if output_id in self.errors:
+            return {'error': f"Shiny output error: {self.errors[output_id]}"}
+        return htmlwidget_to_echarts_data(self.values.get(output_id), chart_type)
@@ -0,0 +1,40 @@
+# ECharts point normalization and bulk float parsing of the national extractor
+
+import math
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scraper"))
+
+from SEARO_national_selenium_run import _normalize_points, _parse_float, _points_to_float  # noqa: E402
+
+
+def test_point_shapes_reduce_to_one_value():
+    points = [3, [1, "2"], [5], [], {"value": ["Jan-2024", " 1,055"]}, {"value": 7}, {"y": 8}, {}, None]
+
+    assert _normalize_points(points).tolist() == [3, "2", 5, 0, " 1,055", 7, 8, 0, None]
+
+
+def test_short_array_inside_a_dict_is_kept():
+    # only [x, y] pairs are unpacked; what is left parses to 0.0 like any other unparseable value
+    values = _normalize_points([{"value": [9]}])
+
+    assert values.tolist() == [[9]]
+    assert _points_to_float(values).tolist() == [0.0]
+
+
+def test_values_parse_like_parse_float():
+    values = _normalize_points([3, [1, "2"], {"value": ["Feb-2024", " 1,055 "]}, None, "NaN", "nan", "abc", " 12 ", 4.5, []])
+    numbers = _points_to_float(values).tolist()
+
+    assert numbers[:4] == [3.0, 2.0, 1055.0, 0.0]
+    # 'NaN' strings stay NaN so the row is dropped later; garbage becomes 0.0
+    assert math.isnan(numbers[4]) and math.isnan(numbers[5])
+    assert numbers[6:] == [0.0, 12.0, 4.5, 0.0]
+    for value, number in zip(values, numbers):
+        expected = _parse_float(value)
+        assert (math.isnan(number) and math.isnan(expected)) or number == expected
+
+
+def test_empty_series():
+    assert _points_to_float(_normalize_points([])).tolist() == []
@@ -0,0 +1,85 @@
+# Run checkpoint file: resuming a run, discarding other runs and half-written lines
+
+import os
+import sys
+
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scraper"))
+
+from checkpoint import RunCheckpoint  # noqa: E402
+
+LINE = pd.DataFrame({'Month': ["Jan", "Feb"], 'Year': ["2024", "2024"], 'Value': [5.0, float("nan")],
+                     'Chart_Type': 'line', 'Country': "Nepal"})
+BAR = pd.DataFrame({'Period': ["Jan-2024"], 'Series': ["Total"], 'Value': [12.0], 'Chart_Type': 'bar',
+                    'Country': "Nepal"})
+
+
+def test_reload_resumes_the_same_run(tmp_path):
+    path = str(tmp_path / "checkpoint.jsonl")
+    checkpoint = RunCheckpoint(path, "2025-06-04")
+    checkpoint.record("Nepal", "line", LINE)
+    checkpoint.record("Nepal", "bar", BAR)
+    checkpoint.record("India", "line", LINE.assign(Country="India"))
+
+    reloaded = RunCheckpoint(path, "2025-06-04")
+
+    assert reloaded.missing("Nepal") == []
+    assert reloaded.missing("India") == ["bar"]
+    assert reloaded.missing("Bhutan") == ["line", "bar"]
+    line_data, bar_data = reloaded.country_data("Nepal")
+    assert_frame_equal(line_data, LINE)
+    assert_frame_equal(bar_data, BAR)
+    assert reloaded.country_data("India")[1].empty
+
+
+def test_checkpoint_of_another_run_is_discarded(tmp_path):
+    path = str(tmp_path / "checkpoint.jsonl")
+    RunCheckpoint(path, "2025-05-28").record("Nepal", "line", LINE)
+
+    checkpoint = RunCheckpoint(path, "2025-06-04")
+
+    assert not os.path.exists(path)
+    assert checkpoint.missing("Nepal") == ["line", "bar"]
+
+    # the file is started again for the new run
+    checkpoint.record("Nepal", "bar", BAR)
+    assert RunCheckpoint(path, "2025-06-04").missing("Nepal") == ["line"]
+
+
+def test_half_written_last_line_is_skipped(tmp_path):
+    path = str(tmp_path / "checkpoint.jsonl")
+    RunCheckpoint(path, "2025-06-04").record("Nepal", "line", LINE)
+    with open(path, "a", encoding="utf-8") as handle:
+        handle.write('{"country": "Nepal", "chart": "bar", "columns": ["Per')
+
+    checkpoint = RunCheckpoint(path, "2025-06-04")
+    assert checkpoint.missing("Nepal") == ["bar"]
+
+    # the next unit starts on a line of its own
+    checkpoint.record("Nepal", "bar", BAR)
+    reloaded = RunCheckpoint(path, "2025-06-04")
+    assert reloaded.missing("Nepal") == []
+    assert_frame_equal(reloaded.country_data("Nepal")[1], BAR)
+
+
+def test_clear_removes_the_file(tmp_path):
+    path = str(tmp_path / "checkpoint.jsonl")
+    checkpoint = RunCheckpoint(path, "2025-06-04")
+    checkpoint.clear()  # nothing written yet
+
+    checkpoint.record("Nepal", "line", LINE)
+    checkpoint.clear()
+
+    assert not os.path.exists(path)
+    assert RunCheckpoint(path, "2025-06-04").missing("Nepal") == ["line", "bar"]
+
+
+def test_in_memory_checkpoint():
+    checkpoint = RunCheckpoint(None, "2025-06-04")
+    checkpoint.record("Nepal", "line", LINE)
+
+    assert checkpoint.done("Nepal", "line")
+    assert checkpoint.missing("Nepal") == ["bar"]
+    checkpoint.clear()
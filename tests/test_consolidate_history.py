@@ -0,0 +1,40 @@
+# Revision intervals of the history database
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scraper"))
+
+from consolidate_history import HistoryDatabase  # noqa: E402
+
+
+def write_snapshot(directory, run_ts, rows):
+    with open(os.path.join(directory, f"SEARO_National_data_{run_ts}.csv"), "w", encoding="utf-8") as handle:
+        handle.write("Month,Year,Value,Chart_Type,Country\n")
+        for month, value in rows:
+            handle.write(f"{month},2024,{value},line,Nepal\n")
+
+
+def test_value_missing_from_a_run_ends_its_interval(tmp_path):
+    write_snapshot(tmp_path, "20250101_0000", [("Jan", 5), ("Feb", 7)])
+    write_snapshot(tmp_path, "20250102_0000", [("Jan", 5)])
+    database = HistoryDatabase(str(tmp_path / "history.sqlite"))
+    try:
+        database.ingest_directory(str(tmp_path), processes=1)
+        # ingested in a later refresh: the interval must not be extended over the gap
+        write_snapshot(tmp_path, "20250103_0000", [("Jan", 5), ("Feb", 7)])
+        database.ingest_directory(str(tmp_path), processes=1)
+
+        assert database.value_history("Nepal", 202402) == [
+            ("2024", 7.0, "20250101_0000", "20250101_0000"),
+            ("2024", 7.0, "20250103_0000", "20250103_0000"),
+        ]
+        assert database.value_history("Nepal", 202401) == [("2024", 5.0, "20250101_0000", "20250103_0000")]
+
+        assert database.values_as_of("Nepal", 202401, 202412, "20250102_0000") == [(202401, "2024", 5.0)]
+        # between two runs: as reported in the earlier one
+        assert database.values_as_of("Nepal", 202401, 202412, "20250102_1200") == [(202401, "2024", 5.0)]
+        assert database.values_as_of("Nepal", 202401, 202412) == [(202401, "2024", 5.0), (202402, "2024", 7.0)]
+        assert database.values_as_of("Nepal", 202401, 202412, "20240101_0000") == []
+    finally:
+        database.close()
@@ -0,0 +1,86 @@
+# Snapshots rebuilt from the delta store match what each run recorded
+
+import os
+import sys
+
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scraper"))
+
+from delta_store import DeltaStore  # noqa: E402
+
+
+def line_frame(rows):
+    return pd.DataFrame({
+        'Month': [row[1] for row in rows],
+        'Year': [row[2] for row in rows],
+        'Value': [float(row[3]) for row in rows],
+        'Chart_Type': 'line',
+        'Country': [row[0] for row in rows],
+    })
+
+
+def bar_frame(rows):
+    return pd.DataFrame({
+        'Period': [row[1] for row in rows],
+        'Series': [row[2] for row in rows],
+        'Value': [float(row[3]) for row in rows],
+        'Chart_Type': 'bar',
+        'Country': [row[0] for row in rows],
+    })
+
+
+RUNS = [
+    ("20250101_0000",
+     line_frame([("Nepal", "Jan", "2024", 5), ("Nepal", "Feb", "2024", 7), ("India", "Jan", "2024", 100)]),
+     bar_frame([("Nepal", "Jan-2024", "Total", 12)])),
+    # Nepal Feb revised, India gains a month, the bar chart gains a period
+    ("20250102_0000",
+     line_frame([("Nepal", "Jan", "2024", 5), ("Nepal", "Feb", "2024", 9),
+                 ("India", "Jan", "2024", 100), ("India", "Feb", "2024", 120)]),
+     bar_frame([("Nepal", "Jan-2024", "Total", 12), ("Nepal", "Feb-2024", "Total", 14)])),
+    # Nepal Jan dropped, India first in this run, the bar chart is gone entirely
+    ("20250103_0000",
+     line_frame([("India", "Jan", "2024", 100), ("India", "Feb", "2024", 120), ("Nepal", "Feb", "2024", 9)]),
+     pd.DataFrame()),
+]
+
+
+def test_snapshots_rebuild_every_run(tmp_path):
+    store = DeltaStore(str(tmp_path / "delta.sqlite"))
+    try:
+        counts = [store.record_run(run_ts, line_df, bar_df) for run_ts, line_df, bar_df in RUNS]
+
+        assert counts == [
+            {"insert": 4, "change": 0, "remove": 0},
+            {"insert": 2, "change": 1, "remove": 0},
+            # Nepal Jan and both bar periods removed; Nepal Feb moves from ordinal 1 to 0
+            {"insert": 0, "change": 1, "remove": 3},
+        ]
+        assert store.runs() == [run_ts for run_ts, _, _ in RUNS]
+
+        for run_ts, line_df, bar_df in RUNS:
+            line_snapshot, bar_snapshot = store.snapshot(run_ts)
+            assert_frame_equal(line_snapshot, line_df)
+            if bar_df.empty:
+                assert bar_snapshot.empty
+            else:
+                assert_frame_equal(bar_snapshot, bar_df)
+
+        latest_line, _ = store.snapshot()
+        assert_frame_equal(latest_line, RUNS[-1][1])
+    finally:
+        store.close()
+
+
+def test_unchanged_run_records_nothing(tmp_path):
+    store = DeltaStore(str(tmp_path / "delta.sqlite"))
+    try:
+        _, line_df, bar_df = RUNS[0]
+        store.record_run("20250101_0000", line_df, bar_df)
+
+        assert store.record_run("20250102_0000", line_df, bar_df) == {"insert": 0, "change": 0, "remove": 0}
+        assert_frame_equal(store.snapshot("20250102_0000")[0], line_df)
+    finally:
+        store.close()
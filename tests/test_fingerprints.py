@@ -0,0 +1,70 @@
+# Per-country change detection from the chart data fingerprints
+
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scraper"))
+
+from fingerprints import compare_fingerprints, fingerprint_frame, load_fingerprints, save_fingerprints  # noqa: E402
+
+
+def line_frame(values):
+    return pd.DataFrame({'Month': ["Jan", "Feb"][:len(values)], 'Year': "2024", 'Value': values, 'Chart_Type': 'line'})
+
+
+def bar_frame(values):
+    return pd.DataFrame({'Period': ["Jan-2024", "Feb-2024"][:len(values)], 'Series': "Total", 'Value': values,
+                         'Chart_Type': 'bar'})
+
+
+def test_fingerprint_ignores_row_order_and_float_format():
+    df = line_frame([5, 7])
+
+    assert fingerprint_frame(df, "line") == fingerprint_frame(df.iloc[::-1], "line")
+    assert fingerprint_frame(df, "line") == fingerprint_frame(line_frame([5.0, 7.0000000001]), "line")
+    assert fingerprint_frame(df, "line") != fingerprint_frame(line_frame([5, 8]), "line")
+    assert fingerprint_frame(pd.DataFrame(), "line") is None
+
+
+def test_changed_unchanged_and_failed():
+    _, stored = compare_fingerprints({}, {
+        "Nepal": (line_frame([5, 7]), bar_frame([12])),
+        "India": (line_frame([100]), bar_frame([100])),
+        "Bhutan": (line_frame([1]), bar_frame([1])),
+    })
+
+    status, current = compare_fingerprints(stored, {
+        "Nepal": (line_frame([5, 7]), bar_frame([12])),
+        "India": (line_frame([100, 120]), bar_frame([100])),
+        "Bhutan": None,
+        "Maldives": (pd.DataFrame(), pd.DataFrame()),
+    })
+
+    assert status == {"Nepal": "unchanged", "India": "changed", "Bhutan": "failed", "Maldives": "failed"}
+    assert current["Nepal"] == stored["Nepal"]
+    assert current["India"]["line"] != stored["India"]["line"]
+    assert current["India"]["bar"] == stored["India"]["bar"]
+    # failed countries keep their stored fingerprint, never-scraped ones get none
+    assert current["Bhutan"] == stored["Bhutan"]
+    assert "Maldives" not in current
+
+
+def test_empty_chart_keeps_its_stored_hash():
+    _, stored = compare_fingerprints({}, {"Nepal": (line_frame([5, 7]), bar_frame([12]))})
+
+    status, current = compare_fingerprints(stored, {"Nepal": (line_frame([5, 7]), pd.DataFrame())})
+
+    assert status == {"Nepal": "unchanged"}
+    assert current["Nepal"]["bar"] == stored["Nepal"]["bar"]
+
+
+def test_fingerprints_file_round_trip(tmp_path):
+    path = str(tmp_path / "fingerprints.json")
+    assert load_fingerprints(path) == {}
+
+    _, fingerprints = compare_fingerprints({}, {"Nepal": (line_frame([5]), bar_frame([12]))})
+    save_fingerprints(path, fingerprints)
+
+    assert load_fingerprints(path) == fingerprints
@@ -0,0 +1,72 @@
+# Parquet dataset round trip: compact dtypes and filtered reads
+
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scraper"))
+
+from parquet_writer import read_parquet, to_columnar, write_parquet  # noqa: E402
+
+LINE = pd.DataFrame({
+    'Month': ["Jan", "June", "Dec", "Jan"],
+    'Year': ["2019", "2023", "2024", "2024"],
+    'Value': [10.0, 1055.4, 7.0, 300.0],
+    'Chart_Type': 'line',
+    'Country': ["Nepal", "Nepal", "Nepal", "India"],
+})
+
+BAR = pd.DataFrame({
+    'Period': ["Jan-2024", "Feb-2024", "Total"],
+    'Series': "Total cases",
+    'Value': [12.0, 14.0, 26.0],
+    'Chart_Type': 'bar',
+    'Country': "Nepal",
+})
+
+
+def test_columnar_dtypes():
+    columnar = to_columnar(LINE, "line")
+
+    assert columnar['Period'].dtype == 'int32'
+    assert columnar['Cases'].dtype == 'int64'
+    for column in ('Country', 'Chart_Type', 'Series'):
+        assert isinstance(columnar[column].dtype, pd.CategoricalDtype)
+    assert columnar['Period'].tolist() == [201901, 202306, 202412, 202401]
+    assert columnar['Cases'].tolist() == [10, 1055, 7, 300]
+
+
+def test_round_trip_and_filters(tmp_path):
+    dataset_path = write_parquet(LINE, BAR, str(tmp_path), "20250101_0000")
+
+    df = read_parquet(dataset_path)
+    assert len(df) == 6  # the unparseable "Total" bar period is dropped
+    assert df['Period'].dtype == 'int32'
+    assert df['Cases'].dtype == 'int64'
+    for column in ('Country', 'Chart_Type', 'Series'):
+        assert isinstance(df[column].dtype, pd.CategoricalDtype)
+
+    india = read_parquet(dataset_path, country="India")
+    assert india[['Period', 'Cases']].values.tolist() == [[202401, 300]]
+
+    nepal_bar = read_parquet(dataset_path, country="Nepal", chart_type="bar")
+    assert sorted(nepal_bar['Period']) == [202401, 202402]
+    assert set(nepal_bar['Series']) == {"Total cases"}
+
+    recent = read_parquet(dataset_path, chart_type="line", years=(2023, 2024))
+    assert sorted(zip(recent['Country'], recent['Period'])) == [
+        ("India", 202401), ("Nepal", 202306), ("Nepal", 202412)]
+
+
+def test_rewrite_replaces_the_partition(tmp_path):
+    write_parquet(LINE, BAR, str(tmp_path), "20250101_0000")
+    dataset_path = write_parquet(LINE[LINE['Country'] == "India"], None, str(tmp_path), "20250102_0000")
+
+    line = read_parquet(dataset_path, chart_type="line")
+    assert line['Country'].tolist() == ["India"]
+    # the bar partition was not part of the second run and is kept
+    assert len(read_parquet(dataset_path, chart_type="bar")) == 2
@@ -0,0 +1,112 @@
+# "Data as of" probe against a stubbed requests session (no network needed)
+
+import json
+import os
+import sys
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scraper"))
+
+import report_probe  # noqa: E402
+from report_probe import _scan_for_paragraph, fetch_date_paragraph  # noqa: E402
+
+URL = "https://example.org/dashboard/"
+PAGE = b"<html><body>" + b"x" * 5000 + b"<p class='note'>Data as of 12 May 2025</p>" + b"y" * 5000 + b"</body></html>"
+
+
+class FakeResponse:
+    """Streams a body in fixed-size chunks and records how much of it was read"""
+
+    def __init__(self, status_code=200, body=b"", headers=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+        self.bytes_read = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} error")
+
+    def iter_content(self, chunk_size=1):
+        for offset in range(0, len(self.body), chunk_size):
+            chunk = self.body[offset:offset + chunk_size]
+            self.bytes_read += len(chunk)
+            yield chunk
+
+
+class FakeSession:
+    """Returns queued responses (or raises queued exceptions) and records the request headers"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None, stream=False):
+        self.requests.append(dict(headers or {}))
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+@pytest.fixture
+def session(monkeypatch):
+    def install(*responses):
+        fake = FakeSession(responses)
+        monkeypatch.setattr(report_probe, "_session", fake)
+        return fake
+    monkeypatch.setattr(report_probe.time, "sleep", lambda seconds: None)
+    return install
+
+
+@pytest.mark.parametrize("chunk_size", [7, 64, 5017, 5030, 16384])
+def test_match_across_chunk_boundaries(chunk_size):
+    # 5017 and 5030 split the paragraph itself between two chunks
+    response = FakeResponse(body=PAGE)
+
+    assert _scan_for_paragraph(response, chunk_size=chunk_size) == "Data as of 12 May 2025"
+
+
+def test_download_stops_at_the_paragraph():
+    response = FakeResponse(body=PAGE)
+    _scan_for_paragraph(response, chunk_size=1024)
+
+    assert response.bytes_read < len(PAGE)
+
+
+def test_fetch_caches_validators_then_uses_the_304(tmp_path, session):
+    cache_file = str(tmp_path / "cache.json")
+    first = session(FakeResponse(body=PAGE, headers={"ETag": '"abc"', "Last-Modified": "Mon, 12 May 2025 08:00:00 GMT"}))
+
+    assert fetch_date_paragraph(URL + "#tab", cache_file=cache_file) == "Data as of 12 May 2025"
+    assert first.requests == [{}]
+    with open(cache_file, encoding="utf-8") as handle:
+        assert json.load(handle)["etag"] == '"abc"'
+
+    second = session(FakeResponse(status_code=304))
+    assert fetch_date_paragraph(URL, cache_file=cache_file) == "Data as of 12 May 2025"
+    assert second.requests == [{"If-None-Match": '"abc"', "If-Modified-Since": "Mon, 12 May 2025 08:00:00 GMT"}]
+
+
+def test_cache_of_another_url_is_ignored(tmp_path, session):
+    cache_file = tmp_path / "cache.json"
+    cache_file.write_text(json.dumps({"url": "https://other.org/", "etag": '"abc"', "paragraph": "Data as of 1 Jan 2020"}))
+    fake = session(FakeResponse(body=PAGE))
+
+    assert fetch_date_paragraph(URL, cache_file=str(cache_file)) == "Data as of 12 May 2025"
+    assert fake.requests == [{}]
+
+
+def test_retries_then_gives_up(session):
+    fake = session(requests.ConnectionError("refused"), FakeResponse(status_code=503), FakeResponse(body=b"<p>nothing</p>"))
+
+    assert fetch_date_paragraph(URL, max_attempts=3, cache_file=None) is None
+    assert len(fake.requests) == 3
@@ -0,0 +1,96 @@
+# Append-only run state files: tail reads and the "changed since the last success" check
+
+import csv
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scraper"))
+
+from run_state import (  # noqa: E402
+    SCRAPE_FAILED, SCRAPE_INCOMPLETE, SCRAPE_STATUS_FILE, SCRAPE_SUCCESS, RunState, append_row, read_tail,
+)
+
+ROWS = [[f"2025-01-{day:02d} 08:00", f"{day} January 2025"] for day in range(1, 21)]
+
+
+def write_csv(path, rows, trailing_newline=True):
+    text = "Sys_date,Report_date\n" + "\n".join(",".join(row) for row in rows)
+    with open(path, "w", encoding="utf-8", newline="") as handle:
+        handle.write(text + ("\n" if trailing_newline else ""))
+
+
+@pytest.mark.parametrize("trailing_newline", [True, False])
+@pytest.mark.parametrize("block_size", [1, 7, 32, 4096])
+def test_read_tail_matches_a_full_read(tmp_path, block_size, trailing_newline):
+    path = str(tmp_path / "report_date.csv")
+    write_csv(path, ROWS, trailing_newline)
+
+    for n in (1, 2, 5, 20, 50):
+        assert read_tail(path, n, block_size=block_size) == ROWS[-n:]
+
+
+def test_read_tail_of_missing_or_header_only_file(tmp_path):
+    path = str(tmp_path / "report_date.csv")
+    assert read_tail(path, 3) == []
+
+    write_csv(path, [])
+    assert read_tail(path, 3, block_size=4) == []
+
+
+def test_append_row_after_a_missing_newline(tmp_path):
+    path = str(tmp_path / "report_date.csv")
+    write_csv(path, ROWS[:2], trailing_newline=False)
+
+    append_row(path, ["Sys_date", "Report_date"], ROWS[2])
+
+    with open(path, encoding="utf-8", newline="") as handle:
+        assert list(csv.reader(handle))[1:] == ROWS[:3]
+
+
+def test_append_row_writes_the_header_once(tmp_path):
+    path = str(tmp_path / "report_date.csv")
+    append_row(path, ["Sys_date", "Report_date"], ROWS[0])
+    append_row(path, ["Sys_date", "Report_date"], ROWS[1])
+
+    with open(path, encoding="utf-8", newline="") as handle:
+        assert list(csv.reader(handle)) == [["Sys_date", "Report_date"]] + ROWS[:2]
+
+
+def test_failed_and_incomplete_scrapes_do_not_count(tmp_path):
+    state = RunState(str(tmp_path))
+    state.record_scrape("1 May 2025", SCRAPE_SUCCESS, sys_date="2025-05-01 08:00")
+    state.record_scrape("8 May 2025", SCRAPE_FAILED, sys_date="2025-05-08 08:00")
+    state.record_scrape("8 May 2025", SCRAPE_INCOMPLETE, sys_date="2025-05-08 09:00")
+
+    assert state.last_successful_report_date() == "1 May 2025"
+    assert state.has_changed_since_last_success("8 May 2025")
+    assert not state.has_changed_since_last_success("1 May 2025")
+
+    state.record_scrape("8 May 2025", SCRAPE_SUCCESS, sys_date="2025-05-08 10:00")
+    assert not state.has_changed_since_last_success("8 May 2025")
+
+
+def test_no_success_within_the_lookback(tmp_path):
+    state = RunState(str(tmp_path))
+    state.record_scrape("1 May 2025", SCRAPE_SUCCESS, sys_date="2025-05-01 08:00")
+    for hour in range(3):
+        state.record_scrape("8 May 2025", SCRAPE_FAILED, sys_date=f"2025-05-08 0{hour}:00")
+
+    assert state.last_successful_report_date(lookback=3) is None
+    assert state.last_successful_report_date(lookback=4) == "1 May 2025"
+
+
+def test_missing_status_file_falls_back_to_the_report_dates(tmp_path):
+    state = RunState(str(tmp_path))
+    assert state.last_successful_report_date() is None
+    assert state.has_changed_since_last_success("1 May 2025")
+
+    state.record_check("1 May 2025", sys_date="2025-05-01 08:00")
+    state.record_check("8 May 2025", sys_date="2025-05-08 08:00")
+
+    assert not os.path.exists(tmp_path / SCRAPE_STATUS_FILE)
+    assert state.latest_report_dates() == [("2025-05-08 08:00", "8 May 2025"), ("2025-05-01 08:00", "1 May 2025")]
+    # before scrape_status.csv existed every recorded report date was scraped
+    assert not state.has_changed_since_last_success("8 May 2025")
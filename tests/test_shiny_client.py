@@ -0,0 +1,108 @@
+# Shiny protocol client against a fake websocket (no server needed)
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scraper"))
+
+from shiny_client import ShinyClient, decode_shiny_frame  # noqa: E402
+
+
+class FakeWebSocket:
+    """Replays queued frames; recv() past the end behaves like a websocket timeout"""
+
+    def __init__(self, frames=()):
+        self.frames = list(frames)
+        self.sent = []
+
+    def settimeout(self, timeout):
+        pass
+
+    def recv(self):
+        if not self.frames:
+            raise TimeoutError("no more frames")
+        return self.frames.pop(0)
+
+    def send(self, payload):
+        self.sent.append(payload)
+
+
+def sockjs(*messages, prefix="0|m|"):
+    """SockJS frame carrying Shiny messages with the Shiny Server multiplex prefix"""
+    return "a" + json.dumps([prefix + json.dumps(message) for message in messages])
+
+
+def client_with(*frames):
+    client = ShinyClient("http://localhost:8000/", timeout=1)
+    client._ws = FakeWebSocket(frames)
+    return client
+
+
+CHART = {"x": {"opts": {"xAxis": {"data": ["Jan", "Feb"]}, "series": [{"name": "Cases", "data": [1, 2], "type": "line"}]}}}
+
+
+def test_decode_plain_frame():
+    assert decode_shiny_frame('{"busy": "idle"}') == [{"busy": "idle"}]
+
+
+def test_decode_sockjs_frame_with_prefixes():
+    frame = "a" + json.dumps(['1A#0|m|{"values": {"out": 1}}', '0|m|{"busy": "busy"}'])
+    assert decode_shiny_frame(frame) == [{"values": {"out": 1}}, {"busy": "busy"}]
+
+
+@pytest.mark.parametrize("frame", ["o", "h", 'c[3000,"Go away!"]', "", None, 'a["0|o|"]', "a[not json"])
+def test_decode_control_frames(frame):
+    assert decode_shiny_frame(frame) == []
+
+
+def test_receive_applies_values_errors_and_busy():
+    client = client_with(sockjs({"config": {"sessionId": "abc"}}, {"busy": "busy"},
+                                {"values": {"chart": CHART}, "errors": {"table": {"message": "boom"}}}))
+    client._receive(1)
+
+    assert client.config == {"sessionId": "abc"}
+    assert client.busy == "busy"
+    assert client.values["chart"] == CHART
+    assert client.errors == {"table": {"message": "boom"}}
+
+
+def test_value_after_error_clears_the_error():
+    client = client_with(sockjs({"errors": {"chart": {"message": "no data"}}}), sockjs({"values": {"chart": CHART}}))
+    client._receive(1)
+    assert "error" in client.get_echarts_data("chart")
+
+    client._receive(1)
+    data = client.get_echarts_data("chart")
+    assert data["success"] and data["xAxis"] == ["Jan", "Feb"]
+    assert client.errors == {}
+
+
+def test_receive_detects_message_ids():
+    client = client_with("a" + json.dumps(['0#0|m|{"busy": "idle"}']))
+    client._receive(1)
+    assert client._message_id == 0
+
+
+def test_wait_for_idle_returns_updated_outputs():
+    client = client_with(sockjs({"busy": "busy"}), sockjs({"values": {"chart": CHART}}),
+                         sockjs({"errors": {"table": {"message": "boom"}}}), sockjs({"busy": "idle"}))
+    assert client.wait_for_idle() == {"chart", "table"}
+
+
+def test_wait_for_idle_ignores_idle_before_any_update():
+    # an idle message left over from the previous input change does not end the wait
+    client = client_with(sockjs({"busy": "idle"}), sockjs({"busy": "busy"}), sockjs({"values": {"chart": CHART}}),
+                         sockjs({"busy": "idle"}))
+    assert client.wait_for_idle() == {"chart"}
+    assert client._ws.frames == []
+
+
+def test_set_inputs_sends_update_message():
+    client = client_with(sockjs({"busy": "busy"}), sockjs({"busy": "idle"}))
+    client._sockjs = client._multiplex = True
+
+    assert client.set_inputs({"c_country_selection": "Nepal"}) == set()
+    assert json.loads(client._ws.sent[0]) == ['0|m|{"method": "update", "data": {"c_country_selection": "Nepal"}}']